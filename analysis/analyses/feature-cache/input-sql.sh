@@ -0,0 +1,30 @@
+#!/usr/bin/env bash
+# Feature cache hit rate of each run of the feature extractors (one row per
+# partition for partitioned runs), most recent first, with the number of
+# cached mentions / relations for the version of the features of the run.
+# Run with NAME g (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      r.started,
+      r.extractor,
+      r.doc_partition,
+      substr(r.version, 1, 8) as version,
+      r.n_rows as rows,
+      r.n_hits as hits,
+      round(100.0 * r.n_hits / greatest(r.n_rows, 1), 2) as hit_rate,
+      coalesce(k.cached, 0) as cached
+    FROM
+      feature_cache_runs r
+    LEFT JOIN
+      (SELECT extractor, version, count(*) as cached
+         FROM feature_cache GROUP BY extractor, version) k
+      ON r.extractor = k.extractor AND r.version = k.version
+    ORDER BY
+      r.started DESC, r.extractor, r.doc_partition
+  ) TO STDOUT WITH CSV HEADER;
+"
@@ -0,0 +1,51 @@
+#!/usr/bin/env bash
+# Rows and distinct features (i.e. weights) contributed by each generic
+# feature family (see FAMILIES in code/util/generic_features.py) to the
+# features table of NAME.  The families are told apart by feature prefix, as
+# generic_features.family_of does; features of other extractors (e.g. the
+# cross-sentence SENT_DIST_ features) fall under shape.
+# Compare with the time per family from util/profile_features.py.
+
+set -eu
+
+case $1 in
+gene_mentions)
+  t="gene_features"
+  ;;
+hpoterm_mentions)
+  t="pheno_features"
+  ;;
+gene_hpoterm_relations)
+  t="genepheno_features"
+  ;;
+esac
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      family,
+      count(*) as rows,
+      count(distinct feature) as distinct_features,
+      round(100.0 * count(*) / t.total, 2) as percent_rows,
+      round(count(*)::numeric / greatest(count(distinct feature), 1), 2) as rows_per_feature
+    FROM
+      (SELECT
+         f.feature,
+         CASE
+           WHEN f.feature ~ '^(INV_)?(WORD|LEMMA|NER|POS)_SEQ_' THEN 'seq'
+           WHEN f.feature ~ '^(INV_)?W_' THEN 'window'
+           WHEN f.feature ~ '^(INV_)?NGRAM_' THEN 'ngram'
+           WHEN f.feature ~ '^(INV_)?IN_DICT' THEN 'dict'
+           WHEN f.feature ~ '^(INV_)?KW' THEN 'keyword'
+           WHEN f.feature ~ '^(INV_)?BETW' THEN 'dep_path'
+           ELSE 'shape'
+         END as family
+       FROM ${t} f) ff,
+      (SELECT greatest(count(*), 1) as total FROM ${t}) t
+    GROUP BY
+      family, t.total
+    ORDER BY
+      rows DESC
+  ) TO STDOUT WITH CSV HEADER;
+"
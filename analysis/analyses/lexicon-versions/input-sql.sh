@@ -0,0 +1,35 @@
+#!/usr/bin/env bash
+# Versions of the dictionaries the gene and phenotype mentions were found
+# with (see code/util/lexicon_registry.py): more than one version for a
+# table means the dictionaries were rebuilt while its extractor ran, and its
+# mentions mix them.
+# Run with NAME g (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      'gene_mentions' as mentions,
+      lexicon_version,
+      count(*) as mentions_count,
+      count(DISTINCT doc_id) as docs_count
+    FROM
+      gene_mentions
+    GROUP BY
+      lexicon_version
+    UNION ALL
+    SELECT
+      'pheno_mentions' as mentions,
+      lexicon_version,
+      count(*) as mentions_count,
+      count(DISTINCT doc_id) as docs_count
+    FROM
+      pheno_mentions
+    GROUP BY
+      lexicon_version
+    ORDER BY
+      mentions, mentions_count DESC
+  ) TO STDOUT WITH CSV HEADER;
+"
@@ -0,0 +1,48 @@
+#!/usr/bin/env bash
+# Candidate gene/phenotype pairs dropped by each gene_pheno_candidates rule,
+# with the genepheno_relations / genepheno_features rows they would have
+# produced (features estimated from the current features-per-relation rate).
+# Rows with an empty max are the last run (rule kept, distance or cap); rows
+# with a max are the pairs that rule alone would drop with PAIR_MAX_DISTANCE
+# or PAIR_MAX_PER_SENTENCE set to max (see code/util/extractor_settings.py),
+# to choose the limits from.  genepheno_candidates keeps the dropped pairs,
+# so these do not depend on the limits of the last run.
+# Run with NAME gp (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      p.rule,
+      p.max,
+      p.pairs,
+      round(100.0 * p.pairs / t.total, 2) as percent,
+      round(p.pairs * r.features_per_relation) as genepheno_features
+    FROM
+      (SELECT
+         coalesce(pruned_by, 'kept') as rule, NULL::int as max, count(*) as pairs
+       FROM genepheno_candidates
+       GROUP BY coalesce(pruned_by, 'kept')
+       UNION ALL
+       SELECT
+         'distance', m.max, sum(CASE WHEN c.distance > m.max THEN 1 ELSE 0 END)
+       FROM genepheno_candidates c,
+         (VALUES (5), (10), (20), (50), (100)) m(max)
+       GROUP BY m.max
+       UNION ALL
+       SELECT
+         'cap', m.max, sum(greatest(s.n - m.max, 0))
+       FROM (SELECT doc_id, sent_id, count(*) as n
+             FROM genepheno_candidates GROUP BY doc_id, sent_id) s,
+         (VALUES (10), (20), (50), (100), (200)) m(max)
+       GROUP BY m.max) p,
+      (SELECT greatest(count(*), 1) as total FROM genepheno_candidates) t,
+      (SELECT (SELECT count(*) FROM genepheno_features)::float /
+              greatest((SELECT count(*) FROM genepheno_relations), 1)
+              as features_per_relation) r
+    ORDER BY
+      p.max IS NOT NULL, p.rule, p.max, p.pairs DESC
+  ) TO STDOUT WITH CSV HEADER;
+"
@@ -0,0 +1,43 @@
+#!/usr/bin/env bash
+# Per-mention downstream row counts, used to compare pheno_mentions overlap
+# policies (see code/util/extractor_settings.py).  Meaningful only when
+# pheno_mentions was last run with PHENO_OVERLAP_POLICY = 'all', since the
+# other policies are evaluated as filters over those mentions.
+# Run with NAME p (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      p.doc_id,
+      p.sent_id,
+      p.mention_id,
+      p.wordidxs[1] as start_idx,
+      p.wordidxs[array_upper(p.wordidxs, 1)] as end_idx,
+      p.entity,
+      coalesce(gs.n, 0) - coalesce(gw.n, 0) as n_pairs,
+      coalesce(f.n, 0) as n_features,
+      r.features_per_relation
+    FROM
+      pheno_mentions p
+    LEFT JOIN
+      (SELECT doc_id, sent_id, count(*) as n
+       FROM gene_mentions GROUP BY doc_id, sent_id) gs
+      ON p.doc_id = gs.doc_id AND p.sent_id = gs.sent_id
+    LEFT JOIN
+      (SELECT doc_id, sent_id, wordidxs, count(*) as n
+       FROM gene_mentions GROUP BY doc_id, sent_id, wordidxs) gw
+      ON p.doc_id = gw.doc_id AND p.sent_id = gw.sent_id AND p.wordidxs = gw.wordidxs
+    LEFT JOIN
+      (SELECT doc_id, mention_id, count(*) as n
+       FROM pheno_features GROUP BY doc_id, mention_id) f
+      ON p.doc_id = f.doc_id AND p.mention_id = f.mention_id,
+      (SELECT (SELECT count(*) FROM genepheno_features)::float /
+              greatest((SELECT count(*) FROM genepheno_relations), 1)
+              as features_per_relation) r
+    ORDER BY
+      p.doc_id, p.sent_id
+  ) TO STDOUT WITH CSV HEADER;
+"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# Report the rows each pheno_mentions overlap policy would produce downstream
+import sys
+import os
+import csv
+from collections import Counter
+
+sys.path.append('%s/code/util' % os.environ['GDD_HOME'])
+from mention_overlap import POLICIES, resolve_overlaps
+
+
+def sentences(rows):
+  """Group the (doc_id, sent_id)-ordered rows by sentence"""
+  current = None
+  mentions = []
+  for row in rows:
+    key = (row['doc_id'], row['sent_id'])
+    if key != current and mentions:
+      yield mentions
+      mentions = []
+    current = key
+    wordidxs = range(int(row['start_idx']), int(row['end_idx']) + 1)
+    mentions.append((row['doc_id'], row['sent_id'], wordidxs, row['mention_id'],
+                     None, row['entity'], None, None))
+  if mentions:
+    yield mentions
+
+if __name__ == '__main__':
+  if len(sys.argv) < 3:
+    print "Process.py: Insufficient arguments"
+  else:
+    with open(sys.argv[1], 'rb') as f_in:
+      rows = list(csv.DictReader(f_in))
+
+    # a mention id repeats once per matching dictionary entry; its features
+    # were extracted (and counted) once per repetition
+    dups = Counter(row['mention_id'] for row in rows)
+    n_pairs = dict((row['mention_id'], int(row['n_pairs'])) for row in rows)
+    n_features = dict((row['mention_id'], int(row['n_features']) / dups[row['mention_id']])
+                      for row in rows)
+    features_per_relation = float(rows[0]['features_per_relation']) if rows else 0.0
+
+    totals = {}
+    for policy in POLICIES:
+      counts = Counter()
+      for mentions in sentences(rows):
+        for m in resolve_overlaps(mentions, policy):
+          counts['pheno_mentions'] += 1
+          counts['pheno_features'] += n_features[m[3]]
+          counts['genepheno_relations'] += n_pairs[m[3]]
+      counts['genepheno_features'] = int(counts['genepheno_relations'] * features_per_relation)
+      totals[policy] = counts
+
+    tables = ['pheno_mentions', 'pheno_features', 'genepheno_relations', 'genepheno_features']
+    with open("%s_policies.csv" % (sys.argv[2],), 'wb') as f_out:
+      csv_writer = csv.writer(f_out)
+      csv_writer.writerow(['policy'] + tables + ['%s_reduction' % t for t in tables])
+      for policy in POLICIES:
+        row = [policy] + [totals[policy][t] for t in tables]
+        for t in tables:
+          base = totals['all'][t]
+          row.append('%.3f' % (1.0 - float(totals[policy][t]) / base) if base else '')
+        csv_writer.writerow(row)
+        print '%-8s %s' % (policy, '  '.join('%s=%d' % (t, totals[policy][t]) for t in tables))
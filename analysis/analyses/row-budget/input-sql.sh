@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+# Worst offenders of the per-row budget of the extractors: the rows each
+# extractor skipped (too large) or abandoned (too slow), largest time then
+# size first, with how often the same row was quarantined.
+# Run with NAME g (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT
+      extractor,
+      doc_id,
+      sent_id,
+      reason,
+      max(size) as size,
+      max(seconds) as seconds,
+      count(*) as times,
+      max(started) as last_started
+    FROM
+      extractor_quarantine
+    GROUP BY
+      extractor, doc_id, sent_id, reason
+    ORDER BY
+      max(seconds) DESC, max(size) DESC, extractor, doc_id, sent_id
+    LIMIT 1000
+  ) TO STDOUT WITH CSV HEADER;
+"
@@ -0,0 +1,49 @@
+#!/usr/bin/env bash
+# How much the sentence_content dedup saves: the first row (*all*) gives the
+# number of (non-weird) sentences the mention extractors would read, and how
+# many of them are repeats of an earlier sentence whose mentions and
+# features are copied instead of extracted; then the 100 most repeated
+# sentences, with their repeats as percent of the whole sentences table.
+# Run with NAME g (the NAME argument is ignored).
+
+set -eu
+
+# Generate the SQL for this task
+echo "
+  COPY (
+    SELECT sentence, occurrences, documents, repeats, percent FROM (
+      SELECT
+        0 as rank,
+        '*all*' as sentence,
+        count(*) as occurrences,
+        count(distinct c.doc_id) as documents,
+        count(case when c.doc_id <> c.rep_doc_id or c.sent_id <> c.rep_sent_id then 1 end) as repeats,
+        round(100.0 * count(case when c.doc_id <> c.rep_doc_id or c.sent_id <> c.rep_sent_id then 1 end)
+          / greatest(count(*), 1), 2) as percent
+      FROM sentence_content c, sentence_quality q
+      WHERE c.doc_id = q.doc_id AND c.sent_id = q.sent_id AND NOT q.is_weird
+      UNION ALL
+      SELECT * FROM (
+        SELECT
+          1 as rank,
+          array_to_string(s.words, ' ') as sentence,
+          d.occurrences,
+          d.documents,
+          d.occurrences - 1 as repeats,
+          round(100.0 * (d.occurrences - 1) / t.total, 2) as percent
+        FROM
+          (SELECT rep_doc_id, rep_sent_id,
+               count(*) as occurrences, count(distinct doc_id) as documents
+             FROM sentence_content
+             GROUP BY rep_doc_id, rep_sent_id
+             HAVING count(*) > 1) d,
+          (SELECT greatest(count(*), 1) as total FROM sentence_content) t,
+          sentences s
+        WHERE s.doc_id = d.rep_doc_id AND s.sent_id = d.rep_sent_id
+        ORDER BY d.occurrences DESC
+        LIMIT 100
+      ) top
+    ) r
+    ORDER BY rank, occurrences DESC
+  ) TO STDOUT WITH CSV HEADER;
+"
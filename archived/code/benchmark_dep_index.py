@@ -0,0 +1,172 @@
+#! /usr/bin/env python3
+#
+# Compare the dependency path features computed with the dependency index
+# (dstruct/DepIndex.py) against the original walks to the root, on random
+# parse trees of long sentences, and report the time taken by each.
+#
+# Usage: ./benchmark_dep_index.py [sentence lengths...]
+#
+
+import random
+import sys
+import time
+
+from dstruct.Sentence import Sentence
+
+
+# The original implementation, walking to the root for each pair of words
+class NaiveSentence(Sentence):
+    _MAX_DEP_PATH_LEN = 1000
+
+    def naive_path_till_root(self, word_index):
+        path = []
+        c = word_index
+        MAX_DEP_PATH_LEN = self._MAX_DEP_PATH_LEN
+        while MAX_DEP_PATH_LEN > 0:
+            MAX_DEP_PATH_LEN = MAX_DEP_PATH_LEN - 1
+            try:
+                if c == -1:
+                    break
+                path.append(c)
+                c = self.words[c].dep_parent
+            except:
+                break
+        return path
+
+    def naive_common_ancestor(self, path1, path2):
+        path1_rev = path1[:]
+        path1_rev.reverse()
+        path2_rev = path2[:]
+        path2_rev.reverse()
+        i = 0
+        while i < min(len(path1_rev), len(path2_rev)) and \
+                path1_rev[i] == path2_rev[i]:
+            i += 1
+        if path1_rev[i-1] != path2_rev[i-1]:
+            return None
+        else:
+            return path1_rev[i-1]
+
+    def naive_path_between_words(self, idx1, idx2, use_pos=False):
+        words_on_path = []
+        c = idx1
+        length = 0
+        MAX_DEP_PATH_LEN = self._MAX_DEP_PATH_LEN
+        while MAX_DEP_PATH_LEN > 0:
+            MAX_DEP_PATH_LEN -= 1
+            try:
+                if c == -1:
+                    break
+                elif c == idx2:
+                    break
+                elif c == idx1:
+                    words_on_path.append(str(self.words[c].dep_path))
+                else:
+                    words_on_path.append(str(self.words[c].dep_path) + "|" +
+                                         self.words[c].get_feature(use_pos))
+                c = self.words[c].dep_parent
+                length += 1
+            except:
+                break
+        return (words_on_path, length)
+
+    def get_word_dep_path(self, idx1, idx2, use_pos=False):
+        path1 = self.naive_path_till_root(idx1)
+        path2 = self.naive_path_till_root(idx2)
+        parent = self.naive_common_ancestor(path1, path2)
+        (words_1, length_1) = self.naive_path_between_words(
+            idx1, parent, use_pos)
+        (words_2, length_2) = self.naive_path_between_words(
+            idx2, parent, use_pos)
+        if parent is None:
+            root_str = "@ROOT@"
+        else:
+            root_str = "@"
+        return ("-".join(words_1) + root_str + "-".join(words_2),
+                length_1 + length_2)
+
+    def get_word_dep_distance(self, idx1, idx2):
+        return self.get_word_dep_path(idx1, idx2)[1]
+
+
+# Return the arguments of a Sentence with a random parse of the given length.
+# Each word is attached to one of the previous few words, which gives trees as
+# deep as the ones of long sentences in our corpus.
+def random_sentence_args(length, n_roots=1):
+    dep_parents = []
+    for i in range(length):
+        if i < n_roots:
+            dep_parents.append(-1)
+        else:
+            dep_parents.append(random.randint(max(0, i - 8), i - 1))
+    order = list(range(length))
+    random.shuffle(order)
+    position = dict((old, new) for (new, old) in enumerate(order))
+    dep_parents = [-1 if dep_parents[old] == -1 else position[dep_parents[old]]
+                   for old in order]
+    words = ["w%d" % i for i in range(length)]
+    return ("doc", 0, list(range(length)), words,
+            [random.choice(["NN", "VBZ", "JJ"]) for i in range(length)],
+            [random.choice(["O", "O", "GENE"]) for i in range(length)],
+            words, [random.choice(["nsubj", "dobj", "prep_of", "amod"])
+                    for i in range(length)],
+            dep_parents, [None] * length)
+
+
+# Run func(sentence) on each sentence, return the results and the seconds taken
+def timed(func, sentences):
+    start = time.time()
+    results = [func(sentence) for sentence in sentences]
+    return (results, time.time() - start)
+
+
+# Shortest dependency paths between consecutive 3-word spans, as computed for
+# the gene/phenotype relation features
+def span_paths(sentence):
+    spans = [sentence.words[i:i+3]
+             for i in range(0, len(sentence.words) - 2, 9)]
+    return [sentence.dep_path(spans[i], spans[i+1], use_pos)
+            for i in range(len(spans) - 1) for use_pos in (False, True)]
+
+
+# Closest word to each 3-word span, as computed for the mention features
+def closest_words(sentence):
+    result = []
+    for begin in range(0, len(sentence.words) - 2, 9):
+        minl = 100
+        minp = None
+        for i in range(begin, begin + 3):
+            for j in range(len(sentence.words)):
+                if begin <= j < begin + 3:
+                    continue
+                l = sentence.get_word_dep_distance(i, j)
+                if l < minl:
+                    minl = l
+                    minp = sentence.get_word_dep_path(i, j)[0]
+        result.append(minp)
+    return result
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    lengths = [int(x) for x in sys.argv[1:]] or [100, 200, 400]
+    for length in lengths:
+        args = [random_sentence_args(length, 1 + i % 3) for i in range(20)]
+        naive = [NaiveSentence(*a) for a in args]
+        indexed = [Sentence(*a) for a in args]
+        # Same paths for every pair of words of the first sentences
+        for (ns, s) in zip(naive[:2], indexed[:2]):
+            for i in range(length):
+                for j in range(length):
+                    assert ns.get_word_dep_path(i, j) == \
+                        s.get_word_dep_path(i, j), (i, j)
+        print("{} tokens, {} sentences:".format(length, len(args)))
+        (_, t) = timed(lambda s: s.get_dep_index(), indexed)
+        print("  build index       {:8.3f}s".format(t))
+        for (name, func) in [("dep_path", span_paths),
+                             ("closest word", closest_words)]:
+            (naive_res, naive_t) = timed(func, naive)
+            (res, t) = timed(func, indexed)
+            assert naive_res == res
+            print("  {:<17} {:8.3f}s naive {:8.3f}s index ({:.1f}x)".format(
+                name, naive_t, t, naive_t / max(t, 1e-9)))
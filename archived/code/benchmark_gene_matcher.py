@@ -0,0 +1,169 @@
+#! /usr/bin/env python3
+#
+# Compare the gene mention candidates found with the n-gram matcher
+# (helper/ngram_matcher.py) against the original lookup of every phrase of
+# the sentence, on random long sentences, and report the time taken by each.
+#
+# The dictionaries of ext_gene_candidates (merged_genes, hpoterms_with_gene,
+# english) are random ones, written to a temporary directory in the format of
+# the files in dicts/, so that the benchmark does not need them.
+#
+# Usage: ./benchmark_gene_matcher.py [sentence lengths...]
+#
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from dstruct.Mention import Mention
+from dstruct.Sentence import Sentence
+from helper import dictionaries
+from helper.easierlife import get_all_phrases_in_sentence
+
+
+# Return a random word of lower case letters
+def random_word():
+    return "".join(random.choice(string.ascii_lowercase)
+                   for i in range(random.randint(3, 10)))
+
+
+# Write random dictionaries to directory and point the dictionaries of
+# ext_gene_candidates to them: n_genes genes with a few alternate symbols
+# and long names each, HPO terms naming some of the genes, and English words
+def write_dictionaries(directory, n_genes=20000, n_words=20000):
+    english = sorted(set(random_word() for i in range(n_words)))
+    symbols = []
+    with open(os.path.join(directory, "merged_genes.tsv"), "wt") as f:
+        for i in range(n_genes):
+            symbol = "".join(random.choice(string.ascii_uppercase)
+                             for j in range(random.randint(2, 5))) + \
+                str(random.randint(1, 20))
+            alternates = [symbol + random.choice(["A", "B", "L", "-1"])
+                          for j in range(random.randint(1, 3))]
+            names = [" ".join(random.sample(english, random.randint(2, 6)))
+                     for j in range(random.randint(1, 2))]
+            f.write("{}\t{}\t{}\n".format(symbol, "|".join(alternates),
+                                          "|".join(names)))
+            symbols.append(symbol)
+    with open(os.path.join(directory, "genes_in_hpoterms.tsv"), "wt") as f:
+        for symbol in random.sample(symbols, n_genes // 10):
+            f.write("{}\t{} {} {}\n".format(
+                symbol, random.choice(english), symbol,
+                random.choice(["deficiency", "syndrome", "anomaly"])))
+    with open(os.path.join(directory, "english_words.tsv"), "wt") as f:
+        for word in english:
+            f.write(word + "\n")
+    for (name, filename) in [("merged_genes", "merged_genes.tsv"),
+                             ("inverted_long_names", "merged_genes.tsv"),
+                             ("hpoterms_with_gene", "genes_in_hpoterms.tsv"),
+                             ("english", "english_words.tsv")]:
+        dictionaries.dictionaries[name][0] = os.path.join(directory, filename)
+
+
+# The original extract(), joining the words of every phrase of the sentence
+# and looking the phrase up in the dictionaries of genes (the
+# ext_gene_candidates module)
+def naive_extract(sentence, genes):
+    english_dict = genes.english_dict
+    hpoterms_with_gene = genes.hpoterms_with_gene
+    max_mention_length = genes.max_mention_length
+    merged_genes_dict = genes.merged_genes_dict
+    mentions = []
+    no_english_words = True
+    for word in sentence.words:
+        if len(word.word) > 2 and \
+                (word.word in english_dict or
+                 word.word.casefold() in english_dict):
+            no_english_words = False
+            break
+    if no_english_words:
+        return []
+    sentence_is_upper = False
+    if " ".join([x.word for x in sentence.words]).isupper():
+        sentence_is_upper = True
+    history = set()
+    words = sentence.words
+    for start, end in get_all_phrases_in_sentence(sentence,
+                                                  max_mention_length):
+        if start in history or end in history:
+                continue
+        phrase = " ".join([word.word for word in words[start:end]])
+        if sentence_is_upper:
+            phrase = phrase.casefold()
+        mention = None
+        if phrase in hpoterms_with_gene:
+            mention = Mention("GENE_SUP_HPO", phrase, words[start:end])
+            mention.is_correct = False
+            mentions.append(mention)
+            for i in range(start, end):
+                history.add(i)
+        if len(phrase) > 1 and phrase in merged_genes_dict:
+            mention = Mention("GENE",
+                              "|".join(merged_genes_dict[phrase]),
+                              words[start:end])
+            mentions.append(mention)
+            for i in range(start, end):
+                history.add(i)
+    return mentions
+
+
+# Return the arguments of a Sentence of the given length, made of gene
+# symbols, names and HPO terms with genes (split into words), English words
+# and punctuation. Some sentences are all upper case.
+def random_sentence_args(length, phrases, fillers, upper=False):
+    words = []
+    while len(words) < length:
+        if random.random() < 0.2:
+            words.extend(random.choice(phrases).split(" "))
+        else:
+            words.append(random.choice(fillers))
+    words = words[:length]
+    if upper:
+        words = [word.upper() for word in words]
+    return ("doc", 0, list(range(length)), words,
+            [random.choice(["NN", "VBZ", "JJ"]) for i in range(length)],
+            [random.choice(["O", "O", "PERSON"]) for i in range(length)],
+            words, [None] * length, [None] * length, [None] * length)
+
+
+# Run func(sentence) on each sentence, return the candidates and the seconds
+# taken (the best of repeat runs)
+def timed(func, sentences, repeat=3):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        results = [[m.tsv_dump() for m in func(sentence)]
+                   for sentence in sentences]
+        seconds = time.time() - start
+        if best is None or seconds < best:
+            best = seconds
+    return (results, best)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    lengths = [int(x) for x in sys.argv[1:]] or [50, 100, 200, 400]
+    with tempfile.TemporaryDirectory() as directory:
+        write_dictionaries(directory)
+        # loads the dictionaries when imported
+        import ext_gene_candidates as genes
+    phrases = sorted(genes.merged_genes_dict) + \
+        sorted(genes.hpoterms_with_gene)
+    fillers = sorted(genes.english_dict)[:5000] + \
+        [",", ".", "(", ")", "-", ":"]
+    print("max_mention_length = {}".format(genes.max_mention_length))
+    for length in lengths:
+        args = [random_sentence_args(length, phrases, fillers, i % 5 == 0)
+                for i in range(50)]
+        sentences = [Sentence(*a) for a in args]
+        (naive_res, naive_t) = timed(
+            lambda sentence: naive_extract(sentence, genes), sentences)
+        (res, t) = timed(genes.extract, sentences)
+        assert naive_res == res
+        print("{} tokens, {} sentences, {} candidates:".format(
+            length, len(args), sum(len(r) for r in res)))
+        print("  naive {:8.3f}s, n-grams {:8.3f}s ({:.1f}x)".format(
+            naive_t, t, naive_t / max(t, 1e-9)))
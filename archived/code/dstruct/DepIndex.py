@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+""" A DepIndex class
+
+An index over the dependency tree of a sentence, built once per sentence so
+that dependency path features do not have to walk the tree to the root for
+every pair of words.
+
+It stores the depth of each word, an Euler tour of the tree and a sparse table
+over the tour, so the lowest common ancestor and the length of the path
+between two words are found in O(1). Building the index is O(n log n).
+
+Words whose parent is -1 (or not a valid word index) are roots. A sentence can
+have more than one root: two words in different trees have no common
+ancestor, and the path between them goes through the (virtual) root, as in
+Sentence.get_word_dep_path. Parse trees with cycles are cut at the first word
+of the cycle that is reached, which becomes a root.
+"""
+
+
+class DepIndex(object):
+
+    parents = []
+    depth = []
+
+    def __init__(self, dep_parents):
+        n = len(dep_parents)
+        self.parents = [p if p is not None and 0 <= p < n else -1
+                        for p in dep_parents]
+        self._cut_cycles()
+        self.children = [[] for i in range(n)]
+        for i in range(n):
+            if self.parents[i] != -1:
+                self.children[self.parents[i]].append(i)
+        self.depth = [0] * n
+        # Index of the tree (i.e., of the root) each word belongs to
+        self._tree = [0] * n
+        # Position of the first occurrence of each word in the Euler tour
+        self._first = [0] * n
+        euler = []
+        roots = [i for i in range(n) if self.parents[i] == -1]
+        for tree, root in enumerate(roots):
+            stack = [(root, 0)]
+            while stack:
+                (node, child_idx) = stack[-1]
+                if child_idx == 0:
+                    self._first[node] = len(euler)
+                    self._tree[node] = tree
+                euler.append(node)
+                if child_idx < len(self.children[node]):
+                    stack[-1] = (node, child_idx + 1)
+                    child = self.children[node][child_idx]
+                    self.depth[child] = self.depth[node] + 1
+                    stack.append((child, 0))
+                else:
+                    stack.pop()
+        # _sparse[k][i] is the shallowest word in euler[i:i + 2**k]
+        self._sparse = [euler]
+        k = 1
+        while (1 << k) <= len(euler):
+            prev = self._sparse[-1]
+            half = 1 << (k - 1)
+            row = []
+            for i in range(len(euler) - (1 << k) + 1):
+                a = prev[i]
+                b = prev[i + half]
+                row.append(a if self.depth[a] <= self.depth[b] else b)
+            self._sparse.append(row)
+            k += 1
+
+    # Make the first word reached on each cycle of the parse a root
+    def _cut_cycles(self):
+        # 0: not seen, 1: on the current walk, 2: done
+        state = [0] * len(self.parents)
+        for start in range(len(self.parents)):
+            walk = []
+            c = start
+            while c != -1 and state[c] == 0:
+                state[c] = 1
+                walk.append(c)
+                c = self.parents[c]
+            if c != -1 and state[c] == 1:
+                self.parents[c] = -1
+            for w in walk:
+                state[w] = 2
+
+    def __len__(self):
+        return len(self.parents)
+
+    # Return the lowest common ancestor of the words idx1 and idx2, or None if
+    # they are in different trees
+    def lca(self, idx1, idx2):
+        if self._tree[idx1] != self._tree[idx2]:
+            return None
+        left = self._first[idx1]
+        right = self._first[idx2]
+        if left > right:
+            (left, right) = (right, left)
+        k = (right - left + 1).bit_length() - 1
+        a = self._sparse[k][left]
+        b = self._sparse[k][right - (1 << k) + 1]
+        return a if self.depth[a] <= self.depth[b] else b
+
+    # Return the number of edges on the dependency path between idx1 and idx2.
+    # Words in different trees are connected through the root, which adds one
+    # edge from each of their roots.
+    def distance(self, idx1, idx2):
+        ancestor = self.lca(idx1, idx2)
+        if ancestor is None:
+            return self.depth[idx1] + self.depth[idx2] + 2
+        return self.depth[idx1] + self.depth[idx2] - 2 * self.depth[ancestor]
+
+    # Return the words from idx up to ancestor (excluded), or up to the root
+    # (included) if ancestor is None
+    def path_up(self, idx, ancestor=None):
+        path = []
+        c = idx
+        while c != -1 and c != ancestor:
+            path.append(c)
+            c = self.parents[c]
+        return path
+
+    # Return the k words not in sources that are closest to any of the words
+    # in sources, as (word, distance) pairs sorted by distance. Ties are broken
+    # by breadth-first order from the sources, in the given order. Only the
+    # words within the distance of the k-th closest word are visited.
+    def nearest(self, sources, k):
+        n = len(self.parents)
+        # n stands for the virtual root joining the trees of the sentence
+        seen = set(sources)
+        frontier = list(sources)
+        result = []
+        dist = 0
+        while frontier and len(result) < k:
+            dist += 1
+            next_frontier = []
+            for node in frontier:
+                if node == n:
+                    neighbours = [i for i in range(n) if self.parents[i] == -1]
+                else:
+                    parent = self.parents[node]
+                    neighbours = [n if parent == -1 else parent] + \
+                        self.children[node]
+                for neighbour in neighbours:
+                    if neighbour in seen:
+                        continue
+                    seen.add(neighbour)
+                    next_frontier.append(neighbour)
+                    if neighbour != n and len(result) < k:
+                        result.append((neighbour, dist))
+            frontier = next_frontier
+        return result
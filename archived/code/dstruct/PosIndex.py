@@ -0,0 +1,68 @@
+#! /usr/bin/env python3
+""" A PosIndex class
+
+Positional index over the words of a sentence, built once per sentence so
+that the features of each relation in the sentence can look at the words
+between (or around) its mentions with range queries instead of scanning the
+whole sentence again.
+
+The index is built from a dict mapping a class name (e.g., "VERB") to a
+function that takes a Word and returns True if the word belongs to the class.
+For each class it stores the sorted positions of its words and the prefix
+counts, so that counting the words of a class in a range is O(1) and listing
+them is O(log n + k).
+"""
+
+import bisect
+
+
+class PosIndex(object):
+
+    positions = dict()
+    prefix_counts = dict()
+
+    def __init__(self, words, classes):
+        self.positions = dict()
+        self.prefix_counts = dict()
+        for name in classes:
+            belongs = classes[name]
+            positions = []
+            # prefix_counts[i] is the number of words of the class in words[:i]
+            counts = [0]
+            for word in words:
+                if belongs(word):
+                    positions.append(word.in_sent_idx)
+                counts.append(len(positions))
+            self.positions[name] = positions
+            self.prefix_counts[name] = counts
+
+    # Return the number of words of the class in words[begin:end]
+    def count(self, name, begin=0, end=None):
+        counts = self.prefix_counts[name]
+        if end is None or end > len(counts) - 1:
+            end = len(counts) - 1
+        begin = max(begin, 0)
+        if begin >= end:
+            return 0
+        return counts[end] - counts[begin]
+
+    # Return the (sorted) positions of the words of the class in
+    # words[begin:end]
+    def range(self, name, begin=0, end=None):
+        positions = self.positions[name]
+        left = bisect.bisect_left(positions, begin)
+        if end is None:
+            return positions[left:]
+        return positions[left:bisect.bisect_left(positions, end)]
+
+    # Return the position of the last word of the class in words[begin:end],
+    # or None if there is none
+    def last(self, name, begin=0, end=None):
+        positions = self.positions[name]
+        if end is None:
+            right = len(positions)
+        else:
+            right = bisect.bisect_left(positions, end)
+        if right == 0 or positions[right - 1] < begin:
+            return None
+        return positions[right - 1]
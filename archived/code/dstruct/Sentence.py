@@ -6,15 +6,17 @@ Basically a container for an array of Word objects, plus doc_id and sent_id.
 Originally obtained from the 'pharm' repository, but modified.
 """
 
+from dstruct.DepIndex import DepIndex
+from dstruct.PosIndex import PosIndex
 from dstruct.Word import Word
 
 
 class Sentence(object):
-    # to avoid bad parse tree that have self-recursion
-    _MAX_DEP_PATH_LEN = 1000
     doc_id = None
     sent_id = None
     words = []
+    _dep_index = None
+    _pos_indexes = None
 
     def __init__(self, _doc_id, _sent_id, _wordidxs, _words, _poses, _ners,
                  _lemmas, _dep_paths, _dep_parents, _bounding_boxes):
@@ -36,98 +38,60 @@ class Sentence(object):
                             dep_parents[i], bounding_boxes[i])
                 self.words.append(word)
 
+    # Return the dependency index of the sentence, building it the first time
+    def get_dep_index(self):
+        if self._dep_index is None:
+            self._dep_index = DepIndex(
+                [word.dep_parent for word in self.words])
+        return self._dep_index
+
+    # Return the positional index of the sentence for the given classes of
+    # words (see dstruct/PosIndex.py), building it the first time
+    def get_pos_index(self, classes):
+        if self._pos_indexes is None:
+            self._pos_indexes = dict()
+        key = tuple(sorted(classes))
+        if key not in self._pos_indexes:
+            self._pos_indexes[key] = PosIndex(self.words, classes)
+        return self._pos_indexes[key]
+
     # Return a list of the indexes of all words in the dependency path from
     # the word at index word_index to the root
     def get_path_till_root(self, word_index):
-        path = []
-        c = word_index
-        MAX_DEP_PATH_LEN = self._MAX_DEP_PATH_LEN
-        while MAX_DEP_PATH_LEN > 0:
-            MAX_DEP_PATH_LEN = MAX_DEP_PATH_LEN - 1
-            try:
-                # c == -1 means we found the root
-                if c == -1:
-                    break
-                path.append(c)
-                c = self.words[c].dep_parent
-            except:
-                break
-        return path
-
-    # Given two paths returned by get_path_till_root, find the least common
-    # ancestor, i.e., the one farthest away from the root. If there is no
-    # common ancestor, return None
-    def get_common_ancestor(self, path1, path2):
-        # The paths are sorted from leaf to root, so reverse them
-        path1_rev = path1[:]
-        path1_rev.reverse()
-        path2_rev = path2[:]
-        path2_rev.reverse()
-        i = 0
-        while i < min(len(path1_rev), len(path2_rev)) and \
-                path1_rev[i] == path2_rev[i]:
-            i += 1
-        if path1_rev[i-1] != path2_rev[i-1]:
-            # No common ancestor found
-            return None
-        else:
-            return path1_rev[i-1]
-        # XXX (Matteo) The following is the function as it was in pharma.
-        # The logic seemed more complicated to understand for me.
-        # parent = None
-        # for i in range(max(len(path1), len(path2))):
-        #     tovisit = 0 - i - 1
-        #     if i >= len(path1) or i >= len(path2):
-        #         break
-        #     if path1[tovisit] != path2[tovisit]:
-        #         break
-        #     parent = path1[tovisit]
-        # return parent
-
-    # Given two word idx1 and idx2, where idx2 is an ancestor of idx1, return,
-    # for each word 'w' on the dependency path between idx1 and idx2, the label
-    # on the edge to 'w' and the NER tag of 'w' or its lemma if the NER tag
-    # is 'O' (see Word.get_feature())
-    # the dependency path labels on the path from idx1 to idx2
-    def get_direct_dependency_path_between_words(
-            self, idx1, idx2, use_pos=False):
+        return self.get_dep_index().path_up(word_index)
+
+    # Given the words on the dependency path from a word up to (but excluding)
+    # one of its ancestors, return, for each word 'w' on the path, the label on
+    # the edge to 'w' and the NER tag of 'w' or its lemma if the NER tag is 'O'
+    # (see Word.get_feature())
+    def get_direct_dependency_path_between_words(self, path, use_pos=False):
         words_on_path = []
-        c = idx1
-        length = 0
-        MAX_DEP_PATH_LEN = self._MAX_DEP_PATH_LEN
-        while MAX_DEP_PATH_LEN > 0:
-            MAX_DEP_PATH_LEN -= 1
-            try:
-                if c == -1:
-                    break
-                elif c == idx2:
-                    break
-                elif c == idx1:
-                    # we do not include the NER tag/lemma for idx1
-                    words_on_path.append(str(self.words[c].dep_path))
-                else:
-                    words_on_path.append(str(self.words[c].dep_path) + "|" +
-                                         self.words[c].get_feature(use_pos))
-                c = self.words[c].dep_parent
-                length += 1
-            except:
-                break
-        return (words_on_path, length)
+        for (i, c) in enumerate(path):
+            if i == 0:
+                # we do not include the NER tag/lemma for the first word
+                words_on_path.append(str(self.words[c].dep_path))
+            else:
+                words_on_path.append(str(self.words[c].dep_path) + "|" +
+                                     self.words[c].get_feature(use_pos))
+        return words_on_path
+
+    # Given two word idx1 and idx2, return the length of the dependency path
+    # between them, i.e., the length returned by get_word_dep_path, in O(1)
+    def get_word_dep_distance(self, idx1, idx2):
+        return self.get_dep_index().distance(idx1, idx2)
 
     # Given two word idx1 and idx2, return the dependency path feature between
     # them
     def get_word_dep_path(self, idx1, idx2, use_pos=False):
-        path1 = self.get_path_till_root(idx1)
-        path2 = self.get_path_till_root(idx2)
-
-        parent = self.get_common_ancestor(path1, path2)
+        dep_index = self.get_dep_index()
+        parent = dep_index.lca(idx1, idx2)
 
-        (words_from_idx1_to_parents, length_1) = \
+        words_from_idx1_to_parents = \
             self.get_direct_dependency_path_between_words(
-                idx1, parent, use_pos)
-        (words_from_idx2_to_parents, length_2) = \
+                dep_index.path_up(idx1, parent), use_pos)
+        words_from_idx2_to_parents = \
             self.get_direct_dependency_path_between_words(
-                idx2, parent, use_pos)
+                dep_index.path_up(idx2, parent), use_pos)
 
         if parent is None:
             root_str = "@ROOT@"
@@ -135,7 +99,8 @@ class Sentence(object):
             root_str = "@"
 
         return ("-".join(words_from_idx1_to_parents) + root_str +
-                "-".join(words_from_idx2_to_parents), length_1 + length_2)
+                "-".join(words_from_idx2_to_parents),
+                dep_index.distance(idx1, idx2))
 
     # Given a mention, return the word before the first word of the mention,
     # if present
@@ -155,20 +120,21 @@ class Sentence(object):
         else:
             return self.words[end + 1]
 
+    # Return the dependency paths from the mention to the (at most) 5 words
+    # outside of it that are closest to it in the dependency tree
     def dep_parent(self, mention):
         begin = mention.words[0].in_sent_idx
         end = mention.words[-1].in_sent_idx
 
         paths = []
-        for i in range(begin, end+1):
-            for j in range(0, len(self.words)):
-                if j >= begin and j <= end:
-                    continue
-
-                (path, length) = self.get_word_dep_path(i, j)
-                paths.append(path)
-
-        return sorted(paths, key=len)[0:min(5, len(paths))]
+        nearest = self.get_dep_index().nearest(range(begin, end+1), 5)
+        for (j, length) in nearest:
+            # Start the path from the word of the mention closest to j
+            i = min(range(begin, end+1),
+                    key=lambda i: self.get_word_dep_distance(i, j))
+            (path, length) = self.get_word_dep_path(i, j)
+            paths.append(path)
+        return paths
 
     # Given two entities, return the feature of the shortest dependency path
     # between a word from one of to a word of the other.
@@ -179,13 +145,17 @@ class Sentence(object):
         end2 = entity2_words[-1].in_sent_idx
 
         min_len = 10000000000
-        min_p = None
+        min_idxs = None
         for idx1 in range(begin1, end1+1):
             for idx2 in range(begin2, end2+1):
-                (path, length) = self.get_word_dep_path(idx1, idx2, use_pos)
+                length = self.get_word_dep_distance(idx1, idx2)
                 if length < min_len:
-                    min_p = path
+                    min_idxs = (idx1, idx2)
                     min_len = length
+        if min_idxs is None:
+            return (None, min_len)
+        (min_p, min_len) = self.get_word_dep_path(
+            min_idxs[0], min_idxs[1], use_pos)
         return (min_p, min_len)
 
     # Return True if the sentence is 'weird', according to the following
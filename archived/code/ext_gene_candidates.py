@@ -8,8 +8,8 @@ import fileinput
 from dstruct.Mention import Mention
 from dstruct.Sentence import Sentence
 from helper.dictionaries import load_dict
-from helper.easierlife import get_all_phrases_in_sentence, \
-    get_dict_from_TSVline, TSVstring2list, no_op
+from helper.easierlife import get_dict_from_TSVline, TSVstring2list, no_op
+from helper.ngram_matcher import NgramMatcher
 
 DOC_ELEMENTS = frozenset(
     ["figure", "table", "figures", "tables", "fig", "fig.", "figs", "figs.",
@@ -34,6 +34,11 @@ for key in merged_genes_dict:
 # doubling to take into account commas and who knows what
 max_mention_length *= 2
 
+# The phrases of both dictionaries, to find them in the sentences without
+# looking up every subsequence (see helper/ngram_matcher.py)
+phrase_matcher = NgramMatcher(
+    list(merged_genes_dict) + list(hpoterms_with_gene))
+
 
 # Supervise the candidates.
 def supervise(mentions, sentence):
@@ -243,14 +248,30 @@ def extract(sentence):
     # contained a mention
     history = set()
     words = sentence.words
-    # Scan all subsequences of the sentence of length up to max_mention_length
-    for start, end in get_all_phrases_in_sentence(sentence,
-                                                  max_mention_length):
+    # The tokens of the words (split on spaces, like the dictionary phrases),
+    # with the word starting at each token offset. As in
+    # get_all_phrases_in_sentence, the last word is left out.
+    tokens = []
+    word_at = dict()
+    for i in range(len(words) - 1):
+        word_at[len(tokens)] = i
+        word = words[i].word
+        if sentence_is_upper:  # XXX This may not be a great idea...
+            word = word.casefold()
+        tokens.extend(word.split(" "))
+    word_at[len(tokens)] = len(words) - 1
+    # Scan the subsequences of the sentence of length up to
+    # max_mention_length that are in one of the dictionaries, in the order
+    # of get_all_phrases_in_sentence
+    for (token_start, token_end, phrase) in phrase_matcher.find(tokens):
+        if token_start not in word_at or token_end not in word_at:
+            continue
+        start = word_at[token_start]
+        end = word_at[token_end]
+        if end - start > max_mention_length:
+            continue
         if start in history or end in history:
                 continue
-        phrase = " ".join([word.word for word in words[start:end]])
-        if sentence_is_upper:  # XXX This may not be a great idea...
-            phrase = phrase.casefold()
         mention = None
         # If the phrase is a hpoterm name containing a gene, then it is a
         # mention candidate to supervise as negative
@@ -10,32 +10,23 @@ from dstruct.Sentence import Sentence
 from helper.dictionaries import load_dict
 from helper.easierlife import get_dict_from_TSVline, TSVstring2list, no_op, \
     print_feature, BASE_DIR
+from helper.feature_keywords import GENE_KEYWORD_DICTS, get_keyword_tagger
 
 import ddlib
 
+ddlib_dicts_loaded = False
+
 
 def add_features_generic(mention_id, gene_words, sentence):
     # Use the generic feature library (ONLY!)
 
-    # Load dictionaries for keywords
-    ddlib.load_dictionary(BASE_DIR + "/dicts/features/gene_var.tsv",  "VARKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_knock.tsv",  "KNOCKKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_amino.tsv",  "AMINOKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_antigene.tsv",  "ANTIGENEKW")
-    ddlib.load_dictionary(BASE_DIR + "/dicts/features/gene_dna.tsv",  "DNAKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_downregulation.tsv",  "DOWNREGKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_upregulation.tsv",  "UPREGKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_tumor.tsv",  "TUMORKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_gene.tsv",  "GENEKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/gene_expression.tsv",  "EXPRESSKW")
+    # Load dictionaries for keywords, the first time only
+    global ddlib_dicts_loaded
+    if not ddlib_dicts_loaded:
+        for (dict_id, filename) in GENE_KEYWORD_DICTS:
+            ddlib.load_dictionary(
+                BASE_DIR + "/dicts/features/" + filename, dict_id)
+        ddlib_dicts_loaded = True
     # Create the objects used by ddlib. ddlib interface is so ugly.
     obj = dict()
     obj['lemma'] = []
@@ -63,65 +54,12 @@ def add_features_generic(mention_id, gene_words, sentence):
         print_feature(sentence.doc_id, mention_id, feature)
 
 
-# Keywords that are often associated with genes
-VAR_KWS = frozenset([
-    "acetylation", "activate", "activation", "adaptor", "agonist", "alignment",
-    "allele", "antagonist", "antibody", "asynonymous", "backbone", "binding",
-    "biomarker", "breakdown", "cell", "cleavage", "cluster", "cnv",
-    "coactivator", "co-activator",  "complex", "dd-genotype", "DD-genotype",
-    "deletion", "determinant", "domain", "duplication", "dysfunction",
-    "effector", "enhancer", "enrichment", "enzyme", "excision", "factor",
-    "family",  "function", "functionality", "genotype",
-    "growth", "haplotype", "haplotypes", "heterozygous", "hexons", "hexon",
-    "histone", "homologue", "homology", "homozygous" "human",
-    "hypermetylation", "hybridization", "induce", "inducer", "induction",
-    "inhibitor", "inhibition", "intron", "interaction", "isoform", "isoforms",
-    "kinase", "kinesin", "level", "ligand", "location", "locus",
-    "mammalian", "marker", "methilation", "modification", "moiety", "molecule",
-    "molecules", "morpheein", "motif",  "mutant", "mutation",
-    "mutations", "nonsynonymous", "non-synonymous", "nucleotide",
-    "oligomerization", "oncoprotein", "pathway", "peptide",
-    "pharmacokinetic", "pharmacodynamic", "pharmacogenetic" "phosphorylation",
-    "polymorphism", "proliferation", "promoter", "protein", "receptor",
-    "receptors", "recruitment", "region", "regulator", "release", "repressor",
-    "resistance", "retention", "ribonuclease", "role", "sequence",
-    "sequences", "sequestration", "serum", "signaling", "SNP", "SNPs",
-    "staining", "sumoylation", "synonymous", "target", "T-cell", "transducer",
-    "translocation", "transcribe", "transcript", "transcription",
-    "transporter", "variant", "variation", "vivo", "vitro"
-    ])
-
-KNOCK_KWS = frozenset([
-    "knockdown", "knock-down", "knock-out", "knockout", "KO"])
-
-AMINO_ACID_KWS = frozenset(["amino-acid", "aminoacid"])
-
-ANTIGENE_KWS = frozenset(["antigen", "antigene", "anti-gen", "anti-gene"])
-
-DNA_KWS = frozenset([
-    "cdna", "cDNA", "dna", "mrna", "mRNA", "rna", "rrna", "sirnas", "sirna",
-    "siRNA", "siRNAs"])
-
-DOWNREGULATION_KWS = frozenset(["down-regulation", "downregulation"])
-
-UPREGULATION_KWS = frozenset(["up-regulation", "upregulation"])
-
-TUMOR_KWS = frozenset([
-    "tumor", "tumours", "tumour", "cancer", "carcinoma", "fibrosarcoma",
-    "sarcoma", "lymphoma"])
-
-GENE_KWS = frozenset([
-    "gene", "oncogene", "protooncogene", "proto-oncogene", "pseudogene",
-    "transgene"])
-
-COEXPRESSION_KWS = frozenset([
-    "expression", "overexpression", "over-expression", "co-expression",
-    "coexpression"])
-
-
-KEYWORDS = VAR_KWS | KNOCK_KWS | AMINO_ACID_KWS | ANTIGENE_KWS | DNA_KWS | \
-    DOWNREGULATION_KWS | DOWNREGULATION_KWS | TUMOR_KWS | GENE_KWS | \
-    COEXPRESSION_KWS
+# Keyword features use these names for the keywords in these dictionaries, and
+# the keyword itself otherwise
+KEYWORD_NAMES = [
+    ("KNOCKKW", "_KNOCKOUT"), ("ANTIGENEKW", "_ANTIGENE"),
+    ("AMINOKW", "_AMINOACID"), ("DOWNREGKW", "_DOWNREGULATION"),
+    ("UPREGKW", "_UPREGULATION")]
 
 # Load the dictionaries that we need
 merged_genes_dict = load_dict("merged_genes")
@@ -129,6 +67,7 @@ long_names_dict = load_dict("long_names")
 inverted_long_names = load_dict("inverted_long_names")
 hpoterms_with_gene = load_dict("hpoterms_with_gene")
 stopwords_dict = load_dict("stopwords")
+keyword_tagger = get_keyword_tagger(GENE_KEYWORD_DICTS)
 
 
 # Add features to a gene mention candidate
@@ -142,11 +81,12 @@ def add_features(mention_id, mention_words, sentence):
             if word2.lemma.isalpha() and re.search('^VB[A-Z]*$', word2.pos) \
                     and word2.lemma != 'be':
                 # Ignoring "be" comes from pharm (Emily)
-                (p, l) = sentence.get_word_dep_path(
+                l = sentence.get_word_dep_distance(
                     word.in_sent_idx, word2.in_sent_idx)
                 if l < minl:
                   minl = l
-                  minp = p
+                  (minp, l) = sentence.get_word_dep_path(
+                      word.in_sent_idx, word2.in_sent_idx)
                   minw = word2.lemma
     if minw:
         print_feature(
@@ -155,38 +95,27 @@ def add_features(mention_id, mention_words, sentence):
     minl = 100
     minp = None
     minw = None
+    keywords = []
+    for (begin, end, dict_ids) in keyword_tagger.tag(sentence):
+        kw = " ".join([w.lemma for w in sentence.words[begin:end]])
+        for (dict_id, name) in KEYWORD_NAMES:
+            if dict_id in dict_ids:
+                kw = name
+                break
+        keywords.append((begin, end, kw))
     for word in mention_words:
-        for word2 in sentence.words:
-            if word2.lemma in KEYWORDS:
-                (p, l) = sentence.get_word_dep_path(
-                    word.in_sent_idx, word2.in_sent_idx)
-                kw = word2.lemma
-                if word2.lemma in KNOCK_KWS:
-                    kw = "_KNOCKOUT"
-                elif word2.lemma in ANTIGENE_KWS:
-                    kw = "_ANTIGENE"
-                elif word2.lemma in AMINO_ACID_KWS:
-                    kw = "_AMINOACID"
-                # elif word2.lemma in DNA_KWS:
-                #    kw = "_DNA"
-                elif word2.lemma in DOWNREGULATION_KWS:
-                    kw = "_DOWNREGULATION"
-                elif word2.lemma in UPREGULATION_KWS:
-                    kw = "_UPREGULATION"
-                # elif word2.lemma in TUMOR_KWS:
-                #     kw = "_TUMOR"
-                # elif word2.lemma in GENE_KWS:
-                #     kw = "_GENE"
-                # elif word2.lemma in COEXPRESSION_KWS:
-                #    ke = "_COEXPRESSION"
-                if l < minl:
-                    minl = l
-                    minp = p
-                    minw = kw
-                if len(p) < 100:
-                    print_feature(
-                        sentence.doc_id, mention_id,
-                        "KEYWORD_[" + kw + "]" + p)
+        for (begin, end, kw) in keywords:
+            # The path goes to the word of the keyword closest to the mention
+            kw_idx = min(range(begin, end), key=lambda i:
+                         sentence.get_word_dep_distance(word.in_sent_idx, i))
+            (p, l) = sentence.get_word_dep_path(word.in_sent_idx, kw_idx)
+            if l < minl:
+                minl = l
+                minp = p
+                minw = kw
+            if len(p) < 100:
+                print_feature(
+                    sentence.doc_id, mention_id, "KEYWORD_[" + kw + "]" + p)
     # Special features for the keyword on the shortest dependency path
     if minw:
         print_feature(
@@ -206,11 +135,12 @@ def add_features(mention_id, mention_words, sentence):
         for word2 in sentence.words:
             if word2.in_sent_idx not in mention_wordidxs and \
                     word2.word in merged_genes_dict:
-                (p, l) = sentence.get_word_dep_path(
+                l = sentence.get_word_dep_distance(
                     word.in_sent_idx, word2.in_sent_idx)
                 if l < minl:
                     minl = l
-                    minp = p
+                    (minp, l) = sentence.get_word_dep_path(
+                        word.in_sent_idx, word2.in_sent_idx)
                     minw = word2.lemma
     if minw:
         print_feature(
@@ -310,6 +240,7 @@ def add_features(mention_id, mention_words, sentence):
 
 if __name__ == "__main__":
     # Process the input
+    sentence = None
     with fileinput.input() as input_files:
         for line in input_files:
             # Parse the TSV line
@@ -321,14 +252,20 @@ if __name__ == "__main__":
                     TSVstring2list, TSVstring2list, TSVstring2list,
                     TSVstring2list, lambda x: TSVstring2list(x, int),
                     no_op, lambda x: TSVstring2list(x, int)])
-            # Create the sentence object
-            null_list = [None, ] * len(line_dict["wordidxs"])
-            sentence = Sentence(
-                line_dict["doc_id"], line_dict["sent_id"],
-                line_dict["wordidxs"], line_dict["words"], line_dict["poses"],
-                line_dict["ners"], line_dict["lemmas"], line_dict["dep_paths"],
-                line_dict["dep_parents"], null_list)
-            if sentence.is_weird():
+            # Create the sentence object, unless the previous mention was in
+            # the same sentence: then reuse it, with its indexes and keywords
+            if sentence is None or \
+                    sentence.doc_id != line_dict["doc_id"] or \
+                    sentence.sent_id != line_dict["sent_id"]:
+                null_list = [None, ] * len(line_dict["wordidxs"])
+                sentence = Sentence(
+                    line_dict["doc_id"], line_dict["sent_id"],
+                    line_dict["wordidxs"], line_dict["words"],
+                    line_dict["poses"], line_dict["ners"],
+                    line_dict["lemmas"], line_dict["dep_paths"],
+                    line_dict["dep_parents"], null_list)
+                is_weird = sentence.is_weird()
+            if is_weird:
                 continue
             mention_words = []
             for mention_wordidx in line_dict["mention_wordidxs"]:
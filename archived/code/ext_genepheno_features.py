@@ -9,6 +9,26 @@ from helper.easierlife import get_dict_from_TSVline, TSVstring2list, no_op, \
 
 import ddlib
 
+# Lemmas that negate the word after them
+NEGATIONS = frozenset(["no", "not", "neither", "nor"])
+
+
+# The filtering of the brackets and commas is from Emily's code.
+def is_relation_verb(word):
+    return re.search('^VB[A-Z]*$', word.pos) and \
+        word.word not in ["{", "}", "(", ")", "[", "]"] and \
+        "," not in word.word
+
+
+# Classes of words indexed by position once per sentence (see
+# dstruct/PosIndex.py), so that each relation looks them up by range
+WORD_CLASSES = {
+    "VERB": is_relation_verb,
+    "NEG": lambda word: word.lemma in NEGATIONS,
+    "WHILE": lambda word: word.lemma == "while",
+    "WHEREAS": lambda word: word.lemma == "whereas",
+}
+
 
 def add_features_generic(relation_id, gene_words, pheno_words, sentence):
     # Use the generic feature library (ONLY!)
@@ -107,22 +127,22 @@ def add_features_few(relation, gene_mention, hpoterm_mention, sentence):
             min_path_g = None
             min_path_pos_g = None
             for wordidx in gene_mention.wordidxs:
-                (path, length) = sentence.get_word_dep_path(
+                length = sentence.get_word_dep_distance(
                     wordidx, sentence.words[i].in_sent_idx)
                 if length < min_len_g:
-                    min_path_g = path
-                    min_len_g = length
+                    (min_path_g, min_len_g) = sentence.get_word_dep_path(
+                        wordidx, sentence.words[i].in_sent_idx)
                     (min_path_pos_g, l) = sentence.get_word_dep_path(
                         wordidx, sentence.words[i].in_sent_idx, use_pos=True)
             min_len_h = 10000
             min_path_h = None
             min_path_pos_h = None
             for wordidx in hpoterm_mention.wordidxs:
-                (path, length) = sentence.get_word_dep_path(
+                length = sentence.get_word_dep_distance(
                     wordidx, sentence.words[i].in_sent_idx)
                 if length < min_len_h:
-                    min_path_h = path
-                    min_len_h = length
+                    (min_path_h, min_len_h) = sentence.get_word_dep_path(
+                        wordidx, sentence.words[i].in_sent_idx)
                     (min_path_pos_h, l) = sentence.get_word_dep_path(
                         wordidx, sentence.words[i].in_sent_idx, use_pos=True)
             if min_len_g < 5 and min_len_h < 5:
@@ -163,38 +183,31 @@ def add_features(relation_id, gene_words, pheno_words, sentence):
     minw_pheno = None
     mini_pheno = None
     neg_found = False
-    # Look all the words, as in the dependency path there could be words that
+    pos_index = sentence.get_pos_index(WORD_CLASSES)
+    # Look all the verbs, as in the dependency path there could be words that
     # are close to both mentions but not between them
-    for i in range(len(sentence.words)):
-        # The filtering of the brackets and commas is from Emily's code.
-        if re.search('^VB[A-Z]*$', sentence.words[i].pos) and \
-                sentence.words[i].word not in ["{", "}", "(", ")", "[", "]"] \
-                and "," not in sentence.words[i].word:
-            (p_gene, l_gene) = sentence.get_word_dep_path(
-                betw_start, sentence.words[i].in_sent_idx)
-            (p_pheno, l_pheno) = sentence.get_word_dep_path(
-                sentence.words[i].in_sent_idx, betw_end)
-            if l_gene < minl_gene:
-                minl_gene = l_gene
-                minp_gene = p_gene
-                minw_gene = sentence.words[i].lemma
-                mini_gene = sentence.words[i].in_sent_idx
-            if l_pheno < minl_pheno:
-                minl_pheno = l_pheno
-                #  minp_pheno = p_pheno
-                minw_pheno = sentence.words[i].lemma
-                mini_pheno = sentence.words[i].in_sent_idx
-            # Look for negation.
-            if i > 0 and sentence.words[i-1].lemma in \
-                    ["no", "not", "neither", "nor"]:
-                if i < betw_end - 2:
-                    neg_found = True
-                    print_feature(
-                        relation_id,
-                        inv + "NEG_VERB_[" + sentence.words[i-1].word + "]-" +
-                        sentence.words[i].lemma)
-            else:
-                verbs_between.append(sentence.words[i])
+    for i in pos_index.range("VERB"):
+        l_gene = sentence.get_word_dep_distance(betw_start, i)
+        l_pheno = sentence.get_word_dep_distance(i, betw_end)
+        if l_gene < minl_gene:
+            (minp_gene, minl_gene) = sentence.get_word_dep_path(betw_start, i)
+            minw_gene = sentence.words[i].lemma
+            mini_gene = i
+        if l_pheno < minl_pheno:
+            minl_pheno = l_pheno
+            #  minp_pheno = p_pheno
+            minw_pheno = sentence.words[i].lemma
+            mini_pheno = i
+        # Look for negation.
+        if pos_index.count("NEG", i - 1, i):
+            if i < betw_end - 2:
+                neg_found = True
+                print_feature(
+                    sentence.doc_id, relation_id,
+                    inv + "NEG_VERB_[" + sentence.words[i-1].word + "]-" +
+                    sentence.words[i].lemma)
+        else:
+            verbs_between.append(sentence.words[i])
     if len(verbs_between) == 1 and not neg_found:
         print_feature(
             sentence.doc_id, relation_id,
@@ -231,29 +244,26 @@ def add_features(relation_id, gene_words, pheno_words, sentence):
     # The following features are only added if the two mentions are "close
     # enough" to avoid overfitting. The concept of "close enough" is somewhat
     # arbitrary.
-    neg_word_index = -1
     if betw_end - betw_start - 1 < 8:
-        for i in range(betw_start+1, betw_end):
-            # Feature for separation between entities.
-            # TODO Think about merging these?
-            # I think these should be some kind of supervision rule instead?
-            if "while" == sentence.words[i].lemma:
-                print_feature(sentence.doc_id, relation_id, "SEP_BY_[while]")
-            if "whereas" == sentence.words[i].lemma:
-                print_feature(sentence.doc_id, relation_id, "SEP_BY_[whereas]")
-            if sentence.words[i].lemma in ["no", "not", "neither", "nor"]:
-                neg_word_index = i
+        # Feature for separation between entities.
+        # TODO Think about merging these?
+        # I think these should be some kind of supervision rule instead?
+        for i in pos_index.range("WHILE", betw_start + 1, betw_end):
+            print_feature(sentence.doc_id, relation_id, "SEP_BY_[while]")
+        for i in pos_index.range("WHEREAS", betw_start + 1, betw_end):
+            print_feature(sentence.doc_id, relation_id, "SEP_BY_[whereas]")
+        neg_word_index = pos_index.last("NEG", betw_start + 1, betw_end)
         # Features for the negative words
         # TODO: We would probably need distant supervision for these
-        if neg_word_index > -1:
+        if neg_word_index is not None:
             gene_p = None
             gene_l = 100
             for word in sentence.words[gene_start:gene_end+1]:
-                (p, l) = sentence.get_word_dep_path(
+                l = sentence.get_word_dep_distance(
                     word.in_sent_idx, neg_word_index)
                 if l < gene_l:
-                    gene_p = p
-                    gene_l = l
+                    (gene_p, gene_l) = sentence.get_word_dep_path(
+                        word.in_sent_idx, neg_word_index)
             if gene_p:
                 print_feature(
                     sentence.doc_id, relation_id, inv + "NEG_[" + gene_p + "]")
@@ -325,6 +335,7 @@ def add_features(relation_id, gene_words, pheno_words, sentence):
 
 if __name__ == "__main__":
     # Process the input
+    sentence = None
     with fileinput.input() as input_files:
         for line in input_files:
             # Parse the TSV line
@@ -337,14 +348,20 @@ if __name__ == "__main__":
                     TSVstring2list, lambda x: TSVstring2list(x, int),
                     no_op, lambda x: TSVstring2list(x, int), lambda x:
                     TSVstring2list(x, int)])
-            # Create the sentence object
-            null_list = [None, ] * len(line_dict["wordidxs"])
-            sentence = Sentence(
-                line_dict["doc_id"], line_dict["sent_id"],
-                line_dict["wordidxs"], line_dict["words"], line_dict["poses"],
-                line_dict["ners"], line_dict["lemmas"], line_dict["dep_paths"],
-                line_dict["dep_parents"], null_list)
-            if sentence.is_weird():
+            # Create the sentence object, unless the previous relation was in
+            # the same sentence: then reuse it, with its indexes
+            if sentence is None or \
+                    sentence.doc_id != line_dict["doc_id"] or \
+                    sentence.sent_id != line_dict["sent_id"]:
+                null_list = [None, ] * len(line_dict["wordidxs"])
+                sentence = Sentence(
+                    line_dict["doc_id"], line_dict["sent_id"],
+                    line_dict["wordidxs"], line_dict["words"],
+                    line_dict["poses"], line_dict["ners"],
+                    line_dict["lemmas"], line_dict["dep_paths"],
+                    line_dict["dep_parents"], null_list)
+                is_weird = sentence.is_weird()
+            if is_weird:
                 continue
             gene_words = []
             for gene_wordidx in line_dict["gene_wordidxs"]:
@@ -11,6 +11,7 @@ from dstruct.Sentence import Sentence
 from helper.easierlife import get_all_phrases_in_sentence, \
     get_dict_from_TSVline, TSVstring2list, no_op
 from helper.dictionaries import load_dict
+from helper.stem_index import MemoStemmer, StemSetIndex
 
 max_mention_length = 8  # This is somewhat arbitrary
 
@@ -36,9 +37,13 @@ stems = frozenset(stems)
 # sets of hpoterms whose name, without stopwords, gives origin to the
 # corresponding set of stems (as key)
 hpoterms_dict = load_dict("hpoterms")
+hpoterms_index = StemSetIndex(hpoterms_dict)
 
-# Initialize the stemmer
-stemmer = SnowballStemmer("english")
+# Initialize the stemmer (stems are kept per word, see helper/stem_index.py)
+stemmer = MemoStemmer(SnowballStemmer("english"))
+
+# Words made only of symbols, which have no stem in the HPO terms
+SYMBOLS_RE = re.compile("^(_|\W)+$")
 
 
 # Perform the supervision
@@ -98,27 +103,31 @@ def extract(sentence):
             for word in sentence.words[start:end]:
                 history.add(word.in_sent_idx)
             continue
-    # Iterate over each phrase of length at most max_mention_length
-    for start, end in get_all_phrases_in_sentence(sentence,
-                                                  max_mention_length):
-        should_continue = False
-        for i in range(start, end):
-            if i in history:
-                should_continue = True
-                break
-        if should_continue:
-            continue
-        phrase = " ".join([word.word for word in sentence.words[start:end]])
-        # The list of stems in the phrase (not from stopwords or symbols, and
-        # not already used for a mention)
-        phrase_stems = []
-        for word in sentence.words[start:end]:
-            if not re.match("^(_|\W)+$", word.word) and \
-                    (len(word.word) == 1 or
-                     word.lemma.casefold() not in stopwords_dict):
-                phrase_stems.append(word.stem)
-        phrase_stems_set = frozenset(phrase_stems)
-        if phrase_stems_set in hpoterms_dict:
+    # The stems of the words that count for the HPO terms (not stopwords or
+    # symbols), None for the others
+    stems = []
+    for word in sentence.words:
+        if not SYMBOLS_RE.match(word.word) and \
+                (len(word.word) == 1 or
+                 word.lemma.casefold() not in stopwords_dict):
+            stems.append(word.stem)
+        else:
+            stems.append(None)
+    # Iterate over each phrase of length at most max_mention_length whose
+    # stems are an HPO term, longest first for each start (the same phrases
+    # as get_all_phrases_in_sentence, which leaves out the last word)
+    for start in range(len(sentence.words)):
+        last = min(len(sentence.words) - 1, start + max_mention_length)
+        for end, phrase_stems_set in hpoterms_index.matches(stems, start,
+                                                            last):
+            # Skip the phrases with words already used for a mention
+            should_continue = False
+            for i in range(start, end):
+                if i in history:
+                    should_continue = True
+                    break
+            if should_continue:
+                continue
             # Find the word objects of that match
             mention_words = []
             mention_lemmas = []
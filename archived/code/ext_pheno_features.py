@@ -6,17 +6,23 @@ import re
 from dstruct.Sentence import Sentence
 from helper.easierlife import get_dict_from_TSVline, TSVstring2list, no_op, \
     print_feature, BASE_DIR
+from helper.feature_keywords import PHENO_KEYWORD_DICTS, get_keyword_tagger
 
 import ddlib
 
+ddlib_dicts_loaded = False
+
 
 def add_features_generic(mention_id, pheno_words, sentence):
     # Use the generic feature library (ONLY!)
 
-    # Load dictionaries for keywords
-    ddlib.load_dictionary(BASE_DIR + "/dicts/features/pheno_var.tsv",  "VARKW")
-    ddlib.load_dictionary(
-        BASE_DIR + "/dicts/features/pheno_patient.tsv",  "PATIENTKW")
+    # Load dictionaries for keywords, the first time only
+    global ddlib_dicts_loaded
+    if not ddlib_dicts_loaded:
+        for (dict_id, filename) in PHENO_KEYWORD_DICTS:
+            ddlib.load_dictionary(
+                BASE_DIR + "/dicts/features/" + filename, dict_id)
+        ddlib_dicts_loaded = True
 
     # Create the objects used by ddlib. ddlib interface is so ugly.
     obj = dict()
@@ -111,20 +117,26 @@ def add_features(mention_id, mention_words, sentence):
     minl = 100
     minp = None
     minw = None
+    keywords = []
+    for (begin, end, dict_ids) in keyword_tagger.tag(sentence):
+        kw = " ".join([w.lemma for w in sentence.words[begin:end]])
+        for (dict_id, name) in KEYWORD_NAMES:
+            if dict_id in dict_ids:
+                kw = name
+                break
+        keywords.append((begin, end, kw))
     for word in mention_words:
-        for word2 in sentence.words:
-            if word2.lemma in KEYWORDS:
-                (p, l) = sentence.get_word_dep_path(
-                    word.in_sent_idx, word2.in_sent_idx)
-                kw = word2.lemma
-                if word2.lemma in PATIENT_KWS:
-                    kw = "_HUMAN"
-                print_feature(
-                    sentence.doc_id, mention_id, "KEYWORD_[" + kw + "]" + p)
-                if l < minl:
-                    minl = l
-                    minp = p
-                    minw = kw
+        for (begin, end, kw) in keywords:
+            # The path goes to the word of the keyword closest to the mention
+            kw_idx = min(range(begin, end), key=lambda i:
+                         sentence.get_word_dep_distance(word.in_sent_idx, i))
+            (p, l) = sentence.get_word_dep_path(word.in_sent_idx, kw_idx)
+            print_feature(
+                sentence.doc_id, mention_id, "KEYWORD_[" + kw + "]" + p)
+            if l < minl:
+                minl = l
+                minp = p
+                minw = kw
     # Special feature for the keyword on the shortest dependency path
     if minw:
         print_feature(
@@ -140,35 +152,28 @@ def add_features(mention_id, mention_words, sentence):
         for word2 in sentence.words:
             if word2.word.isalpha() and re.search('^VB[A-Z]*$', word2.pos) \
                     and word2.lemma != 'be':
-                (p, l) = sentence.get_word_dep_path(
+                l = sentence.get_word_dep_distance(
                     word.in_sent_idx, word2.in_sent_idx)
                 if l < minl:
                     minl = l
-                    minp = p
+                    (minp, l) = sentence.get_word_dep_path(
+                        word.in_sent_idx, word2.in_sent_idx)
                     minw = word2.lemma
         if minw:
             print_feature(
                 sentence.doc_id, mention_id, 'VERB_[' + minw + ']' + minp)
 
 
-# Keyword that seems to appear with phenotypes
-VAR_KWS = frozenset([
-    "abnormality", "affect", "apoptosis", "association", "cancer", "carcinoma",
-    "case", "cell", "chemotherapy", "clinic", "clinical", "chromosome",
-    "cronic", "deletion", "detection", "diagnose", "diagnosis", "disease",
-    "drug", "family", "gene", "genome", "genomic", "genotype", "give", "grade",
-    "group", "history", "infection", "inflammatory", "injury", "mutation",
-    "pathway", "phenotype", "polymorphism", "prevalence", "protein", "risk",
-    "severe", "stage", "symptom", "syndrome", "therapy", "therapeutic",
-    "treat", "treatment", "variant" "viruses", "virus"])
+# Keyword features use these names for the keywords in these dictionaries, and
+# the keyword itself otherwise
+KEYWORD_NAMES = [("PATIENTKW", "_HUMAN")]
 
-PATIENT_KWS = frozenset(
-    ["boy", "girl", "man", "woman", "men", "women", "patient", "patients"])
+keyword_tagger = get_keyword_tagger(PHENO_KEYWORD_DICTS)
 
-KEYWORDS = VAR_KWS | PATIENT_KWS
 
 if __name__ == "__main__":
     # Process the input
+    sentence = None
     with fileinput.input() as input_files:
         for line in input_files:
             # Parse the TSV line
@@ -180,14 +185,20 @@ if __name__ == "__main__":
                     TSVstring2list, TSVstring2list, TSVstring2list,
                     TSVstring2list, lambda x: TSVstring2list(x, int),
                     no_op, lambda x: TSVstring2list(x, int)])
-            # Create the sentence object
-            null_list = [None, ] * len(line_dict["wordidxs"])
-            sentence = Sentence(
-                line_dict["doc_id"], line_dict["sent_id"],
-                line_dict["wordidxs"], line_dict["words"], line_dict["poses"],
-                line_dict["ners"], line_dict["lemmas"], line_dict["dep_paths"],
-                line_dict["dep_parents"], null_list)
-            if sentence.is_weird():
+            # Create the sentence object, unless the previous mention was in
+            # the same sentence: then reuse it, with its indexes and keywords
+            if sentence is None or \
+                    sentence.doc_id != line_dict["doc_id"] or \
+                    sentence.sent_id != line_dict["sent_id"]:
+                null_list = [None, ] * len(line_dict["wordidxs"])
+                sentence = Sentence(
+                    line_dict["doc_id"], line_dict["sent_id"],
+                    line_dict["wordidxs"], line_dict["words"],
+                    line_dict["poses"], line_dict["ners"],
+                    line_dict["lemmas"], line_dict["dep_paths"],
+                    line_dict["dep_parents"], null_list)
+                is_weird = sentence.is_weird()
+            if is_weird:
                 continue
             mention_words = []
             for mention_wordidx in line_dict["mention_wordidxs"]:
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+""" Keyword dictionaries for the mention features
+
+The keyword dictionaries in dicts/features/ are loaded once per process into
+a single trie over lemmas, so that the keywords of all the dictionaries are
+found with one pass over the sentence, instead of looking up every phrase of
+the sentence in every dictionary for every mention.
+"""
+
+from helper.easierlife import BASE_DIR
+
+# (dictionary id, file in dicts/features/) of the keyword dictionaries used
+# for gene mentions and phenotype mentions, in order of precedence
+GENE_KEYWORD_DICTS = [
+    ("VARKW", "gene_var.tsv"),
+    ("KNOCKKW", "gene_knock.tsv"),
+    ("AMINOKW", "gene_amino.tsv"),
+    ("ANTIGENEKW", "gene_antigene.tsv"),
+    ("DNAKW", "gene_dna.tsv"),
+    ("DOWNREGKW", "gene_downregulation.tsv"),
+    ("UPREGKW", "gene_upregulation.tsv"),
+    ("TUMORKW", "gene_tumor.tsv"),
+    ("GENEKW", "gene_gene.tsv"),
+    ("EXPRESSKW", "gene_expression.tsv"),
+]
+
+PHENO_KEYWORD_DICTS = [
+    ("VARKW", "pheno_var.tsv"),
+    ("PATIENTKW", "pheno_patient.tsv"),
+]
+
+
+# Find the keywords of a set of dictionaries in sentences
+class KeywordTagger(object):
+
+    dicts = []
+    max_length = 0
+
+    def __init__(self, dicts):
+        self.dicts = dicts
+        # Each node maps a lemma to the next node. The dictionary ids of the
+        # keywords ending at a node are stored under the key None.
+        self._trie = dict()
+        self.max_length = 0
+        for (dict_id, filename) in dicts:
+            with open(BASE_DIR + "/dicts/features/" + filename, 'rt') as f:
+                for line in f:
+                    lemmas = line.strip().split(" ")
+                    if lemmas == [""]:
+                        continue
+                    node = self._trie
+                    for lemma in lemmas:
+                        node = node.setdefault(lemma, dict())
+                    dict_ids = node.setdefault(None, [])
+                    if dict_id not in dict_ids:
+                        dict_ids.append(dict_id)
+                    self.max_length = max(self.max_length, len(lemmas))
+        self._last_sentence = None
+        self._last_tags = None
+
+    # Return the keywords in the sentence as a list of (begin, end, dict_ids)
+    # triples, one for each phrase sentence.words[begin:end] that is in at
+    # least one dictionary, sorted by begin and then by end. dict_ids is in
+    # the order of the dictionaries given to the constructor. The result for
+    # the last sentence is kept, so the mentions of the same sentence share it.
+    def tag(self, sentence):
+        if sentence is self._last_sentence:
+            return self._last_tags
+        tags = []
+        words = sentence.words
+        for begin in range(len(words)):
+            node = self._trie
+            end = begin
+            while end < len(words) and end - begin < self.max_length:
+                node = node.get(words[end].lemma)
+                if node is None:
+                    break
+                end += 1
+                if None in node:
+                    tags.append((begin, end, node[None]))
+        self._last_sentence = sentence
+        self._last_tags = tags
+        return tags
+
+
+_taggers = dict()
+
+
+# Return the KeywordTagger for the given dictionaries, loading them the first
+# time
+def get_keyword_tagger(dicts):
+    key = tuple(dicts)
+    if key not in _taggers:
+        _taggers[key] = KeywordTagger(dicts)
+    return _taggers[key]
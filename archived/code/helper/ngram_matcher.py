@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+""" Find the phrases of a dictionary in a sentence
+
+Looking up every phrase of a sentence (up to some length) in a dictionary of
+phrases means joining the words of each of them into a string, which is
+quadratic in the length of the sentence. Instead, the phrases of the
+dictionaries are split into tokens, the tokens are numbered, and each phrase
+is stored under a polynomial hash of its token ids. The hashes of the
+prefixes of the sentence are computed once, which gives the hash of any
+phrase of the sentence in constant time, and only the phrases as long as a
+phrase of the dictionaries and made of tokens of the dictionaries are
+looked up. The token ids of a phrase with the same hash are compared before
+reporting it, so collisions do not matter.
+"""
+
+# Hash of a sequence of ids: sum of id * BASE^(position from the end), modulo
+# the prime MODULUS
+BASE = 1000003
+MODULUS = (1 << 61) - 1
+
+
+class NgramMatcher(object):
+
+    # phrases is an iterable of strings; their tokens are separated by single
+    # spaces, so that a phrase matches a sequence of tokens if and only if it
+    # is " ".join() of them
+    def __init__(self, phrases):
+        self._ids = dict()
+        # (length, hash) -> list of (token ids, phrase)
+        self._table = dict()
+        lengths = set()
+        for phrase in set(phrases):
+            ids = []
+            for token in phrase.split(" "):
+                if token not in self._ids:
+                    self._ids[token] = len(self._ids) + 1
+                ids.append(self._ids[token])
+            key = (len(ids), self._hash(ids))
+            self._table.setdefault(key, []).append((ids, phrase))
+            lengths.add(len(ids))
+        # Longest first, so that the phrases starting at a token come out
+        # longest first
+        self.lengths = sorted(lengths, reverse=True)
+        self._powers = [1]
+        for _ in range(max(lengths) if lengths else 0):
+            self._powers.append(self._powers[-1] * BASE % MODULUS)
+
+    def _hash(self, ids):
+        h = 0
+        for token_id in ids:
+            h = (h * BASE + token_id) % MODULUS
+        return h
+
+    # Return the phrases of the dictionary in tokens as a list of (start, end,
+    # phrase) triples, one for each tokens[start:end] that is " ".join() of a
+    # phrase, sorted by start and then by decreasing end.
+    def find(self, tokens):
+        ids = [self._ids.get(token, 0) for token in tokens]
+        # prefix[i] is the hash of ids[:i]
+        prefix = [0]
+        for token_id in ids:
+            prefix.append((prefix[-1] * BASE + token_id) % MODULUS)
+        # known[i] is the number of tokens from i on that are in the
+        # dictionary, the longest phrase that can start at i
+        known = [0] * (len(ids) + 1)
+        for i in range(len(ids) - 1, -1, -1):
+            if ids[i]:
+                known[i] = known[i + 1] + 1
+        found = []
+        for start in range(len(ids)):
+            for length in self.lengths:
+                if length > known[start]:
+                    continue
+                end = start + length
+                h = (prefix[end] - prefix[start] * self._powers[length]) % \
+                    MODULUS
+                entries = self._table.get((length, h))
+                if entries is None:
+                    continue
+                window = ids[start:end]
+                for (phrase_ids, phrase) in entries:
+                    if phrase_ids == window:
+                        found.append((start, end, phrase))
+        return found
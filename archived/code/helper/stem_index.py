@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+""" Stem-based lookup of HPO terms in sentences
+
+The stems of the words are memoised per distinct word, since stemming is the
+most expensive step per word and the same words come back in every
+sentence. The HPO terms (the 'hpoterms' dictionary, stem sets to names) are
+indexed by stem, so that the phrases of a sentence whose stems are an HPO
+term are found by following the terms that have all the stems seen so far,
+instead of building the stem set of every phrase and looking it up.
+"""
+
+# Number of words whose stems are kept; the memo is emptied when it is full
+MAX_STEM_CACHE = 100000
+
+
+# A stemmer that remembers the stems of the last (at most max_size) words
+class MemoStemmer(object):
+
+    def __init__(self, stemmer, max_size=MAX_STEM_CACHE):
+        self.stemmer = stemmer
+        self.max_size = max_size
+        self._stems = dict()
+
+    def stem(self, word):
+        stem = self._stems.get(word)
+        if stem is None:
+            stem = self.stemmer.stem(word)
+            if len(self._stems) >= self.max_size:
+                self._stems.clear()
+            self._stems[word] = stem
+        return stem
+
+
+# Inverted index from stem to the stem sets (keys of the 'hpoterms'
+# dictionary) that have it
+class StemSetIndex(object):
+
+    def __init__(self, stem_sets):
+        index = dict()
+        for stem_set in stem_sets:
+            for stem in stem_set:
+                index.setdefault(stem, set()).add(stem_set)
+        self._index = dict((stem, frozenset(sets)) for stem, sets in
+                           index.items())
+
+    # Return the phrases sentence.words[start:end], start < end <= last,
+    # whose set of stems is one of the stem sets, as a list of (end, stem
+    # set) pairs, longest phrase first. stems has the stem of each word of
+    # the sentence, or None for the words that do not count (stopwords,
+    # symbols). A stem set stays a candidate while it has all the stems of
+    # the phrase, and matches when the phrase has as many distinct stems as
+    # it has, so the phrases are extended only while some candidate is left.
+    def matches(self, stems, start, last):
+        found = []
+        phrase_stems = set()
+        candidates = None
+        match = None
+        for end in range(start + 1, last + 1):
+            stem = stems[end - 1]
+            if stem is not None and stem not in phrase_stems:
+                phrase_stems.add(stem)
+                stem_sets = self._index.get(stem)
+                if stem_sets is None:
+                    break
+                if candidates is None:
+                    candidates = stem_sets
+                else:
+                    candidates = candidates & stem_sets
+                    if not candidates:
+                        break
+                key = frozenset(phrase_stems)
+                match = key if key in candidates else None
+            if match is not None:
+                found.append((end, match))
+        found.reverse()
+        return found
@@ -6,9 +6,8 @@ def init():
   ddext.input('doc_id', 'text')
   ddext.input('sent_id', 'int')
   ddext.input('words', 'text[]')
-  ddext.input('lemmas', 'text[]')
-  ddext.input('poses', 'text[]')
-  ddext.input('ners', 'text[]')
+  # only read for two-letter words; see code/util/lazy_arrays.py
+  ddext.input('ners', 'text')
 
   ddext.returns('doc_id', 'text')
   ddext.returns('sent_id', 'int')
@@ -18,78 +17,70 @@ def init():
   ddext.returns('entity', 'text')
   ddext.returns('words', 'text[]')
   ddext.returns('is_correct', 'boolean')
+  ddext.returns('lexicon_version', 'text')
 
 
-def run(doc_id, sent_id, words, lemmas, poses, ners):
+def run(doc_id, sent_id, words, ners):
 
   # TODO: currently we match only gene symbols and not phrases; consider matching phrases.
 
-  if 'genes' in SD:
-    genes = SD['genes']
+  if 'lexicon_module' in SD:
+    lexicon_module = SD['lexicon_module']
+    lexicon_registry = SD['lexicon_registry']
+    lazy_arrays = SD['lazy_arrays']
+    row_budget = SD['row_budget']
   else:
     import os
+    import sys
     APP_HOME = os.environ['DD_GENOMICS_HOME']
-    details = {}
-    all_names = set()
-    all_synonyms = set()
-    en_words = set([x.strip().lower() for x in open('%s/dicts/english_words.tsv' % APP_HOME)])
-    gene_english = set([x.strip().lower() for x in open('%s/onto/manual/gene_english.tsv' % APP_HOME)])
-    gene_bigrams = set([x.strip().lower() for x in open('%s/onto/manual/gene_bigrams.tsv' % APP_HOME)])
-    gene_noisy = set([x.strip().lower() for x in open('%s/onto/manual/gene_noisy.tsv' % APP_HOME)])
-    gene_exclude = set([x.strip().lower() for x in open('%s/onto/manual/gene_exclude.tsv' % APP_HOME)])
-    SD['english'] = en_words
-    for line in open('%s/onto/data/genes.tsv' % APP_HOME):
-      #plpy.info(line)
-      name, synonyms, full_names = line.strip(' \r\n').split('\t')
-      synonyms = set(synonyms.split('|'))
-      synonyms.discard(name)
-      full_names = set(full_names.split('|'))
-      all_names.add(name)
-      all_synonyms |= synonyms
-      details[name] = {
-        'syn': synonyms,
-        'full': full_names
-      }
-    all_names -= gene_exclude
-    all_synonyms -= all_names
-    all_synonyms -= gene_exclude
-    genes = {
-      'details': details,
-      'names': all_names,
-      'synonyms': all_synonyms,
-      'names_lower': {x.lower(): x for x in all_names},
-      'synonyms_lower': {x.lower(): x for x in all_synonyms},
-      'exact_lower': set(x.lower() for x in gene_english | gene_bigrams | gene_noisy),
-    }
-    SD['genes'] = genes
+    sys.path.append('%s/code/util' % APP_HOME)
+    import lazy_arrays
+    import lexicon as lexicon_module
+    import lexicon_registry
+    import row_budget
+    SD['lazy_arrays'] = lazy_arrays
+    SD['row_budget'] = row_budget
+    SD['lexicon_module'] = lexicon_module
+    SD['lexicon_registry'] = lexicon_registry
 
+  # gene symbols and synonyms, compiled by onto/compile_lexicon.py, reloaded
+  # when it changes; see code/util/lexicon_registry.py
+  lexicon, lexicon_version = lexicon_registry.get_registry(SD).get(
+    'gene_mentions', lexicon_module.GENE_FILES, lexicon_module.load_lexicon)
+
+  ners = lazy_arrays.array(ners)
+
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, 'gene_mentions')
+  if not budget.start(doc_id, sent_id, len(words)):
+    return
+
+  mentions = []
   for i in xrange(len(words)):
+    if budget.exceeded():
+      return
     word = words[i]
 
     if len(word) == 1:
       continue
 
-    iword = word.lower()
-
-    match_type = None
-    if word in genes['names']:
-      match_type = 'NAME'
-    elif word in genes['synonyms']:
-      match_type = 'SYN'
+    entry = lexicon.get(word.lower())
+    if entry is None:
+      continue
 
+    match_type = entry.exact.get(word)
     if match_type:
       entity = word
+    elif entry.bits & lexicon_module.GENE_ENGLISH:
+      continue
+    elif entry.bits & lexicon_module.GENE_NAME:
+      match_type = 'iNAME'
+      entity = entry.gene
+    elif entry.bits & lexicon_module.GENE_SYN:
+      match_type = 'iSYN'
+      entity = entry.gene
     else:
-      if iword in genes['exact_lower']:
-        continue
-      elif iword in genes['names_lower']:
-        match_type = 'iNAME'
-        entity = genes['names_lower'][iword]
-      elif iword in genes['synonyms_lower']:
-        match_type = 'iSYN'
-        entity = genes['synonyms_lower'][iword]
-      else:
-        continue
+      continue
 
     truth = True
 
@@ -105,4 +96,7 @@ def run(doc_id, sent_id, words, lemmas, poses, ners):
         truth = None
 
     mid = '%s_%s_%d_1' % (doc_id, sent_id, i)
-    yield doc_id, sent_id, [i], mid, match_type, entity, [word], truth
+    mentions.append((doc_id, sent_id, [i], mid, match_type, entity, [word], truth, lexicon_version))
+
+  for mention in mentions:
+    yield mention
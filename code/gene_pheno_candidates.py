@@ -0,0 +1,70 @@
+import ddext
+from ddext import SD
+
+
+def init():
+  ddext.input('doc_id', 'text')
+  ddext.input('sent_id', 'int')
+  ddext.input('mention_ids_1', 'text[]')
+  ddext.input('starts_1', 'int[]')
+  ddext.input('ends_1', 'int[]')
+  ddext.input('mention_ids_2', 'text[]')
+  ddext.input('starts_2', 'int[]')
+  ddext.input('ends_2', 'int[]')
+
+  ddext.returns('doc_id', 'text')
+  ddext.returns('sent_id', 'int')
+  ddext.returns('mention_id_1', 'text')
+  ddext.returns('mention_id_2', 'text')
+  ddext.returns('distance', 'int')
+  ddext.returns('pruned_by', 'text')
+
+
+def run(doc_id, sent_id, mention_ids_1, starts_1, ends_1, mention_ids_2, starts_2, ends_2):
+
+  if 'settings' in SD:
+    settings = SD['settings']
+    row_budget = SD['row_budget']
+  else:
+    import os
+    import sys
+    APP_HOME = os.environ['DD_GENOMICS_HOME']
+    sys.path.append('%s/code/util' % APP_HOME)
+    import extractor_settings as settings
+    import row_budget
+    SD['settings'] = settings
+    SD['row_budget'] = row_budget
+
+  # mention ids repeat when a phrase matches several dictionary entries
+  genes = sorted(set(zip(starts_1, ends_1, mention_ids_1)))
+  phenos = sorted(set(zip(starts_2, ends_2, mention_ids_2)))
+
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, 'gene_pheno_candidates')
+  if not budget.start(doc_id, sent_id, len(genes) * len(phenos)):
+    return
+
+  pairs = []
+  for gs, ge, gid in genes:
+    if budget.exceeded():
+      return
+    for ps, pe, pid in phenos:
+      if (gs, ge) == (ps, pe):
+        continue
+      distance = max(0, max(gs, ps) - min(ge, pe) - 1)
+      pairs.append((distance, gs, ps, gid, pid))
+  pairs.sort()
+
+  max_distance = settings.PAIR_MAX_DISTANCE
+  max_pairs = settings.PAIR_MAX_PER_SENTENCE
+
+  kept = 0
+  for distance, gs, ps, gid, pid in pairs:
+    if max_distance is not None and distance > max_distance:
+      pruned_by = 'distance'
+    elif max_pairs is not None and kept >= max_pairs:
+      pruned_by = 'cap'
+    else:
+      pruned_by = None
+      kept += 1
+    yield doc_id, sent_id, gid, pid, distance, pruned_by
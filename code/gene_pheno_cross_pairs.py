@@ -0,0 +1,110 @@
+import ddext
+from ddext import SD
+
+
+def init():
+  ddext.input('doc_id', 'text')
+  ddext.input('sent_ids_1', 'int[]')
+  ddext.input('mention_ids_1', 'text[]')
+  ddext.input('starts_1', 'int[]')
+  ddext.input('ends_1', 'int[]')
+  ddext.input('words_1', 'text[]')
+  ddext.input('entities_1', 'text[]')
+  ddext.input('correct_1', 'boolean[]')
+  ddext.input('sent_ids_2', 'int[]')
+  ddext.input('mention_ids_2', 'text[]')
+  ddext.input('starts_2', 'int[]')
+  ddext.input('ends_2', 'int[]')
+  ddext.input('words_2', 'text[]')
+  ddext.input('entities_2', 'text[]')
+  ddext.input('correct_2', 'boolean[]')
+
+  ddext.returns('doc_id', 'text')
+  ddext.returns('sent_id_1', 'int')
+  ddext.returns('sent_id_2', 'int')
+  ddext.returns('relation_id', 'text')
+  ddext.returns('type', 'text')
+  ddext.returns('mention_id_1', 'text')
+  ddext.returns('mention_id_2', 'text')
+  ddext.returns('wordidxs_1', 'int[]')
+  ddext.returns('wordidxs_2', 'int[]')
+  ddext.returns('words_1', 'text[]')
+  ddext.returns('words_2', 'text[]')
+  ddext.returns('entity_1', 'text')
+  ddext.returns('entity_2', 'text')
+  ddext.returns('is_correct', 'boolean')
+
+
+def run(doc_id, sent_ids_1, mention_ids_1, starts_1, ends_1, words_1, entities_1, correct_1, sent_ids_2, mention_ids_2, starts_2, ends_2, words_2, entities_2, correct_2):
+
+  # Pairs gene and phenotype mentions of one document that are in different
+  # sentences at most PAIR_SENTENCE_WINDOW apart (same-sentence pairs come
+  # from gene_pheno_pairs).  Both mention lists are sorted by sentence and
+  # swept together, so the cost is linear in mentions times window rather
+  # than in genes times phenotypes.
+
+  if 'pos_pairs' in SD:
+    pos_pairs = SD['pos_pairs']
+    relation_id = SD['relation_id']
+    supervise = SD['supervise']
+    window = SD['window']
+    row_budget = SD['row_budget']
+  else:
+    import os
+    import sys
+    APP_HOME = os.environ['DD_GENOMICS_HOME']
+    sys.path.append('%s/code/util' % APP_HOME)
+    from pair_supervision import load_pos_pairs, relation_id, supervise
+    from extractor_settings import PAIR_SENTENCE_WINDOW as window
+    import row_budget
+    SD['pos_pairs'] = pos_pairs = load_pos_pairs(APP_HOME)
+    SD['relation_id'] = relation_id
+    SD['supervise'] = supervise
+    SD['window'] = window
+    SD['row_budget'] = row_budget
+
+  if not window:
+    return
+
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, 'gene_pheno_cross_pairs')
+  if not budget.start(doc_id, None, len(mention_ids_1) + len(mention_ids_2)):
+    return
+
+  genes = sorted(zip(sent_ids_1, starts_1, ends_1, mention_ids_1, words_1, entities_1, correct_1))
+  phenos = sorted(zip(sent_ids_2, starts_2, ends_2, mention_ids_2, words_2, entities_2, correct_2))
+
+  relations = []
+  lo = 0
+  for g_sent, g_start, g_end, g_mid, g_words, g_entity, g_correct in genes:
+    if budget.exceeded():
+      return
+    # genes are sorted by sentence, so the window's lower edge only moves right
+    while lo < len(phenos) and phenos[lo][0] < g_sent - window:
+      lo += 1
+    j = lo
+    while j < len(phenos) and phenos[j][0] <= g_sent + window:
+      p_sent, p_start, p_end, p_mid, p_words, p_entity, p_correct = phenos[j]
+      j += 1
+      if p_sent == g_sent:
+        continue
+      wordidxs_1 = range(g_start, g_end + 1)
+      wordidxs_2 = range(p_start, p_end + 1)
+      relations.append((doc_id,
+            g_sent,
+            p_sent,
+            relation_id(doc_id, g_sent, wordidxs_1, p_sent, wordidxs_2),
+            None,
+            g_mid,
+            p_mid,
+            wordidxs_1,
+            wordidxs_2,
+            g_words.split('|^|'),
+            p_words.split('|^|'),
+            g_entity,
+            p_entity,
+            supervise(g_entity, g_correct, p_entity, p_correct, pos_pairs)
+            ))
+
+  for relation in relations:
+    yield relation
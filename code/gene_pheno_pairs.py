@@ -9,14 +9,12 @@ def init():
   ddext.input('wordidxs_1', 'int[]')
   ddext.input('words_1', 'text[]')
   ddext.input('entity_1', 'text')
-  ddext.input('type_1', 'text')
   ddext.input('correct_1', 'boolean')
   ddext.input('sent_id_2', 'int')
   ddext.input('mention_id_2', 'text')
   ddext.input('wordidxs_2', 'int[]')
   ddext.input('words_2', 'text[]')
   ddext.input('entity_2', 'text')
-  ddext.input('type_2', 'text')
   ddext.input('correct_2', 'boolean')
 
   ddext.returns('doc_id', 'text')
@@ -35,32 +33,24 @@ def init():
   ddext.returns('is_correct', 'boolean')
 
 
-def run(doc_id, sent_id_1, mention_id_1, wordidxs_1, words_1, entity_1, mtype_1, correct_1, sent_id_2, mention_id_2, wordidxs_2, words_2, entity_2, mtype_2, correct_2):
+def run(doc_id, sent_id_1, mention_id_1, wordidxs_1, words_1, entity_1, correct_1, sent_id_2, mention_id_2, wordidxs_2, words_2, entity_2, correct_2):
 
   if 'pos_pairs' in SD:
     pos_pairs = SD['pos_pairs']
+    relation_id = SD['relation_id']
+    supervise = SD['supervise']
   else:
     import os
+    import sys
     APP_HOME = os.environ['DD_GENOMICS_HOME']
-    pos_pairs = set()
-    gpheno = [x.strip().split('\t') for x in open('%s/onto/data/hpo_phenotype_genes.tsv' % APP_HOME)]
-    gdisease = [x.strip().split('\t') for x in open('%s/onto/data/hpo_disease_genes.tsv' % APP_HOME)]
-    for pheno, gene in gpheno + gdisease:
-      pos_pairs.add((gene, pheno))
-    SD['pos_pairs'] = pos_pairs
+    sys.path.append('%s/code/util' % APP_HOME)
+    from pair_supervision import load_pos_pairs, relation_id, supervise
+    SD['pos_pairs'] = pos_pairs = load_pos_pairs(APP_HOME)
+    SD['relation_id'] = relation_id
+    SD['supervise'] = supervise
 
-  rid = '%s_%s_g%s_p%s' % (doc_id, sent_id_1, 
-    '%d:%d' % (wordidxs_1[0], wordidxs_1[-1]),
-    '%d:%d' % (wordidxs_2[0], wordidxs_2[-1]),
-    )
-  truth = None
-  if correct_1 and correct_2:
-    gene = entity_1
-    for pheno in entity_2.split()[0].split('|'):
-      if (gene, pheno) in pos_pairs:
-        truth = True
-  elif correct_1 is False or correct_2 is False:
-    truth = False
+  rid = relation_id(doc_id, sent_id_1, wordidxs_1, sent_id_2, wordidxs_2)
+  truth = supervise(entity_1, correct_1, entity_2, correct_2, pos_pairs)
 
   yield (doc_id,
         sent_id_1,
@@ -1,24 +1,87 @@
 import ddext
+from ddext import SD
 
 
 def init():
   ddext.input('doc_id', 'text')
   ddext.input('sent_id', 'int')
-  ddext.input('words', 'text[]')
-  ddext.input('lemmas', 'text[]')
-  ddext.input('poses', 'text[]')
-  ddext.input('ners', 'text[]')
-  ddext.input('dep_paths', 'text[]')
-  ddext.input('dep_parents', 'int[]')
+  # sentence arrays as delimited strings, only split for the first mention
+  # of a sentence (see code/util/lazy_arrays.py)
+  ddext.input('words', 'text')
+  ddext.input('lemmas', 'text')
+  ddext.input('poses', 'text')
+  ddext.input('dep_paths', 'text')
+  ddext.input('dep_parents', 'text')
   ddext.input('mention_id', 'text')
   ddext.input('wordidxs', 'int[]')
+  ddext.input('extractor', 'text')
+  # start of the run, in feature_cache_runs (see code/util/feature_profile.py)
+  ddext.input('run_started', 'text')
+  ddext.input('cached_features', 'text[]')
 
   ddext.returns('doc_id', 'text')
   ddext.returns('mention_id', 'text')
   ddext.returns('feature', 'text')
 
 
-def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, mention_id, wordidxs):
+def run(doc_id, sent_id, words, lemmas, poses, dep_paths, dep_parents, mention_id, wordidxs, extractor, run_started, cached_features):
+  # features of the same sentence content and span(s) from feature_cache
+  if cached_features is not None:
+    for feature in cached_features:
+      yield doc_id, mention_id, feature
+    return
+
+  if 'settings' in SD:
+    settings = SD['settings']
+    generic_features = SD['generic_features']
+    lazy_arrays = SD['lazy_arrays']
+    row_budget = SD['row_budget']
+    feature_profile = SD['feature_profile']
+  else:
+    import os
+    import sys
+    APP_HOME = os.environ['DD_GENOMICS_HOME']
+    sys.path.append('%s/code/util' % APP_HOME)
+    import extractor_settings as settings
+    import generic_features
+    import lazy_arrays
+    import row_budget
+    import feature_profile
+    SD['settings'] = settings
+    SD['generic_features'] = generic_features
+    SD['lazy_arrays'] = lazy_arrays
+    SD['row_budget'] = row_budget
+    SD['feature_profile'] = feature_profile
+  families = settings.FEATURE_FAMILIES.get(extractor)
+  words = lazy_arrays.array(words)
+  lemmas = lazy_arrays.array(lemmas)
+  poses = lazy_arrays.array(poses)
+  dep_paths = lazy_arrays.array(dep_paths)
+  dep_parents = lazy_arrays.array(dep_parents, int)
+
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, extractor)
+  if not budget.start(doc_id, sent_id, len(words)):
+    return
+  # see code/util/feature_profile.py
+  profile = feature_profile.get_profile(SD, extractor, run_started)
+
+  if settings.GENERIC_FEATURES == 'repo':
+    # NER is noisy on medical docs
+    sentence = generic_features.get_sentence(
+        SD, (doc_id, sent_id), words, lemmas, poses, None, dep_parents,
+        dep_paths)
+    features = sentence.mention_features(
+        wordidxs[0], len(wordidxs), families=families, profile=profile,
+        budget=budget)
+    profile.row_done()
+    if features is None:
+      return
+    # each feature once, as the cached features (feature_cache)
+    for feature in set(features):
+      yield doc_id, mention_id, feature
+    return
+
   try:
     import ddlib
   except:
@@ -28,7 +91,7 @@ def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, men
     path.append('%s/ddlib' % DD_HOME)
     import ddlib
 
-  def unpack_(begin_char_offsets, end_char_offsets, words, lemmas, poses, ners, dep_parents, dep_paths):
+  def unpack_(begin_char_offsets, end_char_offsets, words, lemmas, poses, dep_parents, dep_paths):
     wordobjs = []
     for i in range(0, len(words)):
       wordobjs.append(ddlib.Word(
@@ -46,8 +109,23 @@ def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, men
   end_char_offsets = None
 
   sentence = unpack_(begin_char_offsets, end_char_offsets, words, lemmas,
-                     poses, ners, dep_parents, dep_paths)
+                     poses, dep_parents, dep_paths)
   span = ddlib.Span(begin_word_id=wordidxs[0], length=len(wordidxs))
 
+  import time
+  features = set()
+  # ddlib computes all the families at once, so only its total time is
+  # profiled (as family 'ddlib'), with the number of features by family
+  start = time.time()
   for feature in ddlib.get_generic_features_mention(sentence, span):
+    if budget.exceeded():
+      return
+    family = generic_features.family_of(feature)
+    if families is None or family in families:
+      if feature not in features:
+        profile.add(family, 0.0, 1)
+      features.add(feature)
+  profile.add('ddlib', time.time() - start, 0)
+  profile.row_done()
+  for feature in features:
     yield doc_id, mention_id, feature
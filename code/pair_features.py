@@ -1,25 +1,86 @@
 import ddext
+from ddext import SD
 
 def init():
   ddext.input('doc_id', 'text')
   ddext.input('sent_id', 'int')
-  ddext.input('words', 'text[]')
-  ddext.input('lemmas', 'text[]')
-  ddext.input('poses', 'text[]')
-  ddext.input('ners', 'text[]')
-  ddext.input('dep_paths', 'text[]')
-  ddext.input('dep_parents', 'int[]')
-  ddext.input('wordidxs', 'int[]')
+  # sentence arrays as delimited strings, only split for the first relation
+  # of a sentence (see code/util/lazy_arrays.py)
+  ddext.input('words', 'text')
+  ddext.input('lemmas', 'text')
+  ddext.input('poses', 'text')
+  ddext.input('ners', 'text')
+  ddext.input('dep_paths', 'text')
+  ddext.input('dep_parents', 'text')
   ddext.input('relation_id', 'text')
   ddext.input('wordidxs_1', 'int[]')
   ddext.input('wordidxs_2', 'int[]')
+  ddext.input('extractor', 'text')
+  # start of the run, in feature_cache_runs (see code/util/feature_profile.py)
+  ddext.input('run_started', 'text')
+  ddext.input('cached_features', 'text[]')
 
   ddext.returns('doc_id', 'text')
   ddext.returns('relation_id', 'text')
   ddext.returns('feature', 'text')
 
 
-def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, wordidxs, relation_id, wordidxs_1, wordidxs_2):
+def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, relation_id, wordidxs_1, wordidxs_2, extractor, run_started, cached_features):
+  # features of the same sentence content and span(s) from feature_cache
+  if cached_features is not None:
+    for feature in cached_features:
+      yield doc_id, relation_id, feature
+    return
+
+  if 'settings' in SD:
+    settings = SD['settings']
+    generic_features = SD['generic_features']
+    lazy_arrays = SD['lazy_arrays']
+    row_budget = SD['row_budget']
+    feature_profile = SD['feature_profile']
+  else:
+    import os
+    import sys
+    APP_HOME = os.environ['DD_GENOMICS_HOME']
+    sys.path.append('%s/code/util' % APP_HOME)
+    import extractor_settings as settings
+    import generic_features
+    import lazy_arrays
+    import row_budget
+    import feature_profile
+    SD['settings'] = settings
+    SD['generic_features'] = generic_features
+    SD['lazy_arrays'] = lazy_arrays
+    SD['row_budget'] = row_budget
+    SD['feature_profile'] = feature_profile
+  families = settings.FEATURE_FAMILIES.get(extractor)
+  words = lazy_arrays.array(words)
+  lemmas = lazy_arrays.array(lemmas)
+  poses = lazy_arrays.array(poses)
+  ners = lazy_arrays.array(ners)
+  dep_paths = lazy_arrays.array(dep_paths)
+  dep_parents = lazy_arrays.array(dep_parents, int)
+
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, extractor)
+  if not budget.start(doc_id, sent_id, len(words)):
+    return
+  # see code/util/feature_profile.py
+  profile = feature_profile.get_profile(SD, extractor, run_started)
+
+  if settings.GENERIC_FEATURES == 'repo':
+    sentence = generic_features.get_sentence(
+        SD, (doc_id, sent_id), words, lemmas, poses, ners, dep_parents, dep_paths)
+    features = sentence.relation_features(
+        wordidxs_1[0], len(wordidxs_1), wordidxs_2[0], len(wordidxs_2),
+        families=families, profile=profile, budget=budget)
+    profile.row_done()
+    if features is None:
+      return
+    for feature in set(features):
+      yield doc_id, relation_id, feature
+    return
+
   try:
     import ddlib
   except:
@@ -46,9 +107,21 @@ def run(doc_id, sent_id, words, lemmas, poses, ners, dep_paths, dep_parents, wor
       obj, lemma='lemma', pos='pos', ner='ner', words='words', dep_graph='dep_graph')
   gene_span = ddlib.get_span(wordidxs_1[0], len(wordidxs_1))
   pheno_span = ddlib.get_span(wordidxs_2[0], len(wordidxs_2))
+  import time
   features = set()
+  # ddlib computes all the families at once, so only its total time is
+  # profiled (as family 'ddlib'), with the number of features by family
+  start = time.time()
   for feature in ddlib.get_generic_features_relation(word_obj_list, gene_span, pheno_span):
-    features.add(feature)
+    if budget.exceeded():
+      return
+    family = generic_features.family_of(feature)
+    if families is None or family in families:
+      if feature not in features:
+        profile.add(family, 0.0, 1)
+      features.add(feature)
+  profile.add('ddlib', time.time() - start, 0)
+  profile.row_done()
   for feature in features:
     yield doc_id, relation_id, feature
 
@@ -6,9 +6,6 @@ def init():
   ddext.input('doc_id', 'text')
   ddext.input('sent_id', 'int')
   ddext.input('words', 'text[]')
-  ddext.input('lemmas', 'text[]')
-  ddext.input('poses', 'text[]')
-  ddext.input('ners', 'text[]')
 
   ddext.returns('doc_id', 'text')
   ddext.returns('sent_id', 'int')
@@ -18,76 +15,64 @@ def init():
   ddext.returns('entity', 'text')
   ddext.returns('words', 'text[]')
   ddext.returns('is_correct', 'boolean')
+  ddext.returns('lexicon_version', 'text')
 
 
-def run(doc_id, sent_id, words, lemmas, poses, ners):
+def run(doc_id, sent_id, words):
 
-  if 'diseases' in SD:
-    trie = SD['trie']
-    diseases = SD['diseases']
-    diseases_bad = SD['diseases_bad']
-    genes = SD['genes']
+  if 'lexicon_module' in SD:
+    lexicon_module = SD['lexicon_module']
+    lexicon_registry = SD['lexicon_registry']
     delim_re = SD['delim_re']
+    resolve_overlaps = SD['resolve_overlaps']
+    overlap_policy = SD['overlap_policy']
+    row_budget = SD['row_budget']
   else:
     import os
+    import sys
     APP_HOME = os.environ['DD_GENOMICS_HOME']
     import re
-    diseases = {}
-    all_diseases = [x.strip().split('\t', 1) for x in open('%s/onto/data/all_diseases.tsv' % APP_HOME)]
-    diseases_en = set([x.strip() for x in open('%s/onto/data/all_diseases_en.tsv' % APP_HOME)])
-    diseases_en_good = set([x.strip() for x in open('%s/onto/manual/disease_en_good.tsv' % APP_HOME)])
-    diseases_bad = set([x.strip() for x in open('%s/onto/manual/disease_bad.tsv' % APP_HOME)])
-    SD['diseases_bad'] = diseases_bad
-
-    diseases_exclude = diseases_bad | diseases_en - diseases_en_good
+    sys.path.append('%s/code/util' % APP_HOME)
+    from extractor_settings import PHENO_OVERLAP_POLICY as overlap_policy
+    from mention_overlap import resolve_overlaps
+    import lexicon as lexicon_module
+    import lexicon_registry
+    import row_budget
+    SD['row_budget'] = row_budget
+    SD['overlap_policy'] = overlap_policy
+    SD['resolve_overlaps'] = resolve_overlaps
+    SD['lexicon_module'] = lexicon_module
+    SD['lexicon_registry'] = lexicon_registry
+
+    # the tokens of a phrase (must match DELIM_RE of onto/merge_diseases.py)
     delim_re = re.compile('[^\w-]+')  # NOTE: this also removes apostrophe
     SD['delim_re'] = delim_re
-    diseases_norm = {}
 
-    trie = {}  # special key '$' means terminal nodes
-
-    for phrase, ids in all_diseases:
-      if phrase in diseases_exclude:
-        continue
-      diseases[phrase] = ids
-      phrase_norm = delim_re.sub(' ', phrase).strip()
-      # print phrase_norm
-      tokens = phrase_norm.split()
-      node = trie
-      for w in tokens:
-        if w not in node:
-          node[w] = {}
-        node = node[w]
-      if '$' not in node:
-        node['$'] = []
-      node['$'].append((ids, phrase))
-      if phrase_norm not in diseases_norm:
-        diseases_norm[phrase_norm] = ids
-      else:
-        diseases_norm[phrase_norm] = '|'.join(sorted(set(ids.split('|')) | set(diseases_norm[phrase_norm].split('|'))))
-
-    SD['diseases'] = diseases
-    SD['trie'] = trie
-
-    genes = set()
-    for line in open('%s/onto/data/genes.tsv' % APP_HOME):
-      #plpy.info(line)
-      name, synonyms, full_names = line.strip(' \r\n').split('\t')
-      synonyms = set(synonyms.split('|'))
-      genes.add(name.lower())
-      for s in synonyms:
-        genes.add(s.lower())
-
-    SD['genes'] = genes
-
-  # TODO: currently we do ignore-case exact match for single words; consider stemming.
-  # TODO: currently we do exact phrase matches; consider emitting partial matches.
+  # single-token diseases and gene symbols/synonyms (compiled by
+  # onto/compile_lexicon.py), the trie of the disease phrases (special key
+  # '$' means terminal nodes) and the fuzzy index of their tokens (None
+  # unless PHENO_FUZZY_MAX_DISTANCE), reloaded when their files change; see
+  # code/util/lexicon_registry.py
+  (lexicon, trie, diseases_bad, fuzzy), lexicon_version = lexicon_registry.get_registry(SD).get(
+    'pheno_mentions', lexicon_module.PHENO_FILES, lexicon_module.load_pheno_lexicons)
+
+  # TODO: currently we do ignore-case exact (or fuzzy) match for single words; consider stemming.
+  # TODO: currently we do exact (or fuzzy) phrase matches; consider emitting partial matches.
+  # see code/util/row_budget.py
+  budget = row_budget.get_budget(SD, 'pheno_mentions')
+  if not budget.start(doc_id, sent_id, len(words)):
+    return
+
+  mentions = []
   for i in xrange(len(words)):
+    if budget.exceeded():
+      return
     word = words[i]
     iword = word.lower()
 
     # single-token mention
-    if iword in diseases:
+    entry = lexicon.get(iword)
+    if entry is not None and entry.bits & lexicon_module.DISEASE:
       truth = True
       mtype = 'ONE'
 
@@ -97,13 +82,13 @@ def run(doc_id, sent_id, words, lemmas, poses, ners):
       if word[-1] == 's' and word[:-1].isupper():
         truth = False
         mtype = 'PLURAL'
-      elif iword in genes:
+      elif entry.bits & lexicon_module.GENE_ANY:
         truth = None
         mtype = 'GSYM'
 
-      entity = diseases[iword] + ' ' + iword
+      entity = entry.disease_ids + ' ' + iword
       mid = '%s_%s_%d_1' % (doc_id, sent_id, i)
-      yield doc_id, sent_id, [i], mid, mtype, entity, [word], truth
+      mentions.append((doc_id, sent_id, [i], mid, mtype, entity, [word], truth, lexicon_version))
 
     # multi-token mentions
     node = trie
@@ -126,7 +111,69 @@ def run(doc_id, sent_id, words, lemmas, poses, ners):
             entity = ids + ' ' + phrase
             mid = '%s_%s_%d_%d' % (doc_id, sent_id, i, j - i + 1)
             wordids = range(i, j + 1)
-            yield doc_id, sent_id, wordids, mid, 'PHRASE', entity, words[i: j + 1], True
+            mentions.append((doc_id, sent_id, wordids, mid, 'PHRASE', entity, words[i: j + 1], True, lexicon_version))
       else:
         break
 
+    # fuzzy mentions (see PHENO_FUZZY_MAX_DISTANCE in
+    # code/util/extractor_settings.py): words that are not dictionary tokens
+    # (nor acronyms) also match the tokens within a few edits of them
+    if fuzzy is None:
+      continue
+    word = words[i]
+    iword = word.lower()
+
+    # single-token mention: the closest single-token disease
+    if iword not in lexicon and iword not in fuzzy.vocabulary and not word.isupper():
+      for distance, token in fuzzy.lookup(iword):
+        entry = lexicon.get(token)
+        if (entry is not None and entry.bits & lexicon_module.DISEASE
+            and not entry.bits & lexicon_module.GENE_ANY):
+          entity = entry.disease_ids + ' ' + token
+          mid = '%s_%s_%d_1' % (doc_id, sent_id, i)
+          mentions.append((doc_id, sent_id, [i], mid, 'FUZZY', entity, [word], None, lexicon_version))
+          break
+
+    # multi-token mentions with at least one fuzzy token, as (node, edits)
+    # states; the edits of a phrase add up to at most fuzzy.max_distance
+    states = [(trie, 0)]
+    depth = 0
+    found = set()
+    for j in xrange(i, len(words)):
+      word = words[j]
+      sword = delim_re.sub(' ', word.lower()).strip()
+      if not sword:
+        if j == i:
+          break
+        continue
+      depth += 1
+      fuzzy_ok = sword not in fuzzy.vocabulary and not word.isupper()
+      next_states = []
+      for node, edits in states:
+        if sword in node:
+          next_states.append((node[sword], edits))
+        elif fuzzy_ok:
+          for distance, token in fuzzy.lookup(sword):
+            if edits + distance <= fuzzy.max_distance and token in node:
+              next_states.append((node[token], edits + distance))
+      states = next_states
+      if not states:
+        break
+      if depth > 1:
+        for node, edits in states:
+          if edits == 0 or '$' not in node:
+            continue
+          for ids, phrase in node['$']:
+            if phrase in diseases_bad or phrase in found:
+              continue
+            found.add(phrase)
+            entity = ids + ' ' + phrase
+            mid = '%s_%s_%d_%d' % (doc_id, sent_id, i, j - i + 1)
+            wordids = range(i, j + 1)
+            mentions.append((doc_id, sent_id, wordids, mid, 'FUZZY', entity, words[i: j + 1], None, lexicon_version))
+
+  # nested/overlapping matches multiply the pairs and features downstream;
+  # see code/util/extractor_settings.py
+  for mention in resolve_overlaps(mentions, overlap_policy):
+    yield mention
+
@@ -0,0 +1,97 @@
+"""
+Tunables for the extractors in code/.
+
+The extractors run inside the database server, so they cannot see env.sh;
+they read this file (through DD_GENOMICS_HOME) the first time they are
+called in a session.  Edit it and re-run the extractor to change behavior.
+"""
+
+# How pheno_mentions resolves nested/overlapping matches in a sentence:
+#   all      -- emit every match (single tokens, every phrase prefix, one row
+#               per matching dictionary entry)
+#   longest  -- drop matches that lie strictly inside another match
+#   maximal  -- leftmost-longest, non-overlapping matches only
+# See code/util/mention_overlap.py.
+PHENO_OVERLAP_POLICY = 'all'
+
+# Fuzzy matching of pheno_mentions: words (and phrase tokens) of at least
+# PHENO_FUZZY_MIN_LENGTH characters that are not in the disease dictionaries
+# also match the dictionary tokens within PHENO_FUZZY_MAX_DISTANCE edits
+# (insertions, deletions, substitutions, transpositions; in total over the
+# tokens of a phrase), as FUZZY mentions with is_correct NULL.  0 disables
+# it; 1 catches most typos, OCR errors and British spellings, 2 makes the
+# index (see code/util/fuzzy_index.py) several times larger.
+PHENO_FUZZY_MAX_DISTANCE = 0
+PHENO_FUZZY_MIN_LENGTH = 5
+
+# Candidate gene/phenotype pairs (gene_pheno_candidates) are dropped, in this
+# order, if:
+#   distance -- more than PAIR_MAX_DISTANCE tokens separate the two mentions
+#   cap      -- the sentence already has PAIR_MAX_PER_SENTENCE closer pairs
+# None disables a rule; both are disabled by default, since they drop true
+# pairs too.  The pair-pruning analysis shows how many pairs (and features)
+# each limit would drop; set them after reading it.
+PAIR_MAX_DISTANCE = None
+PAIR_MAX_PER_SENTENCE = None
+
+# gene_pheno_cross_pairs pairs gene and phenotype mentions whose sentences are
+# at most this many sentences apart (but not the same sentence).  0 disables
+# cross-sentence candidates.
+PAIR_SENTENCE_WINDOW = 1
+
+# Which library computes the generic mention/relation features
+# (mention_features, pair_features):
+#   ddlib  -- $DEEPDIVE_HOME/ddlib
+#   repo   -- code/util/generic_features.py, meant to give the same features as
+#             ddlib, with the paths and features of each sentence cached
+#             across its rows; switch to it once util/test_generic_features.py
+#             passes on a fixture recorded from ddlib
+#             (util/compare_generic_features.py)
+GENERIC_FEATURES = 'ddlib'
+
+# Generic feature families (see FAMILIES in generic_features.py) computed by
+# each extractor, named as in the extractor column of its input query; None
+# for all of them.  Use util/profile_features.py and the feature-families
+# analysis to see what each family costs and how many weights it contributes.
+FEATURE_FAMILIES = {
+    'gene_features': None,
+    'pheno_features': None,
+    'genepheno_features': None,
+}
+
+# How often (in seconds) gene_mentions and pheno_mentions check whether the
+# files their dictionaries are built from (onto/data/token_lexicon.tsv, ...)
+# changed, and rebuild them if so; see code/util/lexicon_registry.py.  The
+# mentions record the version of the dictionaries in lexicon_version.  None
+# never reloads them (a new session still loads the current files).
+LEXICON_CHECK_SECONDS = 60
+
+# Per-row budget of the extractors, as (max size, max seconds); see
+# code/util/row_budget.py.  A row larger than max size is not processed, and
+# a row still being processed after max seconds is abandoned; neither
+# produces any output, both are logged to extractor_quarantine (through
+# util/row_budget.sh) with their size and time.  The size is the number of
+# tokens of the sentence, except for gene_pheno_candidates (gene x phenotype
+# mentions of the sentence) and gene_pheno_cross_pairs (mentions of the
+# document).  Feature extractors are named as in FEATURE_FAMILIES.  None
+# disables a limit; extractors not listed have no budget.
+ROW_BUDGETS = {
+    'gene_mentions': (1000, 1.0),
+    'pheno_mentions': (1000, 1.0),
+    'gene_features': (1000, 1.0),
+    'pheno_features': (1000, 1.0),
+    'genepheno_features': (1000, 1.0),
+    'gene_pheno_candidates': (100000, 1.0),
+    'gene_pheno_cross_pairs': (100000, 5.0),
+}
+
+# Where the extractors write the quarantined rows until util/row_budget.sh
+# loads them; it runs on the master, so with segments on other hosts this
+# must be on a shared filesystem.
+QUARANTINE_DIR = '/tmp/dd-genomics-quarantine'
+
+# Where the feature extractors write the time and number of features of each
+# feature family (see code/util/feature_profile.py) for util/feature_profile.sh
+# to load; like QUARANTINE_DIR, this must be on a shared filesystem with
+# remote segments.
+FEATURE_PROFILE_DIR = '/tmp/dd-genomics-feature-profile'
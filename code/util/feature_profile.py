@@ -0,0 +1,90 @@
+"""
+Time spent in, and number of features produced by, each generic feature
+family in the feature extractors (gene_features, pheno_features,
+genepheno_features), so that every run reports its per-family cost and
+util/profile_features.py is only needed to dig into a sample.
+
+A UDF gets the FeatureProfile of the current run with get_profile(SD,
+extractor, run), where run identifies the run of the extractor (the start of
+its feature_cache_runs row, selected by the input query), passes it as the
+profile of mention_features/relation_features (code/util/generic_features.py)
+or add()s to it itself, and calls row_done() after each row:
+
+  profile = feature_profile.get_profile(SD, 'gene_features', run)
+  features = sentence.mention_features(start, length, profile=profile)
+  profile.row_done()
+
+A UDF cannot write to another table, and is not told when the run ends, so
+after each row it rewrites FEATURE_PROFILE_DIR/<extractor>.<pid>.tsv with the
+counts of its process for the run so far, in the COPY format of the
+feature_profile table.  When the run is over the file holds the final
+counts; util/feature_profile.sh (the extractor's after script) loads them,
+replacing what an earlier load of the same run and process left.
+"""
+import os
+import time
+
+
+class FeatureProfile(object):
+
+  def __init__(self, extractor, run, profile_dir):
+    self.extractor = extractor
+    self.run = run
+    self.profile_dir = profile_dir
+    self.seconds = dict()
+    self.features = dict()
+    self.n_rows = 0
+    self._fd = None
+
+  def add(self, family, seconds, n_features):
+    self.seconds[family] = self.seconds.get(family, 0.0) + seconds
+    self.features[family] = self.features.get(family, 0) + n_features
+
+  def row_done(self):
+    """Count a row, and write the counts of the run so far"""
+    self.n_rows += 1
+    if self._fd is None:
+      self._open()
+    pid = os.getpid()
+    logged = time.strftime('%Y-%m-%d %H:%M:%S')
+    lines = []
+    for family in sorted(self.seconds):
+      lines.append('%s\t%s\t%d\t%s\t%d\t%.3f\t%d\t%s\n' % (
+          self.extractor, self.run, pid, family, self.n_rows,
+          self.seconds[family], self.features[family], logged))
+    data = ''.join(lines)
+    # one write, so that feature_profile.sh reads either the old or the new
+    # counts of a process still running (e.g. another partition)
+    os.lseek(self._fd, 0, os.SEEK_SET)
+    os.write(self._fd, data)
+    os.ftruncate(self._fd, len(data))
+
+  def close(self):
+    if self._fd is not None:
+      os.close(self._fd)
+      self._fd = None
+
+  def _open(self):
+    if not os.path.isdir(self.profile_dir):
+      try:
+        os.makedirs(self.profile_dir)
+      except OSError:
+        # created by another segment in the meantime
+        pass
+    self._fd = os.open(
+        '%s/%s.%d.tsv' % (self.profile_dir, self.extractor, os.getpid()),
+        os.O_WRONLY | os.O_CREAT, 0644)
+
+
+def get_profile(cache, extractor, run):
+  """The FeatureProfile of extractor for run, kept in cache (e.g. the UDF's
+  SD); a new one, starting from zero, when the run changes"""
+  key = 'feature_profile_%s' % extractor
+  profile = cache.get(key)
+  if profile is None or profile.run != run:
+    if profile is not None:
+      profile.close()
+    import extractor_settings as settings
+    profile = FeatureProfile(extractor, run, settings.FEATURE_PROFILE_DIR)
+    cache[key] = profile
+  return profile
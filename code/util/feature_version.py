@@ -0,0 +1,56 @@
+"""
+Version of the generic features computed by a feature extractor (named as in
+FEATURE_FAMILIES), for the feature cache (see util/feature_cache.sh): an md5
+of the code that computes them and of the settings that select them, so that
+editing generic_features.py, switching GENERIC_FEATURES or changing the
+families of the extractor invalidates its cached features.
+
+Runs under the python of the DeepDive driver, not only plpy's python 2.
+
+Usage:
+  python code/util/feature_version.py gene_features
+"""
+import glob
+import hashlib
+import os
+import sys
+
+import extractor_settings as settings
+
+UTIL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# UDF computing the features of each extractor
+UDFS = {
+    'gene_features': 'mention_features.py',
+    'pheno_features': 'mention_features.py',
+    'genepheno_features': 'pair_features.py',
+}
+
+
+def feature_files(extractor):
+  files = [os.path.join(UTIL_DIR, '..', UDFS[extractor])]
+  if settings.GENERIC_FEATURES == 'repo':
+    files.append(os.path.join(UTIL_DIR, 'generic_features.py'))
+  elif 'DEEPDIVE_HOME' in os.environ:
+    files += sorted(glob.glob(
+        os.path.join(os.environ['DEEPDIVE_HOME'], 'ddlib', 'ddlib', '*.py')))
+  return files
+
+
+def feature_version(extractor):
+  families = settings.FEATURE_FAMILIES.get(extractor)
+  if families is not None:
+    families = sorted(families)
+  h = hashlib.md5()
+  h.update(('%s %r\n' % (settings.GENERIC_FEATURES, families)).encode('utf-8'))
+  for filename in feature_files(extractor):
+    with open(filename, 'rb') as f:
+      h.update(f.read())
+  return h.hexdigest()
+
+
+if __name__ == '__main__':
+  if len(sys.argv) != 2 or sys.argv[1] not in UDFS:
+    sys.exit('Usage: %s EXTRACTOR (one of %s)' % (
+        sys.argv[0], ', '.join(sorted(UDFS))))
+  print(feature_version(sys.argv[1]))
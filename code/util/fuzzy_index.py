@@ -0,0 +1,103 @@
+"""
+Approximate lookup of tokens in a vocabulary (the tokens of the disease
+phrases), for the fuzzy matching of pheno_mentions: misspellings, OCR
+damage and British spellings (anaemia, tumour, oesophageal).
+
+The index is a SymSpell deletion neighbourhood: every token of the
+vocabulary is stored under each string obtained by deleting up to
+max_distance of its characters.  A word then only has to generate its own
+deletions (a few dozen strings for max_distance 1) and look them up, instead
+of being compared with every token; the candidates are checked with the
+optimal string alignment distance (Levenshtein with transpositions).
+
+Tokens shorter than min_length are neither indexed nor looked up: one edit
+in a short word makes a different word more often than a typo.
+"""
+
+
+def deletions(word, max_distance):
+  """word and the strings obtained by deleting up to max_distance of its
+  characters"""
+  result = set([word])
+  frontier = [word]
+  for _ in xrange(max_distance):
+    next_frontier = []
+    for w in frontier:
+      for i in xrange(len(w)):
+        d = w[:i] + w[i + 1:]
+        if d not in result:
+          result.add(d)
+          next_frontier.append(d)
+    frontier = next_frontier
+  return result
+
+
+def osa_distance(a, b, max_distance):
+  """Optimal string alignment distance of a and b, or max_distance + 1 if
+  it is larger than max_distance"""
+  if abs(len(a) - len(b)) > max_distance:
+    return max_distance + 1
+  prev2 = None
+  prev = range(len(b) + 1)
+  for i in xrange(1, len(a) + 1):
+    cur = [i] + [0] * len(b)
+    best = i
+    for j in xrange(1, len(b) + 1):
+      cost = 0 if a[i - 1] == b[j - 1] else 1
+      d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+      if (prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2]
+          and a[i - 2] == b[j - 1]):
+        d = min(d, prev2[j - 2] + 1)
+      cur[j] = d
+      if d < best:
+        best = d
+    if best > max_distance:
+      return max_distance + 1
+    prev2, prev = prev, cur
+  return min(prev[len(b)], max_distance + 1)
+
+
+class FuzzyIndex(object):
+
+  # lookups kept per word, cleared when full
+  MAX_CACHE = 100000
+
+  def __init__(self, vocabulary, max_distance, min_length):
+    self.max_distance = max_distance
+    self.min_length = min_length
+    self.vocabulary = set()
+    # deletion -> tokens of the vocabulary
+    self.deletes = {}
+    for token in vocabulary:
+      if len(token) < min_length or token in self.vocabulary:
+        continue
+      self.vocabulary.add(token)
+      for d in deletions(token, max_distance):
+        tokens = self.deletes.get(d)
+        if tokens is None:
+          self.deletes[d] = [token]
+        else:
+          tokens.append(token)
+    self._cache = {}
+
+  def lookup(self, word):
+    """(distance, token) of the tokens of the vocabulary within max_distance
+    of word (but word itself), closest first"""
+    result = self._cache.get(word)
+    if result is not None:
+      return result
+    result = []
+    if len(word) >= self.min_length:
+      seen = set([word])
+      for d in deletions(word, self.max_distance):
+        for token in self.deletes.get(d, ()):
+          if token not in seen:
+            seen.add(token)
+            distance = osa_distance(word, token, self.max_distance)
+            if distance <= self.max_distance:
+              result.append((distance, token))
+      result.sort()
+    if len(self._cache) >= self.MAX_CACHE:
+      self._cache.clear()
+    self._cache[word] = result
+    return result
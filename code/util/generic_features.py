@@ -0,0 +1,438 @@
+"""
+Generic mention and relation features, written to produce the same feature
+strings (in the same order) as ddlib.get_generic_features_mention and
+ddlib.get_generic_features_relation from $DEEPDIVE_HOME/ddlib, including
+ddlib's quirks:
+  - the left window wraps around to the end of the sentence for mentions at
+    its start (negative list indices);
+  - the dictionary indicator of a span looks at the first words of the
+    sentence, not at the span;
+  - keywords never end at the last word of the sentence;
+  - the "min" dependency path between two spans is the path of the last
+    pair of words shorter than 200 edges.
+
+A FeatureSentence keeps the sentence as plain arrays and caches the paths to
+the root, the dependency paths and the features of each span (or pair of
+spans), so the mentions and relations of one sentence share the work.
+
+The output has not been checked against ddlib until a fixture recorded from
+it with util/compare_generic_features.py --record is in util/test_data and
+util/test_generic_features.py passes on it; until then GENERIC_FEATURES stays
+'ddlib'.
+
+Features are grouped in families (FAMILIES) that can be turned off per
+extractor (FEATURE_FAMILIES in extractor_settings.py) and profiled (Profile,
+util/profile_features.py).
+"""
+
+import time
+
+MAX_KW_LENGTH = 3
+
+# Families of features, which can be computed (and profiled) separately:
+#   seq       -- WORD/LEMMA/NER/POS_SEQ_ of the mention, or between the mentions
+#   window    -- W_* lemmas and NER tags around the mention(s)
+#   ngram     -- NGRAM_* between the mentions (relations only)
+#   dict      -- IN_DICT_* (needs dictionaries)
+#   keyword   -- KW_* paths to dictionary keywords (needs dictionaries)
+#   dep_path  -- BETW_* dependency path between the mentions (relations only)
+#   shape     -- IS_INVERTED, STARTS_WITH_CAPITAL*, LENGTH*
+FAMILIES = ('seq', 'window', 'ngram', 'dict', 'keyword', 'dep_path', 'shape')
+
+_FAMILY_PREFIXES = [
+    ('WORD_SEQ_', 'seq'), ('LEMMA_SEQ_', 'seq'), ('NER_SEQ_', 'seq'),
+    ('POS_SEQ_', 'seq'), ('W_', 'window'), ('NGRAM_', 'ngram'),
+    ('IN_DICT', 'dict'), ('KW', 'keyword'), ('BETW', 'dep_path')]
+
+# Same role as ddlib.dictionaries: dict_id -> frozenset of phrases (lemmas
+# joined by spaces); empty unless load_dictionary is called
+dictionaries = {}
+
+# ddlib stops walking up the dependency tree after this many words
+_MAX_PATH_LEN = 1000
+
+# ddlib keeps a path between two spans if it is shorter than this
+_MIN_PATH_BOUND = 200
+
+
+def load_dictionary(filename, dict_id='', func=lambda x: x):
+  """Same as ddlib.load_dictionary"""
+  if dict_id == '':
+    dict_id = str(len(dictionaries))
+  with open(filename, 'rt') as dict_file:
+    dictionary = set()
+    for line in dict_file:
+      dictionary.add(func(line.strip()))
+    dictionaries[str(dict_id)] = frozenset(dictionary)
+  return str(dict_id)
+
+
+def _substring_indices(n, max_substring_len):
+  for start in xrange(n):
+    for end in reversed(xrange(start + 1, min(n, start + 1 + max_substring_len))):
+      yield (start, end)
+
+
+class FeatureSentence(object):
+  """One sentence, as the arrays stored in the sentences table.
+
+  dep_parents are the parent word indexes as given to ddlib's Word.dep_par
+  (-1 for the root) and dep_labels the dependency labels.  ners may be None
+  for no NER tags (as ner='' for every ddlib Word).
+  """
+
+  def __init__(self, words, lemmas, poses, ners, dep_parents, dep_labels):
+    self.words = list(words)
+    self.lemmas = [str(x) for x in lemmas]
+    self.poses = [str(x) for x in poses]
+    if ners is None:
+      self.ners = [''] * len(self.words)
+    else:
+      self.ners = [str(x) for x in ners]
+    self.dep_parents = [int(x) for x in dep_parents]
+    self.dep_labels = list(dep_labels)
+    # lemmas as they appear in window features
+    self.window_lemmas = []
+    for lemma in self.lemmas:
+      try:
+        float(lemma)
+        lemma = '_NUMBER'
+      except ValueError:
+        pass
+      self.window_lemmas.append(lemma)
+    self._root_paths = {}
+    self._dep_paths = {}
+    self._phrase_dicts = {}
+    self._part_features = {}
+
+  def __len__(self):
+    return len(self.words)
+
+  def _path_to_root(self, idx):
+    path = self._root_paths.get(idx)
+    if path is None:
+      path = []
+      c = idx
+      for i in xrange(_MAX_PATH_LEN):
+        if c == -1:
+          break
+        path.append(c)
+        c = self.dep_parents[c]
+      self._root_paths[idx] = path
+    return path
+
+  def dep_path(self, begin_idx, end_idx):
+    """The path between two words as (label, idx of the word the edge leads
+    to) pairs, like the DepEdges of ddlib.dep_path_between_words"""
+    key = (begin_idx, end_idx)
+    if key in self._dep_paths:
+      return self._dep_paths[key]
+    path = []
+    if begin_idx != end_idx:
+      path1 = self._path_to_root(begin_idx)
+      path2 = self._path_to_root(end_idx)
+      parent = None
+      for i in xrange(min(len(path1), len(path2))):
+        if path1[-i - 1] != path2[-i - 1]:
+          break
+        parent = path1[-i - 1]
+      for w in path1:
+        if w == parent:
+          break
+        path.append((self.dep_labels[w], self.dep_parents[w]))
+      down = []
+      for w in path2:
+        if w == parent:
+          break
+        down.append((self.dep_labels[w], w))
+      down.reverse()
+      path += down
+    self._dep_paths[key] = path
+    return path
+
+  def min_dep_path(self, begin1, length1, begin2, length2):
+    # ddlib never updates its bound, so the result is the path of the last
+    # pair shorter than the bound: look for it from the end
+    for i in reversed(xrange(begin1, begin1 + length1)):
+      for j in reversed(xrange(begin2, begin2 + length2)):
+        path = self.dep_path(i, j)
+        if len(path) < _MIN_PATH_BOUND:
+          return path
+    return None
+
+  def phrase_dicts(self, begin, end):
+    """Ids of the dictionaries containing the lemmas of words[begin:end], in
+    the order ddlib checks them"""
+    key = (begin, end)
+    if key not in self._phrase_dicts:
+      phrase = ' '.join(self.lemmas[begin:end])
+      self._phrase_dicts[key] = [d for d in dictionaries
+                                 if phrase in dictionaries[d]]
+    return self._phrase_dicts[key]
+
+  def _interleave(self, path):
+    both = []
+    for (label, idx) in path:
+      both.append(label)
+      both.append(self.lemmas[idx])
+    return both[:-1]
+
+  def _dict_lemmas(self, both):
+    both = list(both)
+    for i in xrange(1, len(both), 2):
+      for dict_id in dictionaries:
+        if both[i] in dictionaries[dict_id]:
+          both[i] = 'DICT_' + str(dict_id)
+          break
+    return both
+
+  def _min_dep_path_features(self, begin1, length1, begin2, length2, prefix):
+    path = self.min_dep_path(begin1, length1, begin2, length2)
+    if path:
+      both = self._interleave(path)
+      yield prefix + '_[' + ' '.join(both) + ']'
+      yield prefix + '_L_[' + ' '.join([str(label) for (label, idx) in path]) + ']'
+      yield prefix + '_D_[' + ' '.join(self._dict_lemmas(both)) + ']'
+
+  def _seq_features(self, begin, length):
+    end = begin + length
+    yield 'WORD_SEQ_[' + ' '.join(self.words[begin:end]) + ']'
+    yield 'LEMMA_SEQ_[' + ' '.join(self.lemmas[begin:end]) + ']'
+    yield 'NER_SEQ_[' + ' '.join(self.ners[begin:end]) + ']'
+    yield 'POS_SEQ_[' + ' '.join(self.poses[begin:end]) + ']'
+
+  def _window_features(self, begin, length, window=3, isolated=True):
+    last = begin + length - 1
+    left_lemmas = []
+    left_ners = []
+    right_lemmas = []
+    right_ners = []
+    try:
+      for i in xrange(1, window + 1):
+        left_lemmas.append(self.window_lemmas[begin - i])
+        left_ners.append(self.ners[begin - i])
+    except IndexError:
+      pass
+    left_lemmas.reverse()
+    left_ners.reverse()
+    try:
+      for i in xrange(1, window + 1):
+        right_lemmas.append(self.window_lemmas[last + i])
+        right_ners.append(self.ners[last + i])
+    except IndexError:
+      pass
+    if isolated:
+      for i in xrange(len(left_lemmas)):
+        yield 'W_LEFT_' + str(i + 1) + '_[' + ' '.join(left_lemmas[-i - 1:]) + ']'
+        yield 'W_LEFT_NER_' + str(i + 1) + '_[' + ' '.join(left_ners[-i - 1:]) + ']'
+      for i in xrange(len(right_lemmas)):
+        yield 'W_RIGHT_' + str(i + 1) + '_[' + ' '.join(right_lemmas[:i + 1]) + ']'
+        yield 'W_RIGHT_NER_' + str(i + 1) + '_[' + ' '.join(right_ners[:i + 1]) + ']'
+    for i in xrange(len(left_lemmas)):
+      curr_left_lemmas = ' '.join(left_lemmas[-i - 1:])
+      curr_left_ners = ' '.join(left_ners[-i - 1:])
+      for j in xrange(len(right_lemmas)):
+        yield 'W_LEMMA_L_' + str(i + 1) + '_R_' + str(j + 1) + '_[' + \
+            curr_left_lemmas + ']_[' + ' '.join(right_lemmas[:j + 1]) + ']'
+        yield 'W_NER_L_' + str(i + 1) + '_R_' + str(j + 1) + '_[' + \
+            curr_left_ners + ']_[' + ' '.join(right_ners[:j + 1]) + ']'
+
+  def _dictionary_indicator_features(self, begin, length, window=3,
+                                     prefix='IN_DICT'):
+    in_dictionaries = set()
+    if dictionaries:
+      for i in xrange(window + 1):
+        # sic: ddlib looks at sentence[j:j+i+1], not at the span
+        for j in xrange(length - i):
+          for dict_id in self.phrase_dicts(j, j + i + 1):
+            in_dictionaries.add(dict_id)
+    for dict_id in in_dictionaries:
+      yield prefix + '_[' + str(dict_id) + ']'
+
+  def _keywords(self, skip):
+    """(begin, end, dict_id) of the keyword phrases ddlib looks at, except
+    those skip(begin, end) rejects"""
+    if not dictionaries:
+      return
+    for (i, j) in _substring_indices(len(self.words), MAX_KW_LENGTH):
+      if skip(i, j):
+        continue
+      dict_ids = self.phrase_dicts(i, j)
+      if dict_ids:
+        yield (i, j, dict_ids[0])
+
+  def mention_features(self, begin, length, length_bin_size=5,
+                       families=None, profile=None, budget=None):
+    """Meant to match ddlib.get_generic_features_mention for Span(begin,
+    length), restricted to the given families (default: all); None if the
+    row_budget budget runs out"""
+    key = ('mention', begin, length, length_bin_size)
+    parts = self._mention_parts(begin, length, length_bin_size)
+    return self._features(key, parts, families, profile, budget)
+
+  def relation_features(self, begin1, length1, begin2, length2,
+                        length_bin_size=5, families=None, profile=None,
+                        budget=None):
+    """Meant to match ddlib.get_generic_features_relation for Span(begin1,
+    length1) and Span(begin2, length2), restricted to the given families
+    (default: all); None if the row_budget budget runs out"""
+    key = ('relation', begin1, length1, begin2, length2, length_bin_size)
+    parts = self._relation_parts(begin1, length1, begin2, length2,
+                                 length_bin_size)
+    return self._features(key, parts, families, profile, budget)
+
+  def _features(self, key, parts, families, profile, budget):
+    features = []
+    for (k, (family, part)) in enumerate(parts):
+      if families is not None and family not in families:
+        continue
+      if budget is not None and budget.exceeded():
+        return None
+      part_key = key + (k,)
+      if part_key not in self._part_features:
+        start = time.time()
+        self._part_features[part_key] = list(part())
+        if profile is not None:
+          profile.add(family, time.time() - start,
+                      len(self._part_features[part_key]))
+      features += self._part_features[part_key]
+    return features
+
+  def _mention_parts(self, begin, length, length_bin_size):
+    """(family, generator) pairs that yield the mention features in ddlib's
+    order"""
+    end = begin + length
+
+    def keywords():
+      skip = lambda i, j: begin <= i < end or begin < j < end
+      for (i, j, dict_id) in self._keywords(skip):
+        yield 'KW_IND_[' + dict_id + ']'
+        for feature in self._min_dep_path_features(begin, length, i, j - i, 'KW'):
+          yield feature
+
+    def shape():
+      if self.words[begin][0].isupper():
+        yield 'STARTS_WITH_CAPITAL'
+      yield 'LENGTH_' + str(len(' '.join(self.words[begin:end])) // length_bin_size)
+
+    return [
+        ('seq', lambda: self._seq_features(begin, length)),
+        ('window', lambda: self._window_features(begin, length)),
+        ('dict', lambda: self._dictionary_indicator_features(begin, length)),
+        ('keyword', keywords),
+        ('shape', shape)]
+
+  def _relation_parts(self, begin1, length1, begin2, length2, length_bin_size):
+    """(family, generator) pairs that yield the relation features in ddlib's
+    order"""
+    (begin, betw_begin, betw_end, end) = sorted(
+        [begin1, begin1 + length1, begin2, begin2 + length2])
+    inverted = 'INV_' if begin == begin2 else ''
+
+    def is_inverted():
+      if inverted:
+        yield 'IS_INVERTED'
+
+    def seq():
+      for feature in self._seq_features(betw_begin, betw_end - betw_begin):
+        yield inverted + feature
+
+    def window():
+      for feature in self._window_features(begin, end - begin, isolated=False):
+        yield inverted + feature
+
+    def ngrams():
+      for i in xrange(betw_begin, betw_end):
+        for j in xrange(1, 4):
+          if i + j <= betw_end:
+            yield inverted + 'NGRAM_' + str(j) + '_[' + \
+                ' '.join(self.lemmas[i:i + j]) + ']'
+
+    def dicts():
+      found1 = False
+      for feat1 in self._dictionary_indicator_features(
+          begin1, length1, prefix=inverted + 'IN_DICT'):
+        found1 = True
+        found2 = False
+        for feat2 in self._dictionary_indicator_features(begin2, length2, prefix=''):
+          found2 = True
+          yield feat1 + feat2
+        if not found2:
+          yield feat1 + '_[_NONE]'
+      if not found1:
+        for feat2 in self._dictionary_indicator_features(begin2, length2, prefix=''):
+          yield inverted + 'IN_DICT_[_NONE]' + feat2
+
+    def dep_path():
+      return self._min_dep_path_features(
+          begin1, length1, begin2, length2, inverted + 'BETW')
+
+    def keywords():
+      skip = lambda i, j: (begin <= i < betw_begin or betw_end <= i < end or
+                           begin < j <= betw_begin or betw_end < j <= end)
+      for (i, j, dict_id) in self._keywords(skip):
+        yield inverted + 'KW_IND_[' + dict_id + ']'
+        path1 = self.min_dep_path(begin1, length1, i, j - i) or []
+        path2 = self.min_dep_path(begin2, length2, i, j - i) or []
+        both1 = self._interleave(path1)
+        both2 = self._interleave(path2)
+        yield inverted + 'KW_[' + ' '.join(both1) + ']_[' + ' '.join(both2) + ']'
+        yield inverted + 'KW_L_[' + ' '.join([label for (label, idx) in path1]) + \
+            ']_[' + ' '.join([label for (label, idx) in path2]) + ']'
+        yield inverted + 'KW_D_[' + ' '.join(self._dict_lemmas(both1)) + ']_[' + \
+            ' '.join(self._dict_lemmas(both2)) + ']'
+
+    def shape():
+      first_capital = self.words[begin1][0].isupper()
+      second_capital = self.words[begin2][0].isupper()
+      yield inverted + 'STARTS_WITH_CAPITAL_[' + str(first_capital) + '_' + \
+          str(second_capital) + ']'
+      first_length = len(' '.join([str(w) for w in self.words[begin1:begin1 + length1]]))
+      second_length = len(' '.join([str(w) for w in self.words[begin2:begin2 + length2]]))
+      yield inverted + 'LENGTHS_[' + str(first_length // length_bin_size) + '_' + \
+          str(second_length // length_bin_size) + ']'
+
+    return [
+        ('shape', is_inverted),
+        ('seq', seq),
+        ('window', window),
+        ('ngram', ngrams),
+        ('dict', dicts),
+        ('dep_path', dep_path),
+        ('keyword', keywords),
+        ('shape', shape)]
+
+
+class Profile(object):
+  """Time spent computing, and number of features produced by, each feature
+  family (pass one to mention_features/relation_features)"""
+
+  def __init__(self):
+    self.seconds = dict((f, 0.0) for f in FAMILIES)
+    self.features = dict((f, 0) for f in FAMILIES)
+
+  def add(self, family, seconds, n_features):
+    self.seconds[family] += seconds
+    self.features[family] += n_features
+
+
+def family_of(feature):
+  """The family of a generic feature string (also for ddlib's output)"""
+  if feature.startswith('INV_'):
+    feature = feature[4:]
+  for (prefix, family) in _FAMILY_PREFIXES:
+    if feature.startswith(prefix):
+      return family
+  return 'shape'
+
+
+def get_sentence(cache, key, words, lemmas, poses, ners, dep_parents, dep_labels):
+  """The FeatureSentence of the sentence identified by key, e.g. (doc_id,
+  sent_id).  The last one built is kept in cache (e.g. the UDF's SD), so
+  consecutive rows of the same sentence share its paths and features."""
+  last = cache.get('generic_features_sentence')
+  if last is not None and last[0] == key:
+    return last[1]
+  sentence = FeatureSentence(words, lemmas, poses, ners, dep_parents, dep_labels)
+  cache['generic_features_sentence'] = (key, sentence)
+  return sentence
@@ -0,0 +1,70 @@
+"""
+Array columns passed to a UDF as one delimited string instead of an array:
+the input query selects e.g. delimited(s.ners) AS ners and the UDF declares
+ddext.input('ners', 'text').  plpy then hands over one str
+instead of building a Python list of every array for every row, and the
+string is only split if the UDF actually reads the column (e.g. not at all
+on a feature cache hit, or for the later rows of a sentence whose
+FeatureSentence is kept by generic_features.get_sentence).
+
+array() also passes lists through, so switching a column between text[]
+and the delimited form only takes changing the declaration and the query.
+delimited() (util/add_user_functions.sql) ends every element with DELIMITER
+and gives NULL elements as empty strings, so the elements keep their
+positions (array_to_string would drop the NULLs and shift the later
+elements) and an empty string is an empty array.
+"""
+
+DELIMITER = '|^|'
+
+
+class LazyArray(object):
+  """A list split from a delimited string on first access"""
+
+  def __init__(self, value, convert=None):
+    self._value = value
+    self._convert = convert
+    self._items = None
+
+  def _list(self):
+    if self._items is None:
+      # every element ends with DELIMITER
+      self._items = self._value.split(DELIMITER)[:-1]
+      if self._convert is not None:
+        self._items = [self._convert(x) for x in self._items]
+      self._value = None
+    return self._items
+
+  def __len__(self):
+    if self._items is None:
+      # without splitting, e.g. for the size of a row (see row_budget.py)
+      return self._value.count(DELIMITER)
+    return len(self._items)
+
+  def __getitem__(self, i):
+    return self._list()[i]
+
+  def __iter__(self):
+    return iter(self._list())
+
+  def __contains__(self, x):
+    return x in self._list()
+
+  def __eq__(self, other):
+    if isinstance(other, LazyArray):
+      other = other._list()
+    return self._list() == other
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __repr__(self):
+    return 'LazyArray(%r)' % self._list()
+
+
+def array(value, convert=None):
+  """A LazyArray for a delimited string (convert, e.g. int, is applied to
+  each element); lists and None are returned as they are"""
+  if value is None or isinstance(value, list):
+    return value
+  return LazyArray(value, convert)
@@ -0,0 +1,104 @@
+"""
+The token classification table compiled by onto/compile_lexicon.py
+(onto/data/token_lexicon.tsv): for the lowercased form of a token, which
+lexicons it is in and what it resolves to, so that the mention extractors
+classify a token with one dict lookup.  Also the disease phrase trie of
+pheno_mentions.
+
+The mention extractors get these through code/util/lexicon_registry.py,
+which reloads them when the files below change.
+"""
+
+# Files the dictionaries of each extractor are built from, relative to
+# DD_GENOMICS_HOME
+GENE_FILES = ['onto/data/token_lexicon.tsv']
+PHENO_FILES = ['onto/data/token_lexicon.tsv', 'onto/data/all_diseases_norm.tsv',
+               'onto/manual/disease_bad.tsv']
+
+# Lexicon memberships of a lowercased form (must match onto/compile_lexicon.py)
+GENE_NAME = 1     # lowercased form of a gene symbol
+GENE_SYN = 2      # lowercased form of a gene synonym (that is not a symbol)
+GENE_ENGLISH = 4  # English word, bigram or noisy symbol: exact case only
+GENE_ANY = 8      # lowercased form of any symbol or synonym in genes.tsv,
+                  # including the excluded ones
+DISEASE = 16      # single-token disease phrase
+
+
+class Entry(object):
+  """One row of the table"""
+  __slots__ = ('bits', 'gene', 'disease_ids', 'exact')
+
+  def __init__(self, bits, gene, disease_ids, exact):
+    self.bits = bits
+    # canonical gene of a case-insensitive match
+    self.gene = gene
+    # ids of the disease, '|'-separated
+    self.disease_ids = disease_ids
+    # exact-case gene symbol or synonym -> 'NAME' or 'SYN'
+    self.exact = exact
+
+
+def load_lexicon(app_home):
+  """Lowercased form -> Entry"""
+  lexicon = {}
+  for line in open('%s/onto/data/token_lexicon.tsv' % app_home):
+    key, bits, gene, disease_ids, names, synonyms = line.rstrip('\n').split('\t')
+    exact = {}
+    if synonyms:
+      for synonym in synonyms.split('|'):
+        exact[synonym] = 'SYN'
+    if names:
+      for name in names.split('|'):
+        exact[name] = 'NAME'
+    lexicon[key] = Entry(int(bits), gene, disease_ids, exact)
+  return lexicon
+
+
+def load_disease_trie(app_home):
+  """Trie of the tokens of the disease phrases (onto/data/all_diseases_norm.tsv,
+  by onto/merge_diseases.py, without the excluded phrases); the special key
+  '$' of a node has the (ids, phrase) of the phrases that end there"""
+  trie = {}
+  for line in open('%s/onto/data/all_diseases_norm.tsv' % app_home):
+    phrase, ids, phrase_norm, norm_ids = line.rstrip('\n').split('\t')
+    node = trie
+    for w in phrase_norm.split():
+      if w not in node:
+        node[w] = {}
+      node = node[w]
+    if '$' not in node:
+      node['$'] = []
+    node['$'].append((ids, phrase))
+  return trie
+
+
+def trie_tokens(trie):
+  """All the tokens of the phrases of a trie"""
+  tokens = set()
+  nodes = [trie]
+  while nodes:
+    node = nodes.pop()
+    for token, child in node.iteritems():
+      if token != '$':
+        tokens.add(token)
+        nodes.append(child)
+  return tokens
+
+
+def load_pheno_lexicons(app_home):
+  """(token table, disease trie, bad disease phrases, fuzzy index) of
+  pheno_mentions; the fuzzy index (see code/util/fuzzy_index.py) of the
+  tokens of the trie and the single-token diseases is None unless
+  PHENO_FUZZY_MAX_DISTANCE is set"""
+  import extractor_settings as settings
+  from fuzzy_index import FuzzyIndex
+  diseases_bad = set([x.strip() for x in open('%s/onto/manual/disease_bad.tsv' % app_home)])
+  lexicon = load_lexicon(app_home)
+  trie = load_disease_trie(app_home)
+  fuzzy = None
+  if settings.PHENO_FUZZY_MAX_DISTANCE:
+    vocabulary = trie_tokens(trie)
+    vocabulary.update(key for (key, entry) in lexicon.iteritems() if entry.bits & DISEASE)
+    fuzzy = FuzzyIndex(vocabulary, settings.PHENO_FUZZY_MAX_DISTANCE,
+                       settings.PHENO_FUZZY_MIN_LENGTH)
+  return lexicon, trie, diseases_bad, fuzzy
@@ -0,0 +1,128 @@
+"""
+Dictionaries of the extractors (built from the files in onto/), reloaded
+when the files change, so that a long-lived database backend picks up a
+rebuilt lexicon (e.g. after editing onto/manual and rerunning
+onto/make_dicts.sh) without being restarted.
+
+A UDF keeps one Registry in its SD and asks it for its dictionaries at the
+start of every row:
+
+  registry = lexicon_registry.get_registry(SD)
+  lexicon, version = registry.get('gene_mentions', lexicon.GENE_FILES,
+                                  lexicon.load_lexicon)
+
+where the files are relative to DD_GENOMICS_HOME.  The dictionaries are
+built by build(DD_GENOMICS_HOME) the first time, and again if the content
+of one of the files changed.  The files are checked at most every
+LEXICON_CHECK_SECONDS (extractor_settings.py): their size and mtime are
+compared to the ones of the last check, and only the files whose size or
+mtime changed are hashed, so that touching a file does not rebuild
+anything.  The new dictionaries replace the old ones only once they are
+built; if build() fails (e.g. a file is being rewritten), the old ones are
+kept and the files are checked again next time.
+
+The version is a hash of the content of the files; the mention extractors
+write it to the lexicon_version column, so that mentions found with
+different versions of the dictionaries can be told apart.
+"""
+import hashlib
+import os
+import sys
+import time
+
+
+def file_md5(filename):
+  h = hashlib.md5()
+  f = open(filename, 'rb')
+  try:
+    for block in iter(lambda: f.read(1 << 20), ''):
+      h.update(block)
+  finally:
+    f.close()
+  return h.hexdigest()
+
+
+class Artifact(object):
+  """Dictionaries built from some files, with the state of the files"""
+
+  def __init__(self, paths, build):
+    self.paths = paths
+    self.build = build
+    self.value = None
+    self.version = None
+    # path -> (size, mtime, md5)
+    self.files = {}
+    self.next_check = None
+
+
+class Registry(object):
+
+  def __init__(self, app_home, check_seconds):
+    self.app_home = app_home
+    self.check_seconds = check_seconds
+    self.artifacts = {}
+    self.n_reloads = 0
+
+  def get(self, name, paths, build):
+    """(dictionaries, version) of name, built from paths by build(app_home)"""
+    artifact = self.artifacts.get(name)
+    if artifact is None:
+      artifact = Artifact(paths, build)
+      artifact.files = self._files(paths, {})
+      artifact.value = build(self.app_home)
+      artifact.version = self._version(artifact.files)
+      self._checked(artifact)
+      self.artifacts[name] = artifact
+    elif artifact.next_check is not None and time.time() >= artifact.next_check:
+      self._reload(artifact)
+    return artifact.value, artifact.version
+
+  def _reload(self, artifact):
+    try:
+      files = self._files(artifact.paths, artifact.files)
+      version = self._version(files)
+      if version != artifact.version:
+        value = artifact.build(self.app_home)
+        # swap both at once: a row sees the old or the new dictionaries
+        artifact.value, artifact.version = value, version
+        self.n_reloads += 1
+      artifact.files = files
+    except (IOError, OSError, ValueError), e:
+      print >>sys.stderr, 'lexicon_registry: keeping version %s: %s' % (
+        artifact.version, e)
+    self._checked(artifact)
+
+  def _files(self, paths, old):
+    """path -> (size, mtime, md5), only hashing the files that changed"""
+    files = {}
+    for path in paths:
+      st = os.stat('%s/%s' % (self.app_home, path))
+      before = old.get(path)
+      if before is not None and before[:2] == (st.st_size, st.st_mtime):
+        files[path] = before
+      else:
+        files[path] = (st.st_size, st.st_mtime,
+                       file_md5('%s/%s' % (self.app_home, path)))
+    return files
+
+  def _version(self, files):
+    h = hashlib.md5()
+    for path in sorted(files):
+      h.update('%s %s\n' % (path, files[path][2]))
+    return h.hexdigest()[:12]
+
+  def _checked(self, artifact):
+    if self.check_seconds is None:
+      artifact.next_check = None
+    else:
+      artifact.next_check = time.time() + self.check_seconds
+
+
+def get_registry(cache):
+  """The Registry kept in cache (e.g. the UDF's SD)"""
+  key = 'lexicon_registry_instance'
+  if key not in cache:
+    import extractor_settings as settings
+    cache[key] = Registry(os.environ['DD_GENOMICS_HOME'],
+                          settings.LEXICON_CHECK_SECONDS)
+  return cache[key]
@@ -0,0 +1,60 @@
+"""
+Overlap resolution for the mention candidates of a single sentence.
+
+Mentions are the rows yielded by the mention extractors:
+  (doc_id, sent_id, wordidxs, mention_id, type, entity, words, is_correct,
+   lexicon_version)
+where entity is "<id>|<id>... <phrase>".
+"""
+
+POLICIES = ('all', 'longest', 'maximal')
+
+
+def _span(m):
+  return m[2][0], m[2][-1]
+
+
+def merge_same_span(mentions):
+  """Collapse mentions with identical word spans into one row, merging the
+  ids of their entities (the phrase and the rest are taken from the first)."""
+  merged = []
+  by_span = {}
+  for m in mentions:
+    span = _span(m)
+    if span not in by_span:
+      by_span[span] = len(merged)
+      merged.append(m)
+      continue
+    i = by_span[span]
+    first = merged[i]
+    ids, _, phrase = first[5].partition(' ')
+    ids = set(ids.split('|')) | set(m[5].partition(' ')[0].split('|'))
+    entity = '|'.join(sorted(ids)) + ' ' + phrase
+    merged[i] = first[:5] + (entity,) + first[6:]
+  return merged
+
+
+def resolve_overlaps(mentions, policy):
+  """Return the mentions kept under the given policy, in their input order."""
+  if policy == 'all':
+    return mentions
+  if policy not in POLICIES:
+    raise ValueError('Unknown overlap policy: %s' % policy)
+  mentions = merge_same_span(mentions)
+  order = sorted(xrange(len(mentions)),
+                 key=lambda i: (_span(mentions[i])[0], -_span(mentions[i])[1]))
+  keep = set()
+  last_end = -1
+  for i in order:
+    start, end = _span(mentions[i])
+    if policy == 'longest':
+      # sorted by start, then longest first: anything ending no later than a
+      # span seen before is nested inside it
+      if end > last_end:
+        keep.add(i)
+      last_end = max(last_end, end)
+    else:
+      if start > last_end:
+        keep.add(i)
+        last_end = end
+  return [m for i, m in enumerate(mentions) if i in keep]
@@ -0,0 +1,38 @@
+"""
+Relation ids and distant supervision for gene/phenotype mention pairs,
+shared by gene_pheno_pairs and gene_pheno_cross_pairs.
+"""
+
+
+def load_pos_pairs(app_home):
+  """Known (gene, phenotype/disease id) associations from HPO"""
+  pos_pairs = set()
+  gpheno = [x.strip().split('\t') for x in open('%s/onto/data/hpo_phenotype_genes.tsv' % app_home)]
+  gdisease = [x.strip().split('\t') for x in open('%s/onto/data/hpo_disease_genes.tsv' % app_home)]
+  for pheno, gene in gpheno + gdisease:
+    pos_pairs.add((gene, pheno))
+  return pos_pairs
+
+
+def relation_id(doc_id, sent_id_1, wordidxs_1, sent_id_2, wordidxs_2):
+  """Same-sentence pairs keep the historical id; cross-sentence pairs also
+  name the phenotype's sentence"""
+  gene = '%d:%d' % (wordidxs_1[0], wordidxs_1[-1])
+  pheno = '%d:%d' % (wordidxs_2[0], wordidxs_2[-1])
+  if sent_id_1 == sent_id_2:
+    return '%s_%s_g%s_p%s' % (doc_id, sent_id_1, gene, pheno)
+  return '%s_%s_g%s_%s_p%s' % (doc_id, sent_id_1, gene, sent_id_2, pheno)
+
+
+def supervise(entity_1, correct_1, entity_2, correct_2, pos_pairs):
+  """True for known associations between two positive mentions, False if
+  either mention is negative, None otherwise"""
+  truth = None
+  if correct_1 and correct_2:
+    gene = entity_1
+    for pheno in entity_2.split()[0].split('|'):
+      if (gene, pheno) in pos_pairs:
+        truth = True
+  elif correct_1 is False or correct_2 is False:
+    truth = False
+  return truth
@@ -0,0 +1,98 @@
+"""
+Per-row time and size budget of the extractors (limits in ROW_BUDGETS of
+extractor_settings.py), so that one pathological row (a flattened table, a
+gene list, a document with thousands of mentions) cannot hold up the
+segment it runs on, and with it the whole extractor.
+
+A UDF gets its RowBudget with get_budget(SD, extractor), calls start() with
+the size of the row before doing any work (and skips the row if it returns
+False), calls exceeded() in its loops, and buffers its output so that an
+abandoned row yields nothing:
+
+  budget = row_budget.get_budget(SD, 'pheno_mentions')
+  if not budget.start(doc_id, sent_id, len(words)):
+    return
+  mentions = []
+  for i in xrange(len(words)):
+    if budget.exceeded():
+      return
+    ...
+  for mention in mentions:
+    yield mention
+
+A UDF cannot write to another table, so quarantined rows are appended to
+QUARANTINE_DIR/<extractor>.<pid>.tsv, in the COPY format of the
+extractor_quarantine table, and util/row_budget.sh (the extractor's after
+script) loads them.
+"""
+import os
+import time
+
+
+class RowBudget(object):
+
+  def __init__(self, extractor, max_size, max_seconds, quarantine_dir):
+    self.extractor = extractor
+    self.max_size = max_size
+    self.max_seconds = max_seconds
+    self.quarantine_dir = quarantine_dir
+    self.n_quarantined = 0
+    self._row = None
+    self._size = None
+    self._started = None
+    self._deadline = None
+
+  def start(self, doc_id, sent_id, size):
+    """Start the budget of a row (sent_id None for a document); False, with
+    the row quarantined, if it is too large to process"""
+    self._row = (doc_id, sent_id)
+    self._size = size
+    self._started = time.time()
+    if self.max_seconds is None:
+      self._deadline = None
+    else:
+      self._deadline = self._started + self.max_seconds
+    if self.max_size is not None and size > self.max_size:
+      self._quarantine('size', 0.0)
+      return False
+    return True
+
+  def exceeded(self):
+    """True, with the row quarantined, if the row is over time"""
+    if self._deadline is None:
+      return False
+    now = time.time()
+    if now <= self._deadline:
+      return False
+    self._deadline = None
+    self._quarantine('time', now - self._started)
+    return True
+
+  def _quarantine(self, reason, seconds):
+    doc_id, sent_id = self._row
+    if not os.path.isdir(self.quarantine_dir):
+      try:
+        os.makedirs(self.quarantine_dir)
+      except OSError:
+        # created by another segment in the meantime
+        pass
+    # opened for each row, so that row_budget.sh can move a file away
+    # between two rows
+    f = open('%s/%s.%d.tsv' % (self.quarantine_dir, self.extractor, os.getpid()), 'a')
+    f.write('%s\t%s\t%s\t%d\t%.3f\t%s\t%s\n' % (
+        self.extractor, doc_id, '\\N' if sent_id is None else sent_id,
+        self._size, seconds, reason,
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started))))
+    f.close()
+    self.n_quarantined += 1
+
+
+def get_budget(cache, extractor):
+  """The RowBudget of extractor, kept in cache (e.g. the UDF's SD)"""
+  key = 'row_budget_%s' % extractor
+  if key not in cache:
+    import extractor_settings as settings
+    max_size, max_seconds = settings.ROW_BUDGETS.get(extractor, (None, None))
+    cache[key] = RowBudget(extractor, max_size, max_seconds,
+                           settings.QUARANTINE_DIR)
+  return cache[key]
@@ -0,0 +1,335 @@
+"""Build the dictionaries in data/ from the ontologies downloaded to raw/.
+
+Every step declares the files it reads and writes; build.py runs the steps
+in dependency order, up to --jobs of them at once, and skips a step if its
+command and the content of its inputs (including the scripts it runs) are
+the same as when it last built its outputs, and its outputs are still
+there and unchanged.  The content hashes are kept in data/build_state.json.
+
+Download steps (fetch_*) have no inputs and always run, unless --offline,
+which builds from the files already in raw/.  A download that brings the
+same content as before leaves everything downstream of it skipped.
+
+At the end a report lists every step with what happened to it and how long
+it took.
+
+Usage:
+    python build.py                 # download and rebuild what changed
+    python build.py --offline       # from the files in raw/
+    python build.py --offline diseases_omim merge_diseases
+    python build.py --force compile_lexicon
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+ONTO_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = 'data/build_state.json'
+
+HUDSON = 'http://compbio.charite.de/hudson/job'
+MANUAL = ['manual/disease_bad.tsv', 'manual/disease_en_good.tsv',
+          'manual/gene_bigrams.tsv', 'manual/gene_english.tsv',
+          'manual/gene_exclude.tsv', 'manual/gene_noisy.tsv']
+
+
+class Step(object):
+
+    def __init__(self, name, inputs, outputs, command):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.command = command
+
+    def is_fetch(self):
+        return self.name.startswith('fetch_')
+
+
+STEPS = [
+    # Downloads
+
+    # HPO term list (with synonyms and graph edges)
+    Step('fetch_hpo', [], ['raw/hpo.obo'],
+         'wget %s/hpo/lastStableBuild/artifact/hp/hp.obo -O raw/hpo.obo' % HUDSON),
+    # HPO disease annotations (DECIPHER, OMIM, ORPHANET mapped to HPO)
+    # http://www.human-phenotype-ontology.org/contao/index.php/annotation-guide.html
+    Step('fetch_hpo_annotations', [], ['raw/hpo_phenotype_annotation.tsv'],
+         'wget %s/hpo.annotations/lastStableBuild/artifact/misc/phenotype_annotation.tab '
+         '-O raw/hpo_phenotype_annotation.tsv' % HUDSON),
+    Step('fetch_omim', [], ['raw/omim.txt'],
+         'wget ftp://ftp.omim.org/OMIM/omim.txt.Z -O raw/omim.txt.Z && '
+         'uncompress -f raw/omim.txt.Z'),
+    Step('fetch_clinvar', [], ['raw/clinvar_diseases.tsv'],
+         'wget ftp://ftp.ncbi.nlm.nih.gov/pub/clinvar/disease_names '
+         '-O raw/clinvar_diseases.tsv'),
+    Step('fetch_do', [], ['raw/HumanDO.obo'],
+         'wget "http://sourceforge.net/p/diseaseontology/code/HEAD/tree/trunk/HumanDO.obo?format=raw" '
+         '-O raw/HumanDO.obo'),
+    Step('fetch_ordo', [], ['raw/ORDO.csv'],
+         'wget "http://data.bioontology.org/ontologies/ORDO/download?'
+         'apikey=8b5b7825-538d-40e0-9e9e-5ab9274a9aeb&download_format=csv" '
+         '-O raw/ORDO.csv.gz && gunzip -f raw/ORDO.csv.gz'),
+    Step('fetch_disease_genes', [], ['raw/diseases_to_genes.txt'],
+         'wget %s/hpo.annotations.monthly/lastStableBuild/artifact/annotation/diseases_to_genes.txt '
+         '-O raw/diseases_to_genes.txt' % HUDSON),
+    Step('fetch_phenotype_genes', [], ['raw/ALL_SOURCES_ALL_FREQUENCIES_phenotype_to_genes.txt'],
+         'wget %s/hpo.annotations.monthly/lastStableBuild/artifact/annotation/'
+         'ALL_SOURCES_ALL_FREQUENCIES_phenotype_to_genes.txt '
+         '-O raw/ALL_SOURCES_ALL_FREQUENCIES_phenotype_to_genes.txt' % HUDSON),
+    Step('fetch_genes', [], ['raw/merged_genes_dict.tsv'],
+         'wget https://github.com/HazyResearch/dd-genomics/raw/master/dicts/merged_genes_dict.tsv '
+         '-O raw/merged_genes_dict.tsv'),
+
+    # Parsing and reshaping
+
+    Step('hpo_phenotypes', ['raw/hpo.obo', 'parse_hpo.py', 'obo_loader.py'],
+         ['data/hpo_phenotypes.tsv'],
+         'python parse_hpo.py raw/hpo.obo data/hpo_phenotypes.tsv'),
+    # <disease DB, disease ID, disease name, synonyms, HPO IDs>
+    # http://stackoverflow.com/questions/23719065/tsv-how-to-concatenate-field-2s-if-field-1-is-duplicate
+    Step('hpo_disease_phenotypes', ['raw/hpo_phenotype_annotation.tsv'],
+         ['data/hpo_disease_phenotypes.tsv'],
+         """awk -F'\\t' 'p==$1$2$3$12 {printf "|%s", $5;next}{if(p){print ""};p=$1$2$3$12;printf "%s\\t%s\\t%s\\t%s\\t%s", $1,$2,$3,$12,$5}END{print ""}' """
+         """raw/hpo_phenotype_annotation.tsv > data/hpo_disease_phenotypes.tsv"""),
+    # grep finding nothing is not an error
+    Step('diseases_deci', ['data/hpo_disease_phenotypes.tsv'], ['data/diseases_deci.tsv'],
+         """awk -F'\\t' '{printf "%s:%s\\t%s\\n", $1, $2, $3}' data/hpo_disease_phenotypes.tsv | """
+         """grep 'DECIPHER:' > data/diseases_deci.tsv || [ $? -eq 1 ]"""),
+    Step('diseases_omim', ['raw/omim.txt', 'parse_omim.py'], ['data/diseases_omim.tsv'],
+         'python parse_omim.py raw/omim.txt data/diseases_omim.tsv'),
+    Step('diseases_clinvar', ['raw/clinvar_diseases.tsv'], ['data/diseases_clinvar.tsv'],
+         """awk -F'\\t' '{printf "%s\\t%s\\n", $3, $1}' raw/clinvar_diseases.tsv | tail -n +2 | sort | uniq | """
+         """awk -F'\\t' 'p==$1 && p {printf "|%s", $2;next} {if(!$1) $1="ClinVar"NR} {if(started){print ""};p=$1;started=1;printf "%s\\t%s", $1,$2}END{print ""}' """
+         """> data/diseases_clinvar.tsv"""),
+    Step('diseases_do', ['raw/HumanDO.obo', 'parse_do.py', 'obo_loader.py'],
+         ['data/diseases_do.tsv'],
+         'python parse_do.py raw/HumanDO.obo data/diseases_do.tsv'),
+    # ORDO has diseases, genes, country names, etc. We take only nodes below
+    # children of "phenome".
+    Step('diseases_ordo', ['raw/ORDO.csv', 'csv2tsv.py', 'tsvutil.py'],
+         ['data/diseases_ordo.tsv'],
+         """grep '^http://www.orpha.net/ORDO/' raw/ORDO.csv | """
+         """egrep 'http://www.orpha.net/ORDO/Orphanet_(377790|377796|377792|377788|377795|377794|377797|377789|377791|377793)[^\\d]' | """
+         """sed 's#http://www.orpha.net/ORDO/Orphanet_#ORPHANET:#g' | """
+         """python csv2tsv.py | """
+         """awk -F'\\t' '{if($3) {$3=$2"|"$3} else {$3=$2}; printf "%s\\t%s\\n", $1, $3}' > data/diseases_ordo.tsv"""),
+    Step('hpo_disease_genes', ['raw/diseases_to_genes.txt'], ['data/hpo_disease_genes.tsv'],
+         """tail -n +2 raw/diseases_to_genes.txt | awk -F'\\t' '{if ($3!="") printf "%s\\t%s\\n", $1, $3}' | """
+         """sort > data/hpo_disease_genes.tsv"""),
+    Step('hpo_phenotype_genes', ['raw/ALL_SOURCES_ALL_FREQUENCIES_phenotype_to_genes.txt'],
+         ['data/hpo_phenotype_genes.tsv'],
+         'tail -n +2 raw/ALL_SOURCES_ALL_FREQUENCIES_phenotype_to_genes.txt | cut -f1,4 | '
+         'sort > data/hpo_phenotype_genes.tsv'),
+    Step('genes', ['raw/merged_genes_dict.tsv'], ['data/genes.tsv'],
+         'cp raw/merged_genes_dict.tsv data/genes.tsv'),
+
+    # Merged dictionaries
+
+    Step('merge_diseases',
+         ['data/hpo_phenotypes.tsv', 'data/diseases_clinvar.tsv', 'data/diseases_deci.tsv',
+          'data/diseases_do.tsv', 'data/diseases_omim.tsv', 'data/diseases_ordo.tsv',
+          '../dicts/english_words.tsv', 'manual/disease_bad.tsv', 'manual/disease_en_good.tsv',
+          'merge_diseases.py'],
+         ['data/all_diseases.tsv', 'data/all_diseases_en.tsv', 'data/all_diseases_norm.tsv'],
+         'python merge_diseases.py data'),
+    # One table classifying every token the gene and disease dictionaries
+    # can match
+    Step('compile_lexicon',
+         ['data/genes.tsv', 'data/all_diseases.tsv', 'data/all_diseases_en.tsv',
+          'compile_lexicon.py'] + MANUAL,
+         ['data/token_lexicon.tsv', 'data/lexicon_conflicts.tsv'],
+         'python compile_lexicon.py data'),
+    # Gene terms that are or contain phenotype/disease phrases, or the other
+    # way around, to curate manual/gene_exclude.tsv and manual/disease_bad.tsv
+    Step('find_overlaps',
+         ['data/genes.tsv', 'data/hpo_phenotypes.tsv', 'data/all_diseases.tsv',
+          'manual/gene_exclude.tsv', 'manual/disease_bad.tsv', 'find_overlaps.py',
+          'merge_diseases.py'],
+         ['data/lexicon_overlaps.tsv'],
+         'python find_overlaps.py data'),
+]
+
+
+class Hasher(object):
+    """md5 of file contents, not recomputed for files whose size and mtime
+    are the ones recorded in the build state"""
+
+    def __init__(self, known):
+        self.known = known
+
+    def __call__(self, path):
+        st = os.stat(path)
+        known = self.known.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime:
+            return known[2]
+        h = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        self.known[path] = [st.st_size, st.st_mtime, h.hexdigest()]
+        return h.hexdigest()
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {'steps': {}, 'files': {}}
+
+
+def save_state(state):
+    with open(STATE_FILE + '.tmp', 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.rename(STATE_FILE + '.tmp', STATE_FILE)
+
+
+def step_key(step, file_hash):
+    """Hash of the command of a step and of the contents of its inputs"""
+    h = hashlib.md5(step.command)
+    for path in step.inputs:
+        h.update('\0%s\0%s' % (path, file_hash(path)))
+    return h.hexdigest()
+
+
+def up_to_date(step, key, state, file_hash):
+    last = state['steps'].get(step.name)
+    if last is None or last['key'] != key:
+        return False
+    for path in step.outputs:
+        if not os.path.exists(path) or file_hash(path) != last['outputs'].get(path):
+            return False
+    return True
+
+
+def select_steps(names):
+    """The named steps and the steps they depend on, in STEPS order"""
+    producer = dict((path, step) for step in STEPS for path in step.outputs)
+    by_name = dict((step.name, step) for step in STEPS)
+    wanted = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name in wanted:
+            continue
+        if name not in by_name:
+            sys.exit('Unknown step %s; steps are %s' % (
+                name, ', '.join(step.name for step in STEPS)))
+        wanted.add(name)
+        todo += [producer[path].name for path in by_name[name].inputs if path in producer]
+    return [step for step in STEPS if step.name in wanted]
+
+
+def build(steps, args):
+    state = load_state()
+    file_hash = Hasher(state['files'])
+    producer = dict((path, step.name) for step in steps for path in step.outputs)
+    deps = dict((step.name, set(producer[path] for path in step.inputs if path in producer))
+                for step in steps)
+
+    pending = list(steps)
+    running = {}  # name -> (step, process, start time)
+    done = set()
+    report = []
+    failed = False
+    start = time.time()
+    while pending or running:
+        # start the steps whose inputs are built
+        for step in list(pending):
+            if failed or len(running) >= args.jobs:
+                break
+            if not deps[step.name] <= done:
+                continue
+            pending.remove(step)
+            missing = [path for path in step.inputs if not os.path.exists(path)]
+            if missing:
+                print '%s: missing %s' % (step.name, ', '.join(missing))
+                report.append((step.name, 'failed', 0.0))
+                failed = True
+                break
+            if step.is_fetch() and args.offline:
+                missing = [path for path in step.outputs if not os.path.exists(path)]
+                if missing:
+                    print '%s: --offline, but %s not in raw/' % (step.name, ', '.join(missing))
+                    report.append((step.name, 'failed', 0.0))
+                    failed = True
+                    break
+                report.append((step.name, 'offline', 0.0))
+                done.add(step.name)
+                continue
+            t = time.time()
+            key = None if step.is_fetch() else step_key(step, file_hash)
+            if key is not None and step.name not in args.force and \
+                    up_to_date(step, key, state, file_hash):
+                report.append((step.name, 'skipped', time.time() - t))
+                done.add(step.name)
+                continue
+            print '[%s] %s' % (step.name, step.command)
+            running[step.name] = (step, key, subprocess.Popen(step.command, shell=True), t)
+        if not running:
+            if failed or not pending:
+                break
+            continue
+        time.sleep(0.05)
+        for name, (step, key, process, t) in running.items():
+            if process.poll() is None:
+                continue
+            del running[name]
+            missing = [path for path in step.outputs if not os.path.exists(path)]
+            if process.returncode != 0 or missing:
+                print '%s: failed (exit status %d)' % (name, process.returncode)
+                report.append((name, 'failed', time.time() - t))
+                state['steps'].pop(name, None)
+                failed = True
+                continue
+            state['steps'][name] = {
+                'key': key,
+                'outputs': dict((path, file_hash(path)) for path in step.outputs),
+            }
+            save_state(state)
+            report.append((name, 'built', time.time() - t))
+            done.add(name)
+    save_state(state)
+
+    order = dict((step.name, i) for (i, step) in enumerate(STEPS))
+    print
+    print '%-24s %-8s %9s' % ('step', 'status', 'seconds')
+    for name, status, seconds in sorted(report, key=lambda r: order[r[0]]):
+        print '%-24s %-8s %9.1f' % (name, status, seconds)
+    not_run = [step.name for step in pending]
+    if not_run:
+        print 'not run:', ', '.join(not_run)
+    print '%d steps built in %.1fs (%.1fs of step time, %d jobs)' % (
+        len([r for r in report if r[1] == 'built']), time.time() - start,
+        sum(r[2] for r in report), args.jobs)
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('steps', nargs='*',
+                        help='Steps to build, with the steps they depend on (default: all).')
+    parser.add_argument('--offline', action='store_true',
+                        help='Do not download; build from the files in raw/.')
+    parser.add_argument('-j', '--jobs', type=int, default=4,
+                        help='Number of steps to run at once (default: 4).')
+    parser.add_argument('--force', nargs='*', default=[], metavar='STEP',
+                        help='Rebuild these steps even if their inputs did not change.')
+    parser.add_argument('--list', action='store_true',
+                        help='List the steps with their inputs and outputs, and exit.')
+    args = parser.parse_args()
+
+    os.chdir(ONTO_DIR)
+    steps = select_steps(args.steps) if args.steps else STEPS
+    if args.list:
+        for step in steps:
+            print '%s: %s -> %s' % (step.name, ' '.join(step.inputs), ' '.join(step.outputs))
+        sys.exit(0)
+    unknown = set(args.force) - set(step.name for step in STEPS)
+    if unknown:
+        parser.error('unknown step(s) %s' % ', '.join(sorted(unknown)))
+    args.force = set(args.force)
+    if not build(steps, args):
+        sys.exit(1)
@@ -0,0 +1,146 @@
+"""Compile the gene and disease lexicons into one token classification table.
+
+For every token that any lexicon can match, keyed by its lowercased (folded)
+form, data/token_lexicon.tsv has one row:
+
+    folded form, bitmask, gene target, disease ids, gene names, gene synonyms
+
+where the bitmask says which lexicons the folded form is in (see
+code/util/lexicon.py), the gene target is the canonical gene of a
+case-insensitive match, the disease ids are those of the single-token
+disease phrase, and the last two columns are the exact-case gene names and
+synonyms with that folded form.  gene_mentions and pheno_mentions then
+classify a token with one lookup of word.lower() instead of probing the
+gene and disease dictionaries one after the other.
+
+Forms that are both a gene name or synonym and a disease (e.g. a gene
+symbol that is also the abbreviation of a disease) are written to
+data/lexicon_conflicts.tsv, with the gene gene_mentions would resolve them
+to ('exact case: ...' if only the listed spellings are genes, 'excluded' if
+gene_mentions never takes them) and the disease ids; pheno_mentions marks
+them GSYM.
+
+Needs data/genes.tsv and data/all_diseases*.tsv (see merge_diseases.py).
+"""
+import argparse
+import os
+from collections import defaultdict
+
+# Must match code/util/lexicon.py
+GENE_NAME = 1
+GENE_SYN = 2
+GENE_ENGLISH = 4
+GENE_ANY = 8
+DISEASE = 16
+
+
+def read_set(filename, lower=True):
+    if lower:
+        return set(x.strip().lower() for x in open(filename))
+    return set(x.strip() for x in open(filename))
+
+
+def gene_lexicons(data_dir, manual_dir):
+    """Same sets as code/gene_mentions.py and code/pheno_mentions.py used to
+    build from genes.tsv"""
+    gene_english = read_set('%s/gene_english.tsv' % manual_dir)
+    gene_bigrams = read_set('%s/gene_bigrams.tsv' % manual_dir)
+    gene_noisy = read_set('%s/gene_noisy.tsv' % manual_dir)
+    gene_exclude = read_set('%s/gene_exclude.tsv' % manual_dir)
+    all_names = set()
+    all_synonyms = set()
+    any_lower = set()
+    for line in open('%s/genes.tsv' % data_dir):
+        name, synonyms, full_names = line.strip(' \r\n').split('\t')
+        synonyms = set(synonyms.split('|'))
+        any_lower.add(name.lower())
+        for s in synonyms:
+            any_lower.add(s.lower())
+        synonyms.discard(name)
+        all_names.add(name)
+        all_synonyms |= synonyms
+    all_names -= gene_exclude
+    all_synonyms -= all_names
+    all_synonyms -= gene_exclude
+    exact_lower = gene_english | gene_bigrams | gene_noisy
+    return all_names, all_synonyms, exact_lower, any_lower
+
+
+def diseases(data_dir, manual_dir):
+    """Single-token disease phrases and their ids, after the exclusions of
+    code/pheno_mentions.py; it looks up the lowercased token, so phrases
+    with spaces or capitals never match a single token"""
+    diseases_en = read_set('%s/all_diseases_en.tsv' % data_dir, lower=False)
+    diseases_en_good = read_set('%s/disease_en_good.tsv' % manual_dir, lower=False)
+    diseases_bad = read_set('%s/disease_bad.tsv' % manual_dir, lower=False)
+    diseases_exclude = diseases_bad | diseases_en - diseases_en_good
+    result = {}
+    for line in open('%s/all_diseases.tsv' % data_dir):
+        phrase, ids = line.strip().split('\t', 1)
+        if phrase in diseases_exclude or ' ' in phrase or phrase != phrase.lower():
+            continue
+        result[phrase] = ids
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('dir', help='Input and output directory.')
+    args = parser.parse_args()
+    manual_dir = '%s/../manual' % args.dir
+
+    all_names, all_synonyms, exact_lower, any_lower = gene_lexicons(args.dir, manual_dir)
+    disease_ids = diseases(args.dir, manual_dir)
+
+    bits = defaultdict(int)
+    gene_target = {}
+    exact_names = defaultdict(list)
+    exact_synonyms = defaultdict(list)
+    # the first name (then synonym) in sorted order is the canonical gene of
+    # a case-insensitive match
+    for name in sorted(all_names):
+        key = name.lower()
+        bits[key] |= GENE_NAME
+        exact_names[key].append(name)
+        gene_target.setdefault(key, name)
+    for synonym in sorted(all_synonyms):
+        key = synonym.lower()
+        bits[key] |= GENE_SYN
+        exact_synonyms[key].append(synonym)
+        if not bits[key] & GENE_NAME:
+            gene_target.setdefault(key, synonym)
+    for key in exact_lower:
+        bits[key] |= GENE_ENGLISH
+    for key in any_lower:
+        bits[key] |= GENE_ANY
+    for key in disease_ids:
+        bits[key] |= DISEASE
+
+    n_conflicts = 0
+    print 'Writing to %s/token_lexicon.tsv and %s/lexicon_conflicts.tsv' % (args.dir, args.dir)
+    # token_lexicon.tsv is reloaded by running extractors (see
+    # code/util/lexicon_registry.py): write it aside and rename it into place,
+    # so that it is never seen half-written
+    lexicon_file = '%s/token_lexicon.tsv' % args.dir
+    with open(lexicon_file + '.tmp', 'w') as out,\
+         open('%s/lexicon_conflicts.tsv' % args.dir, 'w') as out_conflicts:
+        for key in sorted(bits):
+            # GENE_ENGLISH and GENE_ANY only qualify the other matches
+            if not bits[key] & (GENE_NAME | GENE_SYN | DISEASE):
+                continue
+            out.write('%s\t%d\t%s\t%s\t%s\t%s\n' % (
+                key, bits[key], gene_target.get(key, ''),
+                disease_ids.get(key, ''), '|'.join(exact_names[key]),
+                '|'.join(exact_synonyms[key])))
+            if bits[key] & DISEASE and bits[key] & GENE_ANY:
+                n_conflicts += 1
+                if not bits[key] & (GENE_NAME | GENE_SYN):
+                    gene_use = 'excluded'
+                elif bits[key] & GENE_ENGLISH:
+                    gene_use = 'exact case: ' + ' '.join(
+                        exact_names[key] + exact_synonyms[key])
+                else:
+                    gene_use = gene_target[key]
+                out_conflicts.write('%s\t%s\t%s\n' % (key, gene_use, disease_ids[key]))
+    os.rename(lexicon_file + '.tmp', lexicon_file)
+    print '#forms =', len(bits), '#conflicts =', n_conflicts
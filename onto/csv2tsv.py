@@ -1,38 +1,114 @@
 #!/usr/bin/env python
-r""" 
+r"""
 Input is Excel-style CSV.  Either stdin or filename.
   (We can handle Mac Excel's \r-delimited csv)
 Output is honest-to-goodness tsv: no quoting or any \n\r\t.
+
+The input is read in chunks that end at the end of a row (a newline outside
+quotes), which are converted by --jobs worker processes and written in
+order.  Cells are cleaned as bytes: only the ones with non-ASCII characters
+are decoded.  Rows shorter than the first one are padded with blanks.  The
+number of rows per second goes to stderr.
 """
 
 #from __future__ import print_function
-import csv, sys
+import argparse, collections, csv, cStringIO, itertools, multiprocessing, os, sys, time
+
+from tsvutil import cell_bytes_clean, SPECIAL_BYTES
 
-from tsvutil import cell_text_clean, warning, UnicodeReader
+# Bytes of input per chunk (rounded up to the end of a row)
+CHUNK_SIZE = 1 << 20
 
 def clean_row(row):
-  return [cell_text_clean(x) for x in row]
-
-args = sys.argv[:]
-args.pop(0)
-if len(args)==1:
-  reader = csv.reader(open(args[0],'U'))
-  #reader = csv.reader(codecs.open(args[0],'U','utf-8'))
-elif len(args) > 1:
-  raise Exception("No support for multiple files yet")
-  # could try to enforce conformity, or meld them together, etc.
-elif not sys.stdin.isatty():
-  reader = csv.reader(sys.stdin)
-else:
-  print(__doc__.strip())
-  sys.exit(1)
-
-header = reader.next()
-print "\t".join(clean_row(header)).encode('utf8')
-#print(*clean_row(header), sep="\t")
-
-for row in reader:
-  if len(row) < len(header):
-    # warning("Row with %d values is too short; padding with %d blanks" % (len(row),len(header)-len(row)))
-    row += [''] * (len(header) - len(row))
-  print "\t".join(clean_row(row))
+  if SPECIAL_BYTES.search(''.join(row)) is None:
+    return row
+  return [cell_bytes_clean(x) for x in row]
+
+def row_end(block):
+  """Offset just after the last newline of block that is outside quotes, -1
+  if there is none (a quote inside a quoted cell is doubled, so the newline
+  is outside quotes iff the number of quotes before it is even)"""
+  end = block.rfind('\n')
+  while end != -1:
+    if block.count('"', 0, end) % 2 == 0:
+      return end + 1
+    end = block.rfind('\n', 0, end)
+  return -1
+
+def chunks(f, size=CHUNK_SIZE):
+  rest = ''
+  while True:
+    block = f.read(size)
+    if not block:
+      if rest:
+        yield rest
+      return
+    block = rest + block
+    end = row_end(block)
+    if end == -1:
+      rest = block
+    else:
+      yield block[:end]
+      rest = block[end:]
+
+def convert(args):
+  """(tsv, number of rows) of a chunk, with rows padded to width cells"""
+  chunk, width = args
+  out = []
+  for row in csv.reader(cStringIO.StringIO(chunk)):
+    if len(row) < width:
+      # warning("Row with %d values is too short; padding with %d blanks" % (len(row),width-len(row)))
+      row += [''] * (width - len(row))
+    out.append("\t".join(clean_row(row)))
+  out.append('')
+  return "\n".join(out), len(out) - 1
+
+def convert_ahead(pool, work, width, ahead):
+  """convert() of the chunks in order, with at most ahead of them queued in
+  pool, so that the input is streamed rather than read at once"""
+  pending = collections.deque()
+  for chunk in work:
+    pending.append(pool.apply_async(convert, ((chunk, width),)))
+    if len(pending) > ahead:
+      yield pending.popleft().get()
+  while pending:
+    yield pending.popleft().get()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('infile', nargs='?', help='Input CSV file (default: stdin).')
+  parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                      help='Number of worker processes (default: number of CPUs).')
+  args = parser.parse_args()
+
+  # universal newlines: \r and \r\n rows become \n rows
+  if args.infile:
+    f = open(args.infile, 'rU')
+  elif not sys.stdin.isatty():
+    f = os.fdopen(sys.stdin.fileno(), 'rU')
+  else:
+    print(__doc__.strip())
+    sys.exit(1)
+
+  start = time.time()
+  n = 0
+  input = chunks(f)
+  first = next(input, None)
+  if first is not None:
+    width = len(next(csv.reader(cStringIO.StringIO(first)), []))
+    work = itertools.chain([first], input)
+    if args.jobs > 1:
+      pool = multiprocessing.Pool(args.jobs)
+      results = convert_ahead(pool, work, width, 2 * args.jobs)
+    else:
+      pool = None
+      results = (convert((chunk, width)) for chunk in work)
+    for tsv, rows in results:
+      sys.stdout.write(tsv)
+      n += rows
+    if pool is not None:
+      pool.close()
+      pool.join()
+  seconds = time.time() - start
+  print >>sys.stderr, "csv2tsv: %d rows in %.2fs (%d rows/s)" % (
+    n, seconds, n / seconds if seconds > 0 else 0)
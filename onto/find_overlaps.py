@@ -0,0 +1,158 @@
+"""Find the overlaps between the gene lexicon and the phenotype and disease
+phrases, to curate manual/gene_exclude.tsv and manual/disease_bad.tsv.
+
+Gene terms are the symbols (NAME), synonyms (SYN) and long names (LONG) of
+data/genes.tsv; phrases are the HPO names and synonyms of
+data/hpo_phenotypes.tsv (HPO) and the phrases of data/all_diseases.tsv
+(DISEASE).  Both are compared as their tokens, as code/pheno_mentions.py
+splits them (lowercased, see merge_diseases.DELIM_RE), and every pair is
+reported as
+
+    EQUAL           same tokens (e.g. a symbol that is also an abbreviation)
+    GENE_IN_PHRASE  the tokens of the gene term are a run of those of the
+                    phrase (e.g. a long name in a phenotype)
+    PHRASE_IN_GENE  the other way around
+
+in data/lexicon_overlaps.tsv:
+
+    relation, gene term, NAME/SYN/LONG, gene symbol, phrase, HPO/DISEASE, ids
+
+Instead of comparing every gene term with every phrase, each side has an
+inverted index from token, and from pair of adjacent tokens, to the terms
+that have it: the terms that contain a one-token term are those of its
+token, and the candidates to contain a longer term are those of its rarest
+pair, so the time is about linear in the size of the lexicons and of the
+output.
+
+Gene terms in manual/gene_exclude.tsv and phrases in manual/disease_bad.tsv
+are already curated and are skipped, unless --all.
+"""
+import argparse
+from collections import defaultdict, Counter
+
+from merge_diseases import DELIM_RE
+
+
+class Terms(object):
+    """Terms of one side, with their tokens and an inverted index"""
+
+    def __init__(self):
+        self.texts = []
+        self.kinds = []
+        self.targets = []
+        self.tokens = []
+        # tokens -> term numbers
+        self.by_tokens = defaultdict(list)
+        # token, and pair of adjacent tokens -> numbers of the terms that
+        # have it
+        self.index = defaultdict(list)
+
+    def add(self, text, kind, target):
+        tokens = tuple(DELIM_RE.sub(' ', text.lower()).split())
+        if not tokens:
+            return
+        i = len(self.texts)
+        self.texts.append(text)
+        self.kinds.append(kind)
+        self.targets.append(target)
+        self.tokens.append(tokens)
+        self.by_tokens[tokens].append(i)
+        for key in set(tokens) | set(zip(tokens, tokens[1:])):
+            self.index[key].append(i)
+
+    def containing(self, tokens):
+        """Numbers of the terms whose tokens have tokens as a proper run"""
+        n = len(tokens)
+        if n == 1:
+            # every term with the token, but itself
+            for i in self.index.get(tokens[0], ()):
+                if len(self.tokens[i]) > 1:
+                    yield i
+            return
+        # the terms with the rarest pair of adjacent tokens of tokens
+        candidates = min((self.index.get(pair, ()) for pair in zip(tokens, tokens[1:])), key=len)
+        for i in candidates:
+            other = self.tokens[i]
+            if len(other) > n and any(other[j:j + n] == tokens
+                                      for j in xrange(len(other) - n + 1)):
+                yield i
+
+
+def read_genes(filename, exclude):
+    genes = Terms()
+    for line in open(filename):
+        name, synonyms, full_names = line.strip(' \r\n').split('\t')
+        if name.lower() not in exclude:
+            genes.add(name, 'NAME', name)
+        for synonym in set(synonyms.split('|')):
+            if synonym and synonym != name and synonym.lower() not in exclude:
+                genes.add(synonym, 'SYN', name)
+        for full_name in set(full_names.split('|')):
+            if full_name and full_name.lower() not in exclude:
+                genes.add(full_name, 'LONG', name)
+    return genes
+
+
+def read_phrases(data_dir, bad):
+    phrases = Terms()
+    for line in open('%s/hpo_phenotypes.tsv' % data_dir):
+        id, name, synonyms = line.rstrip('\n').split('\t')[:3]
+        for phrase in [name] + (synonyms.split('|') if synonyms else []):
+            if phrase.lower() not in bad:
+                phrases.add(phrase, 'HPO', id)
+    for line in open('%s/all_diseases.tsv' % data_dir):
+        phrase, ids = line.rstrip('\n').split('\t', 1)
+        if phrase not in bad:
+            phrases.add(phrase, 'DISEASE', ids)
+    return phrases
+
+
+def read_set(filename):
+    return set(x.strip().lower() for x in open(filename))
+
+
+def overlaps(genes, phrases):
+    """(relation, gene term number, phrase number) of every overlap"""
+    for tokens, gene_terms in genes.by_tokens.iteritems():
+        for p in phrases.by_tokens.get(tokens, ()):
+            for g in gene_terms:
+                yield 'EQUAL', g, p
+        for p in phrases.containing(tokens):
+            for g in gene_terms:
+                yield 'GENE_IN_PHRASE', g, p
+    for tokens, phrase_terms in phrases.by_tokens.iteritems():
+        for g in genes.containing(tokens):
+            for p in phrase_terms:
+                yield 'PHRASE_IN_GENE', g, p
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('dir', help='Input and output directory.')
+    parser.add_argument('--all', action='store_true',
+                        help='Also report the terms that are already excluded.')
+    args = parser.parse_args()
+    manual_dir = '%s/../manual' % args.dir
+
+    if args.all:
+        gene_exclude = disease_bad = set()
+    else:
+        gene_exclude = read_set('%s/gene_exclude.tsv' % manual_dir)
+        disease_bad = read_set('%s/disease_bad.tsv' % manual_dir)
+    genes = read_genes('%s/genes.tsv' % args.dir, gene_exclude)
+    phrases = read_phrases(args.dir, disease_bad)
+    print '#gene terms =', len(genes.texts), '#phrases =', len(phrases.texts)
+
+    rows = set()
+    for relation, g, p in overlaps(genes, phrases):
+        rows.add((relation, genes.texts[g], genes.kinds[g], genes.targets[g],
+                  phrases.texts[p], phrases.kinds[p], phrases.targets[p]))
+
+    print 'Writing to %s/lexicon_overlaps.tsv' % args.dir
+    counts = Counter()
+    with open('%s/lexicon_overlaps.tsv' % args.dir, 'w') as out:
+        for row in sorted(rows):
+            counts[row[0], row[2], row[5]] += 1
+            out.write('\t'.join(row) + '\n')
+    for key in sorted(counts):
+        print '%-15s %-4s %-8s %d' % (key + (counts[key],))
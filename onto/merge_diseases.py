@@ -1,47 +1,108 @@
+"""Merge the disease dictionaries into one phrase -> ids lexicon.
+
+The sources are read one line at a time, in the order below; the ids of a
+phrase are kept once each, in the order they are first seen.  Writes
+
+    all_diseases.tsv       <phrase>\t<ids>
+    all_diseases_en.tsv    the phrases that are English words
+    all_diseases_norm.tsv  <phrase>\t<ids>\t<normal form>\t<ids of the normal form>
+
+all_diseases_norm.tsv has the phrases that code/pheno_mentions.py matches
+(not excluded by manual/disease_bad.tsv, or as English words not in
+manual/disease_en_good.tsv), with their normal form (the tokens the phrase
+matches, see DELIM_RE) and the ids of all such phrases with the same
+normal form, so that the extractor does not normalize or merge anything
+when it loads the lexicon.
+
+Also prints, for every source, how many phrases it has, how many it adds
+to the sources before it and how many no other source has, and the number
+of phrases every two sources share.
+"""
 import argparse
+import os
+import re
 from collections import defaultdict, Counter
 
+# Characters between the tokens of a phrase (must match code/pheno_mentions.py);
+# NOTE: this also removes apostrophe
+DELIM_RE = re.compile('[^\w-]+')
+
+
+def read_pairs(filename, split=-1):
+    for line in open(filename):
+        id, name = line.rstrip('\n').split('\t', split)
+        yield id, name
+
+
+def read_hpo(filename):
+    for line in open(filename):
+        id, name, synonyms, related, alt_ids, is_a = line.rstrip('\n').split('\t')
+        if synonyms:
+            name += '|' + synonyms
+        yield id, name
+
+
+def phrases(id, name):
+    names = set(n.strip() for n in name.lower().split('|'))
+    if 'OMIM:' in id and ';' in name:
+        # OMIM:102530 SPERMATOGENIC FAILURE 6; SPGF6|GLOBOZOOSPERMIA
+        new_names = []
+        for n in names:
+            if ';' in n:
+                new_names += [x.strip() for x in n.split(';')]
+            else:
+                new_names.append(n)
+        names = new_names
+    return names
+
+
+def read_set(filename):
+    return set(x.strip() for x in open(filename))
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('dir', help='Input and output directory.')
     args = parser.parse_args()
+    manual_dir = '%s/../manual' % args.dir
 
     en_words = set([x.strip().lower() for x in open('%s/../../dicts/english_words.tsv' % args.dir)])
 
-    hpo = [x.rstrip('\n').split('\t') for x in open('%s/hpo_phenotypes.tsv' % args.dir)]
-    clinvar = [x.rstrip('\n').split('\t') for x in open('%s/diseases_clinvar.tsv' % args.dir)]
-    deci = [x.rstrip('\n').split('\t') for x in open('%s/diseases_deci.tsv' % args.dir)]
-    do = [x.rstrip('\n').split('\t', 1) for x in open('%s/diseases_do.tsv' % args.dir)]
-    omim = [x.rstrip('\n').split('\t') for x in open('%s/diseases_omim.tsv' % args.dir)]
-    ordo = [x.rstrip('\n').split('\t') for x in open('%s/diseases_ordo.tsv' % args.dir)]
-
-    hpo_pairs = []
-    for id, name, synonyms, related, alt_ids, is_a in hpo:
-        if synonyms:
-            name += '|' + synonyms
-        hpo_pairs.append([id, name])
+    sources = [
+        ('OMIM', read_pairs('%s/diseases_omim.tsv' % args.dir)),
+        ('HPO', read_hpo('%s/hpo_phenotypes.tsv' % args.dir)),
+        ('CLINVAR', read_pairs('%s/diseases_clinvar.tsv' % args.dir)),
+        ('DECI', read_pairs('%s/diseases_deci.tsv' % args.dir)),
+        ('DO', read_pairs('%s/diseases_do.tsv' % args.dir, 1)),
+        ('ORDO', read_pairs('%s/diseases_ordo.tsv' % args.dir)),
+    ]
 
-    diseases = defaultdict(list)
-    for id, name in omim + hpo_pairs + clinvar + deci + do + ordo:
-        if ' ' in id:  # for last line of clinvar
-            continue
-
-        names = set(n.strip() for n in name.lower().split('|'))
-        if 'OMIM:' in id and ';' in name:
-            # OMIM:102530 SPERMATOGENIC FAILURE 6; SPGF6|GLOBOZOOSPERMIA
-            new_names = []
-            for n in names:
-                if ';' in n:
-                  new_names += [x.strip() for x in n.split(';')]
+    diseases = {}
+    # (phrase, id) pairs in diseases
+    seen = set()
+    # phrase -> bit mask of the sources it is in
+    in_sources = defaultdict(int)
+    rows = Counter()
+    new = Counter()
+    for s, (source, pairs) in enumerate(sources):
+        bit = 1 << s
+        for id, name in pairs:
+            if ' ' in id:  # for last line of clinvar
+                continue
+            rows[source] += 1
+            for n in phrases(id, name):
+                if (n, id) in seen:
+                    continue
+                seen.add((n, id))
+                ids = diseases.get(n)
+                if ids is None:
+                    diseases[n] = [id]
+                    new[source] += 1
                 else:
-                  new_names.append(n)
-            names = new_names
+                    ids.append(id)
+                in_sources[n] |= bit
 
-        for n in names:
-            diseases[n].append(id)
-
-    print 'HPO + OMIM + CLINVAR + DECI + DO + ORDO'
+    print ' + '.join(source for (source, _) in sources)
     print '#phrases =', len(diseases)
 
     hist = Counter()
@@ -49,12 +110,52 @@ if __name__ == "__main__":
         hist[len(v)] += 1
     print hist
 
-    print 'Writing to %s/all_diseases.tsv and %s/all_diseases_en.tsv' % (args.dir, args.dir)
+    masks = Counter(in_sources.itervalues())
+    names = [source for (source, _) in sources]
+    print '%-8s %8s %8s %8s %8s' % ('source', 'rows', 'phrases', 'new', 'only')
+    for s, source in enumerate(names):
+        bit = 1 << s
+        print '%-8s %8d %8d %8d %8d' % (
+            source, rows[source], sum(c for (m, c) in masks.iteritems() if m & bit),
+            new[source], masks[bit])
+    print 'Phrases in both sources:'
+    print '%-8s ' % '' + ' '.join('%8s' % source for source in names)
+    for s, source in enumerate(names):
+        print '%-8s ' % source + ' '.join(
+            '%8d' % sum(c for (m, c) in masks.iteritems() if m & (1 << s) and m & (1 << t))
+            for t in xrange(len(names)))
+
+    diseases_en_good = read_set('%s/disease_en_good.tsv' % manual_dir)
+    diseases_bad = read_set('%s/disease_bad.tsv' % manual_dir)
+
+    phrases_sorted = sorted((k for k in diseases if len(k) > 2), key=lambda x: (len(x), x))
+    norms = {}
+    norm_ids = defaultdict(set)
+    for k in phrases_sorted:
+        if k in diseases_bad or (k in en_words and k not in diseases_en_good):
+            continue
+        norm = DELIM_RE.sub(' ', k).strip()
+        if norm:
+            norms[k] = norm
+            norm_ids[norm].update(diseases[k])
+    for norm, ids in norm_ids.iteritems():
+        norm_ids[norm] = '|'.join(sorted(ids))
+
+    print 'Writing to %s/all_diseases.tsv, %s/all_diseases_en.tsv and %s/all_diseases_norm.tsv' % (
+        args.dir, args.dir, args.dir)
+    # all_diseases_norm.tsv is reloaded by running extractors (see
+    # code/util/lexicon_registry.py): write it aside and rename it into place,
+    # so that it is never seen half-written
+    norm_file = '%s/all_diseases_norm.tsv' % args.dir
     with open('%s/all_diseases.tsv' % args.dir, 'w') as out,\
-         open('%s/all_diseases_en.tsv' % args.dir, 'w') as out_en:
-        for k in sorted(diseases.keys(), key=lambda x:(len(x), x)):
-            if len(k) <= 2:
-                continue
+         open('%s/all_diseases_en.tsv' % args.dir, 'w') as out_en,\
+         open(norm_file + '.tmp', 'w') as out_norm:
+        for k in phrases_sorted:
+            ids = '|'.join(diseases[k])
             if k in en_words:
                 out_en.write('%s\n' % k)
-            out.write('%s\t%s\n' % (k, '|'.join(diseases[k])))
+            out.write('%s\t%s\n' % (k, ids))
+            norm = norms.get(k)
+            if norm is not None:
+                out_norm.write('%s\t%s\t%s\t%s\n' % (k, ids, norm, norm_ids[norm]))
+    os.rename(norm_file + '.tmp', norm_file)
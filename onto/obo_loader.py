@@ -0,0 +1,249 @@
+"""Load an OBO file into columnar term tables, cached on disk.
+
+load_obo(filename) parses the file once and returns an Obo whose terms
+(obo.terms) and [Typedef] stanzas (obo.typedefs) are stored column by
+column, each indexed by stanza number:
+
+    ids, names, namespaces  lists of strings (None if missing)
+    obsolete, transitive    lists of booleans (is_obsolete, is_transitive)
+    synonyms                Column of synonym texts
+    synonym_scopes          Column of their scopes, in the same order: EXACT,
+                            RELATED, BROAD or NARROW, followed by the synonym
+                            type if there is one ('EXACT layperson')
+    xrefs                   Column of (xref id, description or '')
+    alt_ids, is_a           Columns of ids
+    relationships           Column of (relationship type, target id)
+
+A Column keeps the values of all stanzas in one flat list, with the offset
+of each stanza's values, so that e.g. terms.is_a[i] is the list of parents
+of term i.  Stanzas of other types ([Instance]) and other tags (def,
+comment, ...) are skipped.
+
+The tables are marshalled to <filename>.<md5 of the file>.<VERSION>.cache,
+so loading the same file again only hashes and unmarshals it; the cache of
+an older version of the file is removed.  Synonym texts and descriptions are
+kept as written in the file (OBO escapes are not undone).
+
+Usage (prints the number of stanzas and the time taken):
+    python obo_loader.py raw/hpo.obo [--no-cache]
+"""
+import argparse
+import glob
+import hashlib
+import marshal
+import os
+import re
+import time
+from array import array
+
+SCOPES = ('EXACT', 'RELATED', 'BROAD', 'NARROW')
+
+# Bump when the tables change, to ignore the caches of older versions
+VERSION = 2
+
+# Stanza headers and the lines of the tags we keep; all other lines are
+# skipped by the regular expression, without going through Python
+_LINES = re.compile(
+    r'^(\[\w+\]|id|name|synonym|xref|is_a|alt_id|relationship|namespace|'
+    r'is_obsolete|is_transitive)(?:$|: *([^\n]*))', re.M)
+
+
+class Column(object):
+    """Values of a multi-valued tag: values[offsets[i]:offsets[i + 1]] are
+    those of stanza i"""
+    __slots__ = ('values', 'offsets')
+
+    def __init__(self, values, offsets):
+        self.values = values
+        self.offsets = offsets
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class Stanzas(object):
+    """Columns of the stanzas of one type"""
+
+    SINGLE = ('ids', 'names', 'namespaces', 'obsolete', 'transitive')
+    MULTI = ('synonyms', 'synonym_scopes', 'xrefs', 'alt_ids', 'is_a',
+             'relationships')
+
+    def __init__(self):
+        for name in self.SINGLE:
+            setattr(self, name, [])
+        for name in self.MULTI:
+            setattr(self, name, None)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index(self):
+        """id -> stanza number"""
+        return dict((id, i) for (i, id) in enumerate(self.ids))
+
+    def synonyms_of(self, i, scopes=SCOPES):
+        """Synonyms of stanza i with the given scopes (typed or not)"""
+        return [synonym for (synonym, scope)
+                in zip(self.synonyms[i], self.synonym_scopes[i])
+                if scope.split(' ', 1)[0] in scopes]
+
+    def _to_marshal(self):
+        data = dict((name, getattr(self, name)) for name in self.SINGLE)
+        for name in self.MULTI:
+            column = getattr(self, name)
+            data[name] = (column.values, column.offsets.tostring())
+        return data
+
+    @classmethod
+    def _from_marshal(cls, data):
+        stanzas = cls()
+        for name in cls.SINGLE:
+            setattr(stanzas, name, data[name])
+        for name in cls.MULTI:
+            values, offsets = data[name]
+            setattr(stanzas, name, Column(values, _offsets_from_string(offsets)))
+        return stanzas
+
+
+class Obo(object):
+
+    def __init__(self, terms, typedefs):
+        self.terms = terms
+        self.typedefs = typedefs
+
+
+def _offsets_from_string(s):
+    offsets = array('l')
+    offsets.fromstring(s)
+    return offsets
+
+
+def _quoted(value):
+    """(text of the leading quoted string, rest of the value)"""
+    i = 1
+    while True:
+        j = value.find('"', i)
+        if j == -1:
+            return value[1:], ''
+        if value[j - 1] != '\\':
+            return value[1:j], value[j + 1:]
+        i = j + 1
+
+
+def parse_obo(filename):
+    with open(filename) as f:
+        text = f.read()
+    result = {'[Term]': Stanzas(), '[Typedef]': Stanzas()}
+    # flat values of the multi-valued tags, and their offsets (the number of
+    # values before each stanza, appended at its header)
+    flat = dict((header, dict((name, ([], array('l'))) for name in Stanzas.MULTI))
+                for header in result)
+    s = None
+    i = -1
+    for tag, value in _LINES.findall(text):
+        if tag[0] == '[':
+            s = result.get(tag)
+            if s is None:
+                continue
+            ids, names, namespaces = s.ids, s.names, s.namespaces
+            obsolete, transitive = s.obsolete, s.transitive
+            i = len(ids)
+            ids.append(None)
+            names.append(None)
+            namespaces.append(None)
+            obsolete.append(False)
+            transitive.append(False)
+            columns = flat[tag]
+            for values, offsets in columns.itervalues():
+                offsets.append(len(values))
+            synonyms, _ = columns['synonyms']
+            scopes, _ = columns['synonym_scopes']
+            xrefs, _ = columns['xrefs']
+            is_a, _ = columns['is_a']
+            alt_ids, _ = columns['alt_ids']
+            relationships, _ = columns['relationships']
+            continue
+        if s is None:
+            continue
+        value = value.rstrip()
+        if tag == 'synonym':
+            synonym, rest = _quoted(value)
+            words = rest.split()
+            if words and words[0] in SCOPES:
+                scope = words[0]
+                if len(words) > 1 and words[1][0] != '[':
+                    scope += ' ' + words[1]
+            else:
+                scope = 'RELATED'
+            synonyms.append(synonym)
+            scopes.append(scope)
+        elif tag == 'is_a':
+            is_a.append(value.split(' ', 1)[0])
+        elif tag == 'xref':
+            id, _, rest = value.partition(' ')
+            rest = rest.lstrip()
+            xrefs.append((id, _quoted(rest)[0] if rest[:1] == '"' else ''))
+        elif tag == 'id':
+            if ids[i] is None:
+                ids[i] = value
+        elif tag == 'name':
+            if names[i] is None:
+                names[i] = value
+        elif tag == 'alt_id':
+            alt_ids.append(value.split(' ', 1)[0])
+        elif tag == 'relationship':
+            words = value.split()
+            if len(words) >= 2:
+                relationships.append((words[0], words[1]))
+        elif tag == 'namespace':
+            namespaces[i] = value
+        elif tag == 'is_obsolete':
+            obsolete[i] = value == 'true'
+        elif tag == 'is_transitive':
+            transitive[i] = value == 'true'
+    for header, s in result.iteritems():
+        for name, (values, offsets) in flat[header].iteritems():
+            offsets.append(len(values))
+            setattr(s, name, Column(values, offsets))
+    return Obo(result['[Term]'], result['[Typedef]'])
+
+
+def file_md5(filename):
+    h = hashlib.md5()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_obo(filename, cache=True):
+    """The Obo of filename, from its cache if the file did not change"""
+    if not cache:
+        return parse_obo(filename)
+    cache_file = '%s.%s.%d.cache' % (filename, file_md5(filename), VERSION)
+    if os.path.exists(cache_file):
+        with open(cache_file, 'rb') as f:
+            terms, typedefs = marshal.load(f)
+        return Obo(Stanzas._from_marshal(terms), Stanzas._from_marshal(typedefs))
+    obo = parse_obo(filename)
+    for old in glob.glob('%s.*.cache' % filename):
+        os.remove(old)
+    with open(cache_file + '.tmp', 'wb') as f:
+        marshal.dump((obo.terms._to_marshal(), obo.typedefs._to_marshal()), f)
+    os.rename(cache_file + '.tmp', cache_file)
+    return obo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('infile', help='Input file in OBO v1.2 format.')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse the file even if it has a cache.')
+    args = parser.parse_args()
+    start = time.time()
+    obo = load_obo(args.infile, cache=not args.no_cache)
+    print 'Found %d terms and %d typedefs in %.2fs' % (
+        len(obo.terms), len(obo.typedefs), time.time() - start)
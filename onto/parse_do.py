@@ -1,6 +1,6 @@
 import argparse
 
-from obo_parser import parseGOOBO
+from obo_loader import load_obo
 
 
 if __name__ == "__main__":
@@ -9,13 +9,14 @@ if __name__ == "__main__":
     parser.add_argument('outfile', help='Output TSV file name.')
     args = parser.parse_args()
 
+    terms = load_obo(args.infile).terms
     with open(args.outfile, 'w') as out:
-        for term in parseGOOBO(args.infile):
-            id = term['id'][0]
-            name = term['name'][0]
+        for i in xrange(len(terms)):
+            id = terms.ids[i]
+            name = terms.names[i]
             synonyms = set([name])
-            for s in term.get('synonym', []):
-                if ' EXACT [' in s:
-                    synonyms.add(s.split(' EXACT [')[0].strip('" '))
+            for s, scope in zip(terms.synonyms[i], terms.synonym_scopes[i]):
+                if scope == 'EXACT':
+                    synonyms.add(s.strip('" '))
             synonyms = '|'.join(sorted(synonyms)) if synonyms else ''
             out.write('\t'.join([id, synonyms]) + '\n')
@@ -1,6 +1,6 @@
 import argparse
 
-from obo_parser import parseGOOBO
+from obo_loader import load_obo
 
 
 if __name__ == "__main__":
@@ -9,26 +9,26 @@ if __name__ == "__main__":
     parser.add_argument('outfile', help='Output TSV file name.')
     args = parser.parse_args()
 
+    terms = load_obo(args.infile).terms
     with open(args.outfile, 'w') as out:
-        for term in parseGOOBO(args.infile):
-            id = term['id'][0]
-            name = term['name'][0]
-            alt_ids = '|'.join(term['alt_id']) if 'alt_id' in term else ''
-            is_a = '|'.join(x.partition(' ')[0] for x in term['is_a']) if 'is_a' in term else ''
+        for i in xrange(len(terms)):
+            id = terms.ids[i]
+            name = terms.names[i]
+            alt_ids = '|'.join(terms.alt_ids[i])
+            is_a = '|'.join(terms.is_a[i])
             synonyms = set()
             related = set()
-            for s in term.get('synonym', []):
-                if ' EXACT [' in s:
-                    synonyms.add(s.split(' EXACT [')[0].strip('" '))
+            for s, scope in zip(terms.synonyms[i], terms.synonym_scopes[i]):
+                if scope == 'EXACT':
+                    synonyms.add(s.strip('" '))
                 else:
-                    # RELATED, BROAD, etc.
-                    related.add(s.split('" ')[0].strip('"'))
-            for n in term.get('xref', []):
-                if ' ' in n:
-                    synonyms.add(n.partition(' ')[-1].strip('" '))
+                    # RELATED, BROAD, etc., and typed EXACT (e.g. EXACT layperson)
+                    related.add(s)
+            for xref, description in terms.xrefs[i]:
+                if description:
+                    synonyms.add(description.strip('" '))
             synonyms.discard(name)
             related.discard(name)
             synonyms = '|'.join(sorted(synonyms)) if synonyms else ''
             related = '|'.join(sorted(related)) if related else ''
             out.write('\t'.join([id, name, synonyms, related, alt_ids, is_a]) + '\n')
-
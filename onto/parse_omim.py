@@ -1,56 +1,136 @@
+"""Disease names of the OMIM entries, from omim.txt.
+
+The file is memory-mapped and split on *RECORD* boundaries into chunks,
+which are parsed in parallel (--jobs processes); the output is written in
+the order of the file:
+
+    OMIM:<id>\t<name>|<name>|...
+
+The names are those of the title field (*FIELD* TI): the preferred title
+and the alternative titles, separated by ';;'.  Gene entries (* and +) and
+moved or removed entries (^) are skipped.
+
+OMIM wraps long titles at any point, e.g.,
+
+    ;;ALZHEIMER DISEASE, EARLY-ONSET, WITH CEREBRAL AMYLOID ANGIOPATHY,
+    INCLUDED;;
+
+    607483 THIAMINE METABOLISM DYSFUNCTION SYNDROME 2 (BIOTIN- OR THIAMINE-RESPONSIVE
+    TYPE); THMD2
+
+    601039 ICHTHYOSIS-MENTAL RETARDATION SYNDROME WITH LARGE KERATOHYALIN GRANULES
+    IN THE SKIN
+
+so the lines of the field are joined before it is split on ';;', and only
+';;' ends a name.
+"""
 import argparse
+import mmap
+import multiprocessing
+import os
+import time
+
+RECORD = '*RECORD*'
+
+# Bytes of the file per chunk (rounded up to the next record)
+CHUNK_SIZE = 4 << 20
+
+
+def _field(record, tag):
+    """Text of field tag of record, None if it has none"""
+    header = '*FIELD* %s\n' % tag
+    start = record.find(header)
+    if start == -1:
+        return None
+    start += len(header)
+    end = record.find('\n*FIELD*', start)
+    return record[start:] if end == -1 else record[start:end]
+
+
+def parse_record(record):
+    """(id, names) of an OMIM record, None for gene and moved entries"""
+    id = _field(record, 'NO')
+    title = _field(record, 'TI')
+    if id is None or title is None:
+        return None
+    id = id.strip()
+    title = ' '.join(line.strip() for line in title.splitlines()).strip()
+    if not title or title[0] in '*+^':
+        return None
+    names = []
+    for name in title.split(';;'):
+        name = name.strip('; ')
+        if name.find(id + ' ') in (0, 1):
+            name = name.split(id + ' ', 1)[1]
+        if name:
+            names.append(name)
+    if not names:
+        return None
+    return id, names
+
+
+def parse_chunk(args):
+    """Output lines of the records of filename between offsets start and end"""
+    filename, start, end = args
+    with open(filename, 'rb') as f:
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            text = m[start:end]
+        finally:
+            m.close()
+    lines = []
+    for record in text.replace('\r\n', '\n').split(RECORD):
+        parsed = parse_record(record)
+        if parsed is not None:
+            id, names = parsed
+            lines.append('\t'.join(['OMIM:' + id, '|'.join(names)]) + '\n')
+    return lines
+
+
+def chunks(filename, chunk_size=CHUNK_SIZE):
+    """(filename, start, end) of chunks of about chunk_size bytes that start
+    at a record"""
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    with open(filename, 'rb') as f:
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            result = []
+            start = 0
+            while start < size:
+                end = m.find(RECORD, start + chunk_size)
+                if end == -1:
+                    end = size
+                result.append((filename, start, end))
+                start = end
+        finally:
+            m.close()
+    return result
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('infile', help='Input OMIM file.')
     parser.add_argument('outfile', help='Output TSV file name.')
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='Number of processes (default: number of CPUs).')
     args = parser.parse_args()
 
-    state = None
-    id = None
-    is_gene_or_bad_entry = False
-
-    # OMIM text has bad line breaks; e.g.,
-    # ALZHEIMER DISEASE, EARLY-ONSET, WITH CEREBRAL AMYLOID ANGIOPATHY,
-    # INCLUDED;;
-    #
-    # 607483 THIAMINE METABOLISM DYSFUNCTION SYNDROME 2 (BIOTIN- OR THIAMINE-RESPONSIVE
-    # TYPE); THMD2
-    name_is_partial = False
-    # there are still bad cases that we do not handle; e.g.,
-    # 601039 ICHTHYOSIS-MENTAL RETARDATION SYNDROME WITH LARGE KERATOHYALIN GRANULES
-    # IN THE SKIN
-
-
-    names = []
+    start = time.time()
+    work = chunks(args.infile)
     with open(args.outfile, 'w') as out:
-        for line in open(args.infile):
-            line = line.rstrip()
-            if line == '*FIELD* NO':
-                state = 'id'
-            elif line == '*FIELD* TI':
-                state = 'name'
-            elif line.startswith('*FIELD*'):
-                state = None
-                name_is_partial = False
-                if names:
-                    if not is_gene_or_bad_entry:
-                        out.write('\t'.join(['OMIM:' + id, '|'.join(names)]) + '\n')
-                    names = []
-                    is_gene_or_bad_entry = False
-            else:
-                if state == 'id':
-                    id = line
-                elif state == 'name':
-                    if line.startswith('*') or line.startswith('+') or line.startswith('^'):
-                        is_gene_or_bad_entry = True
-                    name = line.strip('; ')
-                    if name.find(id + ' ') in (0, 1):
-                        name = name.split(id + ' ', 1)[1]
-                    if name_is_partial and names:
-                        names[-1] += ' ' + name
-                    else:
-                        names.append(name)
-                    if name[-1] == ',' or name.count('(') > name.count(')'):
-                        name_is_partial = True
-
+        if args.jobs > 1 and len(work) > 1:
+            pool = multiprocessing.Pool(min(args.jobs, len(work)))
+            results = pool.imap(parse_chunk, work)
+        else:
+            pool = None
+            results = (parse_chunk(chunk) for chunk in work)
+        n = 0
+        for lines in results:
+            out.writelines(lines)
+            n += len(lines)
+        if pool is not None:
+            pool.close()
+            pool.join()
+    print 'Found %d diseases in %d chunks in %.2fs' % (n, len(work), time.time() - start)
@@ -0,0 +1,89 @@
+"""Tests of parse_omim.py on test_data/omim.txt, a few records in the
+layout of omim.txt: titles wrapped over several lines (104300, 601039,
+607483), a gene entry of each kind (* and +) and a moved entry (^), which
+are skipped.
+
+Usage:
+    python -m unittest discover -s onto -p 'test_*.py'
+"""
+import os
+import sys
+import unittest
+
+if sys.version_info[0] > 2:
+    raise unittest.SkipTest('the onto scripts are Python 2')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import parse_omim
+
+OMIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'omim.txt')
+
+EXPECTED = [
+    'OMIM:100050\tAARSKOG SYNDROME, AUTOSOMAL DOMINANT\n',
+    'OMIM:104300\tALZHEIMER DISEASE; AD|ALZHEIMER DEMENTIA; AD'
+    '|SENILE DEMENTIA, ALZHEIMER TYPE; SDAT'
+    '|ALZHEIMER DISEASE, EARLY-ONSET, WITH CEREBRAL AMYLOID ANGIOPATHY, INCLUDED'
+    '|ALZHEIMER DISEASE, FAMILIAL, 1, INCLUDED; AD1, INCLUDED\n',
+    'OMIM:601039\tICHTHYOSIS-MENTAL RETARDATION SYNDROME WITH LARGE KERATOHYALIN'
+    ' GRANULES IN THE SKIN\n',
+    'OMIM:607483\tTHIAMINE METABOLISM DYSFUNCTION SYNDROME 2 (BIOTIN- OR'
+    ' THIAMINE-RESPONSIVE TYPE); THMD2'
+    '|BIOTIN-THIAMINE-RESPONSIVE BASAL GANGLIA DISEASE; BTBGD'
+    '|BASAL GANGLIA DISEASE, BIOTIN-RESPONSIVE; BBGD\n',
+]
+
+
+def records():
+    return open(OMIM).read().split(parse_omim.RECORD)
+
+
+class ParseRecordTest(unittest.TestCase):
+
+    def parsed(self, id):
+        for record in records():
+            if '*FIELD* NO\n%s\n' % id in record:
+                return parse_omim.parse_record(record)
+        self.fail('no record %s in %s' % (id, OMIM))
+
+    def test_wrapped_included_title(self):
+        id, names = self.parsed('104300')
+        self.assertEqual(id, '104300')
+        self.assertIn('ALZHEIMER DISEASE, EARLY-ONSET, WITH CEREBRAL AMYLOID ANGIOPATHY, INCLUDED',
+                      names)
+        self.assertEqual(len(names), 5)
+
+    def test_wrapped_preferred_title(self):
+        self.assertEqual(self.parsed('601039'), (
+            '601039',
+            ['ICHTHYOSIS-MENTAL RETARDATION SYNDROME WITH LARGE KERATOHYALIN GRANULES IN THE SKIN']))
+        id, names = self.parsed('607483')
+        self.assertEqual(names[0], 'THIAMINE METABOLISM DYSFUNCTION SYNDROME 2 '
+                                   '(BIOTIN- OR THIAMINE-RESPONSIVE TYPE); THMD2')
+
+    def test_gene_and_moved_entries_are_skipped(self):
+        for id in ('100640', '100650', '100680'):
+            self.assertIsNone(self.parsed(id), id)
+
+    def test_no_title(self):
+        self.assertIsNone(parse_omim.parse_record(''))
+        self.assertIsNone(parse_omim.parse_record('\n*FIELD* NO\n100050\n'))
+
+
+class ParseChunkTest(unittest.TestCase):
+
+    def test_whole_file(self):
+        self.assertEqual(parse_omim.parse_chunk(
+            (OMIM, 0, os.path.getsize(OMIM))), EXPECTED)
+
+    def test_small_chunks(self):
+        # every record in its own chunk, in the order of the file
+        work = parse_omim.chunks(OMIM, chunk_size=1)
+        self.assertEqual(len(work), len(records()) - 1)
+        lines = []
+        for chunk in work:
+            lines += parse_omim.parse_chunk(chunk)
+        self.assertEqual(lines, EXPECTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
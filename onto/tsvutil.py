@@ -1,6 +1,6 @@
 """Miscellaneous utilities to support some of the tsvutils scripts"""
 
-import sys,csv,codecs
+import sys,csv,codecs,re
 
 warning_count = 0
 warning_max = 20
@@ -22,6 +22,27 @@ def cell_text_clean(text):
   s = s.encode('utf-8')
   return s
 
+# What cell_bytes_clean has to change: separators, or bytes of non-ASCII
+# characters (which may not be valid UTF-8)
+SPECIAL_BYTES = re.compile(r'[\t\n\r\x80-\xff]')
+NON_ASCII = re.compile(r'[\x80-\xff]')
+
+def cell_bytes_clean(s):
+  """cell_text_clean, on and to UTF-8 bytes: ASCII cells are not decoded,
+  and other cells are only re-encoded if they are not valid UTF-8"""
+  if SPECIAL_BYTES.search(s) is None:
+    return s
+  if "\t" in s: warning("Clobbering embedded tab")
+  if "\n" in s: warning("Clobbering embedded newline")
+  if "\r" in s: warning("Clobbering embedded carriage return")
+  s = s.replace("\t"," ").replace("\n"," ").replace("\r"," ")
+  if NON_ASCII.search(s) is not None:
+    try:
+      s.decode('utf8')
+    except UnicodeDecodeError:
+      s = unicode(s, 'utf8', 'replace').encode('utf-8')
+  return s
+
 def fix_stdio():
   sys.stdout = IOWrapper(sys.stdout)
 
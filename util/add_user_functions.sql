@@ -10,3 +10,20 @@ CREATE AGGREGATE array_accum(anyelement) (
 );
 
 ALTER AGGREGATE public.array_accum(anyelement) OWNER TO senwu;
+
+--
+-- Name: delimited(anyarray); Type: FUNCTION
+--
+-- The elements of an array as text, each followed by '|^|', with NULL
+-- elements as empty strings, for the array columns passed to the UDFs as
+-- one string (see code/util/lazy_arrays.py).  Unlike array_to_string(a,
+-- '|^|'), which drops the NULL elements, every element keeps its position,
+-- and '{}' and '{""}' give different strings.
+CREATE FUNCTION delimited(anyarray) RETURNS text AS $$
+    SELECT array_to_string(ARRAY(
+        SELECT coalesce($1[i]::text, '') || '|^|'
+        FROM generate_series(array_lower($1, 1), array_upper($1, 1)) i
+        ORDER BY i), '')
+$$ LANGUAGE SQL IMMUTABLE;
+
+ALTER FUNCTION public.delimited(anyarray) OWNER TO senwu;
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Check that the input query of every plpy_extractor in application.conf
+selects exactly the inputs its UDF declares with ddext.input, in the same
+order, and that the UDF's run() reads all of them.
+
+The declarations are what the extractor costs per row: every declared array
+is converted into a Python list for every row (unless passed as a delimited
+string, see code/util/lazy_arrays.py), so a column the UDF does not read
+should not be declared, and the query should not select it either.
+
+Usage:
+  python util/check_udf_inputs.py
+"""
+import argparse
+import os
+import re
+import sys
+
+APP_HOME = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append('%s/util' % APP_HOME)
+from partition_pipeline import parse_extractors
+from run_udf import udf_file
+
+
+def split_top_level(text):
+  """Split on the commas that are not inside parentheses or quotes"""
+  parts = []
+  depth = 0
+  quoted = False
+  begin = 0
+  for i, c in enumerate(text):
+    if c == "'":
+      quoted = not quoted
+    elif quoted:
+      continue
+    elif c == '(':
+      depth += 1
+    elif c == ')':
+      depth -= 1
+    elif c == ',' and depth == 0:
+      parts.append(text[begin:i])
+      begin = i + 1
+  parts.append(text[begin:])
+  return parts
+
+
+def query_columns(query):
+  """Names of the columns of the outer SELECT of query"""
+  m = re.match(r'\s*SELECT\s+(.*?)\bFROM\b', query, re.I | re.S)
+  columns = []
+  for expr in split_top_level(m.group(1)):
+    alias = re.search(r'\bAS\s+(\w+)\s*$', expr, re.I)
+    if alias:
+      columns.append(alias.group(1))
+    else:
+      columns.append(re.search(r'(\w+)\s*$', expr).group(1))
+  return columns
+
+
+def declared_inputs(source):
+  return re.findall(r"ddext\.input\('(\w+)',", source)
+
+
+def unread_inputs(source, names):
+  body = source[source.index('def run('):]
+  body = body[body.index('\n'):]
+  return [name for name in names if not re.search(r'\b%s\b' % name, body)]
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+  parser.add_argument('--conf', default='%s/application.conf' % APP_HOME,
+                      help='Configuration (default: application.conf).')
+  args = parser.parse_args()
+
+  extractors = parse_extractors(open(args.conf).read())
+  errors = 0
+  for name in sorted(extractors):
+    extractor = extractors[name]
+    if extractor.get('style') != 'plpy_extractor':
+      continue
+    source = open(udf_file(extractor)).read()
+    declared = declared_inputs(source)
+    selected = query_columns(extractor['input'])
+    if declared != selected:
+      errors += 1
+      print '%s: query selects %s' % (name, ', '.join(selected))
+      print '%s  UDF declares  %s' % (' ' * len(name), ', '.join(declared))
+    unread = unread_inputs(source, declared)
+    if unread:
+      errors += 1
+      print '%s: %s declares but never reads %s' % (
+          name, os.path.basename(udf_file(extractor)), ', '.join(unread))
+  if errors:
+    sys.exit(1)
+  print 'All plpy_extractor inputs match their UDF declarations.'
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+"""
+Check that code/util/generic_features.py produces the same generic mention
+and relation features as ddlib, and compare their throughput.
+
+Sentences come from a sample of the sentences table, dumped with e.g.
+  psql -d $DBNAME -c "COPY (SELECT doc_id, sent_id,
+      delimited(words), delimited(lemmas), delimited(poses), delimited(ners),
+      delimited(dep_paths), delimited(dep_parents)
+    FROM sentences ORDER BY random() LIMIT 1000) TO STDOUT" > sample.tsv
+(delimited() is in util/add_user_functions.sql)
+or are generated at random (--random N).  For every sentence, the features of
+mentions of 1-3 words and of pairs of such mentions are computed both ways,
+as mention_features and pair_features call ddlib, and must be identical
+(same strings, same order).  pair_features gives ddlib the parse as a
+dependency graph of 'parent<TAB>label<TAB>index' lines, which ddlib turns
+back into parent indexes; those must be the dep_parents generic_features.py
+walks, or the dependency paths of the two would be off by one word.
+
+With --record FIXTURE, the sentences and the features ddlib gives them are
+also written to FIXTURE (one JSON object per line, after a header line with
+ddlib's rows/s); util/test_generic_features.py checks generic_features.py
+against util/test_data/generic_features_ddlib.jsonl, recorded this way, so
+that it does not need ddlib.  Record it again after upgrading DeepDive.
+
+Usage:
+  DEEPDIVE_HOME=... python util/compare_generic_features.py sample.tsv
+  DEEPDIVE_HOME=... python util/compare_generic_features.py --random 200
+  DEEPDIVE_HOME=... python util/compare_generic_features.py sample.tsv \
+      --max-sentences 100 --record util/test_data/generic_features_ddlib.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+APP_HOME = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append('%s/code/util' % APP_HOME)
+import generic_features
+import lazy_arrays
+
+ddlib = None
+
+
+def import_ddlib():
+  global ddlib
+  try:
+    import ddlib
+  except ImportError:
+    if 'DEEPDIVE_HOME' not in os.environ:
+      sys.exit('ddlib not found: set DEEPDIVE_HOME')
+    sys.path.append('%s/ddlib' % os.environ['DEEPDIVE_HOME'])
+    import ddlib
+
+
+def read_sample(filename):
+  for line in open(filename):
+    fields = line.rstrip('\n').split('\t')
+    arrays = [list(lazy_arrays.array(x)) for x in fields[2:]]
+    arrays[5] = [int(x) for x in arrays[5]]
+    yield (fields[0], int(fields[1])), arrays
+
+
+def random_sentences(n):
+  lemmas = ['the', 'gene', 'mutation', 'cause', 'in', 'patient', '1.5', ',',
+            'BRCA1', 'of', 'and', 'disease', 'not', 'expression']
+  for k in xrange(n):
+    length = random.randint(3, 120)
+    words = [random.choice(lemmas) for i in xrange(length)]
+    dep_parents = [-1] + [random.randint(max(0, i - 6), i - 1)
+                          for i in xrange(1, length)]
+    yield ('random', k), [
+        words, [w.lower() for w in words],
+        [random.choice(['NN', 'VBZ', 'IN', 'CD']) for i in xrange(length)],
+        [random.choice(['O', 'O', 'NUMBER']) for i in xrange(length)],
+        [random.choice(['nsubj', 'dobj', 'prep_of', 'amod']) for i in xrange(length)],
+        dep_parents]
+
+
+def spans(n):
+  for begin in xrange(0, n, 2):
+    for length in xrange(1, 4):
+      if begin + length <= n:
+        yield (begin, length)
+
+
+def sentence_pairs(mention_spans, max_pairs):
+  """Pairs of non-overlapping mention spans, at most max_pairs at random"""
+  pairs = [(s1, s2) for s1 in mention_spans for s2 in mention_spans
+           if s1[0] + s1[1] <= s2[0] or s2[0] + s2[1] <= s1[0]]
+  random.shuffle(pairs)
+  return pairs[:max_pairs]
+
+
+def repo_features(key, arrays, mention_spans, pairs):
+  """(mention features, relation features) of generic_features.py, computed
+  as mention_features and pair_features do"""
+  words, lemmas, poses, ners, dep_paths, dep_parents = arrays
+  cache = {}
+  got_m = []
+  for s in mention_spans:
+    sentence = generic_features.get_sentence(
+        cache, key, words, lemmas, poses, [''] * len(words), dep_parents, dep_paths)
+    got_m.append(sentence.mention_features(*s))
+  cache = {}
+  got_r = []
+  for (s1, s2) in pairs:
+    sentence = generic_features.get_sentence(
+        cache, key, words, lemmas, poses, ners, dep_parents, dep_paths)
+    got_r.append(sentence.relation_features(s1[0], s1[1], s2[0], s2[1]))
+  return got_m, got_r
+
+
+def read_fixture(filename):
+  """(header, records) of a fixture written with --record"""
+  f = open(filename)
+  header = json.loads(f.readline())
+  records = []
+  for line in f:
+    r = json.loads(line)
+    records.append((tuple(r['key']), r['sentence'],
+                    [tuple(m) for m in r['mention_spans']],
+                    [(tuple(s1), tuple(s2)) for (s1, s2) in r['pairs']],
+                    r['mention_features'], r['relation_features'],
+                    r['relation_dep_parents']))
+  f.close()
+  return header, records
+
+
+def ddlib_mention(words, lemmas, poses, ners, dep_paths, dep_parents, span):
+  # as code/mention_features.py
+  wordobjs = [ddlib.Word(begin_char_offset=None, end_char_offset=None,
+                         word=words[i], lemma=lemmas[i], pos=poses[i], ner='',
+                         dep_par=dep_parents[i], dep_label=dep_paths[i])
+              for i in xrange(len(words))]
+  return list(ddlib.get_generic_features_mention(
+      wordobjs, ddlib.Span(begin_word_id=span[0], length=span[1])))
+
+
+def ddlib_relation_words(words, lemmas, poses, ners, dep_paths, dep_parents):
+  # as code/pair_features.py
+  obj = {'lemma': lemmas, 'words': words, 'ner': ners, 'pos': poses,
+         'dep_graph': [str(int(dep_parents[i])) + '\t' + dep_paths[i] + '\t' + str(i)
+                       for i in xrange(len(words))]}
+  return ddlib.unpack_words(
+      obj, lemma='lemma', pos='pos', ner='ner', words='words', dep_graph='dep_graph')
+
+
+def ddlib_relation(words, lemmas, poses, ners, dep_paths, dep_parents, span1, span2):
+  word_obj_list = ddlib_relation_words(words, lemmas, poses, ners, dep_paths,
+                                       dep_parents)
+  return list(ddlib.get_generic_features_relation(
+      word_obj_list, ddlib.get_span(*span1), ddlib.get_span(*span2)))
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+  parser.add_argument('sample', nargs='?',
+                      help='TSV sample of the sentences table (see above).')
+  parser.add_argument('--random', type=int, default=0,
+                      help='Use this many random sentences instead.')
+  parser.add_argument('--dict', action='append', default=[],
+                      help='ID=FILE keyword dictionary to load in both libraries.')
+  parser.add_argument('--max-pairs', type=int, default=50,
+                      help='Relations checked per sentence (default: 50).')
+  parser.add_argument('--max-sentences', type=int, default=0,
+                      help='Only use the first N sentences (default: all).')
+  parser.add_argument('--record', metavar='FIXTURE',
+                      help='Write the sentences and their ddlib features to FIXTURE.')
+  args = parser.parse_args()
+  if not args.sample and not args.random:
+    parser.error('give a sample file or --random N')
+  import_ddlib()
+
+  for d in args.dict:
+    dict_id, filename = d.split('=', 1)
+    ddlib.load_dictionary(filename, dict_id)
+    generic_features.load_dictionary(filename, dict_id)
+
+  random.seed(0)
+  if args.sample:
+    sentences = list(read_sample(args.sample))
+  else:
+    sentences = list(random_sentences(args.random))
+  if args.max_sentences:
+    sentences = sentences[:args.max_sentences]
+
+  n_mentions = n_relations = n_diffs = n_parse_diffs = 0
+  ddlib_time = repo_time = 0.0
+  records = []
+  for key, arrays in sentences:
+    words, lemmas, poses, ners, dep_paths, dep_parents = arrays
+    mention_spans = list(spans(len(words)))
+    pairs = sentence_pairs(mention_spans, args.max_pairs)
+
+    start = time.time()
+    expected_m = [ddlib_mention(words, lemmas, poses, ners, dep_paths, dep_parents, s)
+                  for s in mention_spans]
+    expected_r = [ddlib_relation(words, lemmas, poses, ners, dep_paths, dep_parents, s1, s2)
+                  for (s1, s2) in pairs]
+    ddlib_time += time.time() - start
+    relation_dep_parents = [w.dep_par for w in ddlib_relation_words(
+        words, lemmas, poses, ners, dep_paths, dep_parents)]
+    if relation_dep_parents != list(dep_parents):
+      n_parse_diffs += 1
+      if n_parse_diffs <= 10:
+        print 'PARSE %s: ddlib %s, repo %s' % (key, relation_dep_parents,
+                                              list(dep_parents))
+
+    start = time.time()
+    got_m, got_r = repo_features(key, arrays, mention_spans, pairs)
+    repo_time += time.time() - start
+    if args.record:
+      records.append({'key': key, 'sentence': arrays,
+                      'mention_spans': mention_spans, 'pairs': pairs,
+                      'mention_features': expected_m,
+                      'relation_features': expected_r,
+                      'relation_dep_parents': relation_dep_parents})
+
+    for what, expected, got, args_ in [('mention', expected_m, got_m, mention_spans),
+                                       ('relation', expected_r, got_r, pairs)]:
+      for e, g, a in zip(expected, got, args_):
+        if e != g:
+          n_diffs += 1
+          if n_diffs <= 10:
+            print 'DIFF %s %s %s' % (what, key, a)
+            print '  ddlib only: %s' % [f for f in e if f not in g]
+            print '  repo only:  %s' % [f for f in g if f not in e]
+            print '  same set, other order' if sorted(e) == sorted(g) else ''
+    n_mentions += len(mention_spans)
+    n_relations += len(pairs)
+
+  print '%d sentences, %d mentions, %d relations, %d differences' % (
+      len(sentences), n_mentions, n_relations, n_diffs)
+  print '%d sentences parsed differently by pair_features\' ddlib path' % (
+      n_parse_diffs)
+  rows = n_mentions + n_relations
+  print 'ddlib: %.2fs (%.0f rows/s)' % (ddlib_time, rows / max(ddlib_time, 1e-9))
+  print 'repo:  %.2fs (%.0f rows/s)' % (repo_time, rows / max(repo_time, 1e-9))
+  if args.record:
+    if not os.path.isdir(os.path.dirname(os.path.abspath(args.record))):
+      os.makedirs(os.path.dirname(os.path.abspath(args.record)))
+    out = open(args.record, 'w')
+    out.write(json.dumps({'dicts': args.dict, 'sentences': len(records),
+                          'ddlib_rows_per_second': rows / max(ddlib_time, 1e-9)}) + '\n')
+    for r in records:
+      out.write(json.dumps(r, sort_keys=True) + '\n')
+    out.close()
+    print 'Recorded %d sentences to %s' % (len(records), args.record)
+  sys.exit(1 if n_diffs or n_parse_diffs else 0)
@@ -11,7 +11,7 @@ if [ ! -r ${SCHEMA_FILE} ]; then
 fi
 
 if [ "$1" == "pg" ]; then
-	sed 's/DISTRIBUTED BY (doc_id)//g' ${SCHEMA_FILE} | psql -X --set ON_ERROR_STOP=1 -d ${DBNAME} 
+	sed 's/DISTRIBUTED BY ([a-z_]*)//g' ${SCHEMA_FILE} | psql -X --set ON_ERROR_STOP=1 -d ${DBNAME} 
 else
 	psql -X --set ON_ERROR_STOP=1 -d ${DBNAME} -f ${SCHEMA_FILE} 
 fi
@@ -0,0 +1,31 @@
+#! /bin/sh
+#
+# Delete the rows a *_fanout extractor copied to the non-representative
+# sentences (see sentence_content in application.conf), so that running it
+# again (e.g. in the pairs pipeline after the gene or pheno one) does not
+# copy them twice
+#
+# First argument is the database name
+# Second argument is the table
+# Optional third and fourth arguments are the number of partitions and the
+# partition to delete (see util/partition_pipeline.py)
+#
+if [ $# -ne 2 ] && [ $# -ne 4 ]; then
+	echo "$0: ERROR: wrong number of arguments" >&2
+	echo "$0: USAGE: $0 DB TABLE [PARTITIONS PARTITION]" >&2
+	exit 1
+fi
+
+if [ $# -eq 4 ]; then
+	IN_PARTITION="abs(hashtext(c.doc_id)) % $3 = $4"
+else
+	IN_PARTITION="true"
+fi
+
+SQL_COMMAND_FILE=`mktemp /tmp/ddp.XXXXX` || exit 1
+echo "DELETE FROM $2 USING sentence_content c
+  WHERE $2.doc_id = c.doc_id AND $2.sent_id = c.sent_id
+    AND (c.doc_id <> c.rep_doc_id OR c.sent_id <> c.rep_sent_id)
+    AND ${IN_PARTITION};" >> ${SQL_COMMAND_FILE}
+psql -X --set ON_ERROR_STOP=1 -d $1 -f ${SQL_COMMAND_FILE} || exit 1
+rm ${SQL_COMMAND_FILE}
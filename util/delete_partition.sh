@@ -0,0 +1,19 @@
+#! /bin/sh
+#
+# Delete one doc_id hash partition from a table (see util/partition_pipeline.py)
+#
+# First argument is the database name
+# Second argument is the table
+# Third argument is the number of partitions
+# Fourth argument is the partition to delete
+#
+if [ $# -ne 4 ]; then
+	echo "$0: ERROR: wrong number of arguments" >&2
+	echo "$0: USAGE: $0 DB TABLE PARTITIONS PARTITION" >&2
+	exit 1
+fi
+
+SQL_COMMAND_FILE=`mktemp /tmp/ddp.XXXXX` || exit 1
+echo "DELETE FROM $2 WHERE abs(hashtext(doc_id)) % $3 = $4;" >> ${SQL_COMMAND_FILE}
+psql -X --set ON_ERROR_STOP=1 -d $1 -f ${SQL_COMMAND_FILE} || exit 1
+rm ${SQL_COMMAND_FILE}
@@ -0,0 +1,69 @@
+#! /bin/sh
+#
+# Prepare a run of a feature extractor (gene_features, pheno_features or
+# genepheno_features) that uses the feature cache: empty its output table,
+# then record in feature_cache_runs the current version of its features (see
+# code/util/feature_version.py), the number of input rows it is about to
+# read and how many of them are already in feature_cache.
+#
+# First argument is the database name
+# Second argument is the extractor, which is also the name of its table
+# Optional third and fourth arguments are the number of partitions and the
+# partition to prepare (see util/partition_pipeline.py)
+#
+if [ $# -ne 2 ] && [ $# -ne 4 ]; then
+	echo "$0: ERROR: wrong number of arguments" >&2
+	echo "$0: USAGE: $0 DB EXTRACTOR [PARTITIONS PARTITION]" >&2
+	exit 1
+fi
+
+UTIL_DIR=`dirname $0`
+VERSION=`python ${UTIL_DIR}/../code/util/feature_version.py $2` || exit 1
+
+if [ $# -eq 4 ]; then
+	PARTITION="'$4/$3'"
+	IN_PARTITION="abs(hashtext(doc_id)) % $3 = $4"
+else
+	PARTITION="NULL"
+	IN_PARTITION="true"
+fi
+
+# Input rows of the extractor (as in application.conf) and their cache key
+case $2 in
+gene_features|pheno_features)
+	MENTIONS=`echo $2 | sed 's/_features$/_mentions/'`
+	KEYS="SELECT m.doc_id, c.content_hash,
+	    array_to_string(m.wordidxs, ',') as span
+	  FROM ${MENTIONS} m, sentence_content c
+	  WHERE m.doc_id = c.doc_id AND m.sent_id = c.sent_id
+	    AND m.doc_id = c.rep_doc_id AND m.sent_id = c.rep_sent_id"
+	;;
+genepheno_features)
+	KEYS="SELECT r.doc_id, c.content_hash,
+	    array_to_string(r.wordidxs_1, ',') || ';' ||
+	    array_to_string(r.wordidxs_2, ',') as span
+	  FROM genepheno_relations r, sentence_content c
+	  WHERE r.doc_id = c.doc_id AND r.sent_id_1 = c.sent_id
+	    AND r.sent_id_1 = r.sent_id_2
+	    AND r.doc_id = c.rep_doc_id AND r.sent_id_1 = c.rep_sent_id"
+	;;
+*)
+	echo "$0: ERROR: unknown extractor $2" >&2
+	exit 1
+	;;
+esac
+
+SQL_COMMAND_FILE=`mktemp /tmp/dfc.XXXXX` || exit 1
+cat > ${SQL_COMMAND_FILE} <<EOF
+DELETE FROM $2 WHERE ${IN_PARTITION};
+INSERT INTO feature_cache_runs
+  SELECT '$2', '${VERSION}', ${PARTITION}, now(),
+      count(*), count(fc.span)
+  FROM (${KEYS}) k
+    LEFT JOIN feature_cache fc
+      ON fc.extractor = '$2' AND fc.version = '${VERSION}'
+        AND fc.content_hash = k.content_hash AND fc.span = k.span
+  WHERE ${IN_PARTITION};
+EOF
+psql -X --set ON_ERROR_STOP=1 -d $1 -f ${SQL_COMMAND_FILE} || exit 1
+rm ${SQL_COMMAND_FILE}
@@ -0,0 +1,86 @@
+#! /bin/sh
+#
+# Load the time and number of features of each generic feature family that
+# the processes of a feature extractor logged (see
+# code/util/feature_profile.py) into feature_profile, and print them for the
+# current run, summed by family, with the distinct features (weights) of each
+# family in the extractor's table.  Runs as the after script of the
+# extractor, and first runs util/row_budget.sh for it.
+#
+# Each process keeps rewriting its file with its counts for the run so far,
+# so loading a file replaces the rows an earlier load of the same run and
+# process left (e.g. while another partition of the extractor was running).
+# Files not written for a day are removed.
+#
+# First argument is the database name
+# Second argument is the extractor (named as in FEATURE_FAMILIES), which is
+# also the name of its table
+#
+if [ $# -ne 2 ]; then
+	echo "$0: ERROR: wrong number of arguments" >&2
+	echo "$0: USAGE: $0 DB EXTRACTOR" >&2
+	exit 1
+fi
+
+UTIL_DIR=`dirname $0`
+${UTIL_DIR}/row_budget.sh $1 $2 || exit 1
+
+PROFILE_DIR=`cd ${UTIL_DIR}/../code/util && python -c 'import extractor_settings; print(extractor_settings.FEATURE_PROFILE_DIR)'` || exit 1
+
+SQL_COMMAND_FILE=`mktemp /tmp/dfp.XXXXX` || exit 1
+cat > ${SQL_COMMAND_FILE} <<EOS
+CREATE TEMP TABLE feature_profile_load (LIKE feature_profile);
+COPY feature_profile_load FROM STDIN;
+EOS
+for file in ${PROFILE_DIR}/$2.*.tsv; do
+	if [ -f ${file} ]; then
+		# complete lines of the extractor only
+		awk -F '\t' -v extractor=$2 'NF == 8 && $1 == extractor' ${file} >> ${SQL_COMMAND_FILE}
+	fi
+done
+cat >> ${SQL_COMMAND_FILE} <<EOS
+\.
+DELETE FROM feature_profile USING
+    (SELECT DISTINCT extractor, run_started, pid FROM feature_profile_load) l
+  WHERE feature_profile.extractor = l.extractor
+    AND feature_profile.run_started = l.run_started
+    AND feature_profile.pid = l.pid;
+INSERT INTO feature_profile SELECT * FROM feature_profile_load;
+EOS
+psql -X --set ON_ERROR_STOP=1 -q -d $1 -f ${SQL_COMMAND_FILE} || exit 1
+rm ${SQL_COMMAND_FILE}
+find ${PROFILE_DIR} -name "$2.*.tsv" -mtime +1 -exec rm -f {} \; 2>/dev/null
+
+# Per family: seconds and features of the current run, and distinct features
+# in the table
+RUN="(SELECT max(started) FROM feature_cache_runs WHERE extractor = '$2')"
+SUMS=`mktemp /tmp/dfp.XXXXX` || exit 1
+DISTINCT=`mktemp /tmp/dfp.XXXXX` || exit 1
+psql -X --set ON_ERROR_STOP=1 -d $1 -c "COPY (
+  SELECT family, sum(seconds), sum(n_features) FROM feature_profile
+  WHERE extractor = '$2' AND run_started = ${RUN}
+  GROUP BY family) TO STDOUT" > ${SUMS} || exit 1
+psql -X --set ON_ERROR_STOP=1 -d $1 -c "COPY (
+  SELECT DISTINCT feature FROM $2) TO STDOUT" | \
+	(cd ${UTIL_DIR}/../code/util && python -c '
+import sys
+from generic_features import family_of
+counts = {}
+for line in sys.stdin:
+  family = family_of(line.rstrip("\n"))
+  counts[family] = counts.get(family, 0) + 1
+for family in counts:
+  print("%s\t%d" % (family, counts[family]))') > ${DISTINCT} || exit 1
+N_ROWS=`psql -X -At --set ON_ERROR_STOP=1 -d $1 -c "
+  SELECT coalesce(sum(n_rows), 0) FROM (SELECT DISTINCT pid, n_rows
+    FROM feature_profile WHERE extractor = '$2' AND run_started = ${RUN}) p"` || exit 1
+echo "$0: feature families of $2, ${N_ROWS} row(s) featurized in this run"
+printf "  %-12s %10s %12s %12s\n" family seconds features distinct
+awk -F '\t' 'FILENAME == ARGV[1] { distinct[$1] = $2; next }
+	{ seconds[$1] = $2; features[$1] = $3 }
+	END {
+		for (f in distinct) if (!(f in seconds)) { seconds[f] = 0; features[f] = 0 }
+		for (f in seconds)
+			printf "  %-12s %10.3f %12d %12d\n", f, seconds[f], features[f], distinct[f]
+	}' ${DISTINCT} ${SUMS} | sort
+rm ${SUMS} ${DISTINCT}
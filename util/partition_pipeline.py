@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Generate a doc-partitioned DeepDive configuration from application.conf.
+
+Every extractor of the chosen pipeline is split into N copies, one per
+doc_id hash partition.  The copy for partition k only reads input rows with
+abs(hashtext(doc_id)) % N = k, only deletes its own partition of the output
+table before running (instead of truncating it), and depends on partition k of its upstream extractors
+only.  With extraction.parallelism > 1, DeepDive can then start e.g.
+gene_features on partition 0 as soon as gene_mentions is committed for
+partition 0, instead of waiting for the whole corpus.
+
+All our tables are DISTRIBUTED BY (doc_id), so partitioning on doc_id keeps
+each partition's joins (sentences x mentions, mentions x mentions) local.
+Extractors given as plain SQL (sql_extractor) are not split; they run once
+after all partitions of their dependencies, and everything downstream of
+them waits for the whole table.  The exception are the *_fanout extractors,
+which copy the rows of representative sentences to the other occurrences of
+their content (see sentence_content): the copy for partition k only writes
+the occurrences in documents of partition k.  For it to depend on partition
+k of the mention and feature extractors only, sentence_content picks the
+representative of each sentence among the sentences of the same partition,
+so a content repeated across partitions is extracted once per partition.
+
+Usage:
+  python util/partition_pipeline.py --partitions 8 --parallelism 4 > app.conf
+"""
+import argparse
+import os
+import re
+import sys
+
+APP_HOME = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+
+PARTITION_KEY = 'abs(hashtext(doc_id)) %% %d'
+PARTITION_PREDICATE = PARTITION_KEY + ' = %d'
+FANOUT_PARTITION_PREDICATE = 'abs(hashtext(c.doc_id)) %% %d = %d'
+# Window of sentence_content over the sentences with the same content, whose
+# first sentence is the representative
+REPRESENTATIVE_WINDOW = 'PARTITION BY content_hash'
+
+
+def find_block(text, start):
+  """Return the index just after the '}' closing the '{' at text[start],
+  skipping over triple-quoted strings."""
+  depth = 0
+  i = start
+  while i < len(text):
+    if text.startswith('"""', i):
+      i = text.index('"""', i + 3) + 3
+      continue
+    c = text[i]
+    if c == '{':
+      depth += 1
+    elif c == '}':
+      depth -= 1
+      if depth == 0:
+        return i + 1
+    i += 1
+  raise ValueError('Unbalanced braces in configuration')
+
+
+def block_body(text, name):
+  m = re.search(r'%s\s*\{' % re.escape(name), text)
+  if m is None:
+    raise ValueError('No "%s" block in configuration' % name)
+  begin = m.end() - 1
+  return text[begin + 1:find_block(text, begin) - 1]
+
+
+def parse_extractors(text):
+  """Parse the extraction.extractors block into {name: {key: value}}."""
+  body = block_body(text, 'extraction.extractors')
+  extractors = {}
+  pos = 0
+  for m in re.finditer(r'^\s*(\w+)\s*:\s*\{', body, re.M):
+    if m.start() < pos:
+      continue
+    begin = m.end() - 1
+    end = find_block(body, begin)
+    pos = end
+    ext = {}
+    block = body[begin + 1:end - 1]
+    for km in re.finditer(r'^\s*(\w+)\s*:\s*("""(.*?)"""|\[(.*?)\]|.*?)\s*$',
+                          block, re.M | re.S):
+      key = km.group(1)
+      if km.group(3) is not None:
+        ext[key] = km.group(3)
+      elif km.group(4) is not None:
+        ext[key] = [x.strip() for x in km.group(4).split(',') if x.strip()]
+      else:
+        ext[key] = km.group(2)
+    extractors[m.group(1)] = ext
+  return extractors
+
+
+def parse_pipeline(text, name):
+  body = block_body(text, 'pipeline.pipelines')
+  m = re.search(r'^\s*%s\s*:\s*\[(.*?)\]' % re.escape(name), body, re.M | re.S)
+  if m is None:
+    raise ValueError('No pipeline "%s" in configuration' % name)
+  return [x.strip() for x in m.group(1).split(',') if x.strip()]
+
+
+def partition_name(name, k):
+  return '%s_p%d' % (name, k)
+
+
+def is_partitioned(name, ext):
+  return 'sql' not in ext or name.endswith('_fanout')
+
+
+def dependencies(ext, extractors, n, k=None):
+  deps = []
+  for d in ext.get('dependencies', []):
+    if not is_partitioned(d, extractors[d]):
+      deps.append(d)
+    elif k is None:
+      deps += [partition_name(d, j) for j in xrange(n)]
+    else:
+      deps.append(partition_name(d, k))
+  return deps
+
+
+def partitioned_extractor(name, ext, extractors, k, n):
+  lines = ['    %s: {' % partition_name(name, k)]
+  if 'before' in ext and 'feature_cache.sh' in ext['before']:
+    lines.append('      before: %s %d %d' % (ext['before'], n, k))
+  elif 'before' in ext:
+    # extractors that append to a table another one truncates have no before
+    lines.append('      before: ${APP_HOME}/util/delete_partition.sh ${DBNAME} %s %d %d'
+                 % (ext['output_relation'], n, k))
+  lines.append('      style: %s' % ext['style'])
+  lines.append('      input: """SELECT * FROM (%s) _partition\n          WHERE %s"""'
+               % (ext['input'].rstrip(), PARTITION_PREDICATE % (n, k)))
+  for key in ('output_relation', 'udf', 'parallelism', 'after'):
+    if key in ext:
+      lines.append('      %s: %s' % (key, ext[key]))
+  deps = dependencies(ext, extractors, n, k)
+  if deps:
+    lines.append('      dependencies: [%s]' % ', '.join(deps))
+  lines.append('    }')
+  return '\n'.join(lines)
+
+
+def partitioned_fanout(name, ext, extractors, k, n):
+  lines = ['    %s: {' % partition_name(name, k)]
+  if 'before' in ext:
+    lines.append('      before: %s %d %d' % (ext['before'], n, k))
+  lines.append('      style: %s' % ext['style'])
+  lines.append('      sql: """%s\n            AND %s\n          """'
+               % (ext['sql'].rstrip(), FANOUT_PARTITION_PREDICATE % (n, k)))
+  deps = dependencies(ext, extractors, n, k)
+  if deps:
+    lines.append('      dependencies: [%s]' % ', '.join(deps))
+  lines.append('    }')
+  return '\n'.join(lines)
+
+
+def whole_extractor(name, ext, extractors, n):
+  lines = ['    %s: {' % name]
+  for key in ('before', 'style'):
+    if key in ext:
+      lines.append('      %s: %s' % (key, ext[key]))
+  sql = ext['sql']
+  if name == 'sentence_content':
+    # representatives in the same partition, for the *_fanout partitions
+    sql = sql.replace(REPRESENTATIVE_WINDOW, '%s, %s' % (
+        REPRESENTATIVE_WINDOW, PARTITION_KEY % n))
+  lines.append('      sql: """%s"""' % sql)
+  deps = dependencies(ext, extractors, n)
+  if deps:
+    lines.append('      dependencies: [%s]' % ', '.join(deps))
+  lines.append('    }')
+  return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+  parser.add_argument('--conf', default='%s/application.conf' % APP_HOME,
+                      help='Base configuration (default: application.conf).')
+  parser.add_argument('--pipeline', default='all',
+                      help='Pipeline to partition (default: all).')
+  parser.add_argument('--partitions', type=int, default=8,
+                      help='Number of doc_id hash partitions.')
+  parser.add_argument('--parallelism', type=int, default=4,
+                      help='Number of extractor partitions DeepDive may run at once.')
+  args = parser.parse_args()
+
+  text = open(args.conf).read()
+  extractors = parse_extractors(text)
+  stages = parse_pipeline(text, args.pipeline)
+  ext_stages = [s for s in stages if s in extractors]
+  factor_stages = [s for s in stages if s not in extractors]
+  for s in ext_stages:
+    for d in extractors[s].get('dependencies', []):
+      if d not in ext_stages:
+        sys.exit('Extractor %s depends on %s, which is not in pipeline %s'
+                 % (s, d, args.pipeline))
+
+  if 'sentence_content' in extractors and \
+      REPRESENTATIVE_WINDOW not in extractors['sentence_content']['sql']:
+    sys.exit('sentence_content does not pick its representatives over "%s"'
+             % REPRESENTATIVE_WINDOW)
+
+  n = args.partitions
+  out = []
+  out.append('# Generated by util/partition_pipeline.py from %s; do not edit.'
+             % os.path.basename(args.conf))
+  out.append('include file("%s")\n' % os.path.realpath(args.conf))
+  out.append('deepdive {')
+  out.append('  extraction.parallelism: %d\n' % args.parallelism)
+  out.append('  extraction.extractors {')
+  # Listing partition-major lets the scheduler finish early partitions first,
+  # so downstream stages get started on them while later partitions run.
+  tasks = []
+  for k in xrange(n):
+    for s in ext_stages:
+      if 'sql' in extractors[s] and is_partitioned(s, extractors[s]):
+        out.append(partitioned_fanout(s, extractors[s], extractors, k, n))
+        tasks.append(partition_name(s, k))
+      elif is_partitioned(s, extractors[s]):
+        out.append(partitioned_extractor(s, extractors[s], extractors, k, n))
+        tasks.append(partition_name(s, k))
+  for s in ext_stages:
+    if not is_partitioned(s, extractors[s]):
+      out.append(whole_extractor(s, extractors[s], extractors, n))
+      tasks.append(s)
+  out.append('  }\n')
+  out.append('  pipeline.run: partitioned')
+  out.append('  pipeline.pipelines.partitioned: [')
+  out.append(',\n'.join('    %s' % t for t in tasks + factor_stages))
+  out.append('  ]')
+  out.append('}')
+  print '\n'.join(out)
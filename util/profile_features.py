@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Profile the generic feature families of code/util/generic_features.py: the
+time spent in each family, against the number of features (rows of the
+features table) and of distinct features (weights) it contributes.
+
+Input is a sample of the rows given to mention_features (gene_features,
+pheno_features) or pair_features (gene_pheno_features), dumped with e.g.
+  psql -d $DBNAME -c "COPY (SELECT s.doc_id, s.sent_id,
+      delimited(s.words), delimited(s.lemmas), delimited(s.poses),
+      delimited(s.ners), delimited(s.dep_paths), delimited(s.dep_parents),
+      delimited(m.wordidxs)
+    FROM sentences s, gene_mentions m
+    WHERE s.doc_id = m.doc_id AND s.sent_id = m.sent_id
+      AND m.doc_id IN (SELECT doc_id FROM doc_metadata ORDER BY random() LIMIT 200)
+    ORDER BY s.doc_id, s.sent_id) TO STDOUT" > gene_sample.tsv
+and, for relations, delimited(r.wordidxs_1) and delimited(r.wordidxs_2) of
+genepheno_relations r instead of m.wordidxs (with --relations); delimited()
+is in util/add_user_functions.sql.  Rows of the same sentence must be
+consecutive, as they share the sentence's cached paths and features as in
+the extractors.
+
+The families enabled for the extractor in FEATURE_FAMILIES
+(code/util/extractor_settings.py) are profiled, unless --families is given.
+
+Usage:
+  python util/profile_features.py --extractor gene_features gene_sample.tsv
+  python util/profile_features.py --extractor genepheno_features --relations gp_sample.tsv
+"""
+import argparse
+import os
+import sys
+import time
+
+APP_HOME = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append('%s/code/util' % APP_HOME)
+import extractor_settings as settings
+import generic_features
+import lazy_arrays
+
+
+def read_sample(filename, relations):
+  for line in open(filename):
+    fields = line.rstrip('\n').split('\t')
+    arrays = [list(lazy_arrays.array(x)) for x in fields[2:]]
+    for i in xrange(5, len(arrays)):
+      arrays[i] = [int(x) for x in arrays[i]]
+    if relations:
+      yield (fields[0], int(fields[1])), arrays[:6], arrays[6:8]
+    else:
+      yield (fields[0], int(fields[1])), arrays[:6], arrays[6:7]
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+  parser.add_argument('sample', help='TSV sample of the input rows (see above).')
+  parser.add_argument('--extractor', default='gene_features',
+                      help='Extractor whose FEATURE_FAMILIES are used '
+                      '(default: gene_features).')
+  parser.add_argument('--relations', action='store_true',
+                      help='The sample has two spans per row (pair_features).')
+  parser.add_argument('--families',
+                      help='Comma-separated families to profile instead.')
+  args = parser.parse_args()
+
+  if args.families:
+    families = args.families.split(',')
+    for family in families:
+      if family not in generic_features.FAMILIES:
+        parser.error('unknown family %s (one of %s)' % (
+            family, ', '.join(generic_features.FAMILIES)))
+  else:
+    families = settings.FEATURE_FAMILIES.get(args.extractor)
+
+  profile = generic_features.Profile()
+  distinct = dict((f, set()) for f in generic_features.FAMILIES)
+  cache = {}
+  rows = 0
+  start = time.time()
+  for key, (words, lemmas, poses, ners, dep_paths, dep_parents), spans in \
+      read_sample(args.sample, args.relations):
+    if args.relations:
+      # as code/pair_features.py
+      sentence = generic_features.get_sentence(
+          cache, key, words, lemmas, poses, ners, dep_parents, dep_paths)
+      features = set(sentence.relation_features(
+          spans[0][0], len(spans[0]), spans[1][0], len(spans[1]),
+          families=families, profile=profile))
+    else:
+      # as code/mention_features.py
+      sentence = generic_features.get_sentence(
+          cache, key, words, lemmas, poses, [''] * len(words), dep_parents,
+          dep_paths)
+      features = sentence.mention_features(
+          spans[0][0], len(spans[0]), families=families, profile=profile)
+    for feature in features:
+      distinct[generic_features.family_of(feature)].add(feature)
+    rows += 1
+  total_time = time.time() - start
+
+  family_time = max(sum(profile.seconds.values()), 1e-9)
+  print '%d rows in %.2fs (%.0f rows/s), %.2fs in feature families' % (
+      rows, total_time, rows / max(total_time, 1e-9), family_time)
+  print '%-10s %9s %7s %10s %10s %14s' % (
+      'family', 'seconds', 'time%', 'features', 'distinct', 'us/distinct')
+  for family in generic_features.FAMILIES:
+    if families is not None and family not in families:
+      continue
+    seconds = profile.seconds[family]
+    print '%-10s %9.3f %6.1f%% %10d %10d %14.1f' % (
+        family, seconds, 100.0 * seconds / family_time,
+        profile.features[family], len(distinct[family]),
+        1e6 * seconds / max(len(distinct[family]), 1))
@@ -0,0 +1,37 @@
+#! /bin/sh
+#
+# Load the rows an extractor quarantined for exceeding its per-row budget
+# (see code/util/row_budget.py) into extractor_quarantine, and remove them
+# from the quarantine directory.  Runs as the after script of the extractor.
+#
+# The files are moved away before they are read: a UDF still running (e.g.
+# another partition of the extractor) then starts a new file, which the next
+# run of this script loads.
+#
+# First argument is the database name
+# Second argument is the extractor (named as in ROW_BUDGETS)
+#
+if [ $# -ne 2 ]; then
+	echo "$0: ERROR: wrong number of arguments" >&2
+	echo "$0: USAGE: $0 DB EXTRACTOR" >&2
+	exit 1
+fi
+
+UTIL_DIR=`dirname $0`
+QUARANTINE_DIR=`cd ${UTIL_DIR}/../code/util && python -c 'import extractor_settings; print(extractor_settings.QUARANTINE_DIR)'` || exit 1
+
+LOADING=`mktemp /tmp/drb.XXXXX` || exit 1
+for file in ${QUARANTINE_DIR}/$2.*.tsv; do
+	if [ -f ${file} ]; then
+		mv ${file} ${file}.loading
+		cat ${file}.loading >> ${LOADING}
+		rm ${file}.loading
+	fi
+done
+
+if [ -s ${LOADING} ]; then
+	psql -X --set ON_ERROR_STOP=1 -d $1 \
+		-c "COPY extractor_quarantine FROM STDIN" < ${LOADING} || exit 1
+fi
+echo "$0: `wc -l < ${LOADING}` row(s) of $2 quarantined"
+rm ${LOADING}
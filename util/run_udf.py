@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Run the UDF of a plpy_extractor outside the database on a sample of its input
+rows, and report its throughput in rows per second, e.g. to measure the
+effect of changing its inputs (see code/util/lazy_arrays.py).
+
+The sample is the output of the extractor's input query in application.conf,
+dumped with
+  python util/run_udf.py gene_mentions --sample-sql 10000 | psql -d $DBNAME > gene_mentions.tsv
+The fields are decoded from the text form of COPY into the types the UDF
+declares with ddext.input, as plpy does (text[] from '{...}', text as is),
+and decoding and the UDF itself are timed separately.  The UDF runs with a
+minimal ddext module providing input, returns and SD, as in plpy_extractor.
+
+Usage:
+  python util/run_udf.py gene_mentions gene_mentions.tsv
+"""
+import argparse
+import imp
+import os
+import re
+import sys
+import time
+import types
+
+APP_HOME = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append('%s/util' % APP_HOME)
+from partition_pipeline import parse_extractors
+
+_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v'}
+
+
+def unescape(field):
+  """Undo the backslash escapes of COPY's text format"""
+  if '\\' not in field:
+    return field
+  return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def parse_array(value, convert):
+  """Elements of a one-dimensional array in its '{...}' text form"""
+  items = []
+  i = 1
+  n = len(value) - 1
+  while i < n:
+    if value[i] == '"':
+      j = i + 1
+      chars = []
+      while value[j] != '"':
+        if value[j] == '\\':
+          j += 1
+        chars.append(value[j])
+        j += 1
+      items.append(convert(''.join(chars)))
+      i = j + 2
+    else:
+      j = value.find(',', i)
+      if j == -1:
+        j = n
+      item = value[i:j]
+      items.append(None if item == 'NULL' else convert(item))
+      i = j + 1
+  return items
+
+
+def parse_bool(value):
+  return value == 't'
+
+
+CONVERTERS = {
+    'text': str,
+    'int': int,
+    'bigint': int,
+    'float': float,
+    'double precision': float,
+    'boolean': parse_bool,
+}
+
+
+def decoder(sql_type):
+  if sql_type.endswith('[]'):
+    convert = CONVERTERS[sql_type[:-2]]
+    return lambda value: parse_array(value, convert)
+  return CONVERTERS[sql_type]
+
+
+def load_udf(filename):
+  """The UDF module, and the (name, type) of its declared inputs"""
+  ddext = types.ModuleType('ddext')
+  ddext.inputs = []
+  ddext.input = lambda name, sql_type: ddext.inputs.append((name, sql_type))
+  ddext.returns = lambda name, sql_type: None
+  ddext.SD = {}
+  sys.modules['ddext'] = ddext
+  udf = imp.load_source('udf', filename)
+  udf.init()
+  return udf, ddext.inputs
+
+
+def udf_file(extractor):
+  return os.path.join(APP_HOME, 'code', os.path.basename(extractor['udf']))
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+  parser.add_argument('extractor', help='Name of the plpy_extractor.')
+  parser.add_argument('sample', nargs='?',
+                      help='Sample of its input rows (see --sample-sql).')
+  parser.add_argument('--conf', default='%s/application.conf' % APP_HOME,
+                      help='Configuration (default: application.conf).')
+  parser.add_argument('--sample-sql', type=int, metavar='N',
+                      help='Print the SQL dumping N input rows, and exit.')
+  args = parser.parse_args()
+
+  extractors = parse_extractors(open(args.conf).read())
+  if extractors.get(args.extractor, {}).get('style') != 'plpy_extractor':
+    parser.error('%s is not a plpy_extractor' % args.extractor)
+  extractor = extractors[args.extractor]
+  if args.sample_sql:
+    print 'COPY (SELECT * FROM (%s) _input LIMIT %d) TO STDOUT;' % (
+        extractor['input'].strip(), args.sample_sql)
+    sys.exit(0)
+  if not args.sample:
+    parser.error('give a sample file or --sample-sql N')
+
+  os.environ.setdefault('DD_GENOMICS_HOME', APP_HOME)
+  udf, inputs = load_udf(udf_file(extractor))
+  decoders = [decoder(sql_type) for (name, sql_type) in inputs]
+
+  rows = output_rows = 0
+  decode_time = udf_time = 0.0
+  for line in open(args.sample):
+    start = time.time()
+    fields = line.rstrip('\n').split('\t')
+    if len(fields) != len(decoders):
+      sys.exit('%d fields in the sample, %d inputs declared by %s' % (
+          len(fields), len(decoders), udf_file(extractor)))
+    values = [None if f == '\\N' else d(unescape(f))
+              for (f, d) in zip(fields, decoders)]
+    middle = time.time()
+    for row in udf.run(*values):
+      output_rows += 1
+    udf_time += time.time() - middle
+    decode_time += middle - start
+    rows += 1
+
+  total_time = max(decode_time + udf_time, 1e-9)
+  print '%s: %d rows, %d output rows' % (args.extractor, rows, output_rows)
+  print 'decode %.2fs, udf %.2fs: %.0f rows/s (udf only: %.0f rows/s)' % (
+      decode_time, udf_time, rows / total_time, rows / max(udf_time, 1e-9))
@@ -27,6 +27,42 @@ CREATE TABLE sentences_input (
  	bounding_boxes text
  ) DISTRIBUTED BY (doc_id);
 
+-- Sentence quality flags (see the sentence_quality extractor)
+DROP TABLE IF EXISTS sentence_quality CASCADE;
+CREATE TABLE sentence_quality (
+	-- document id
+	doc_id text,
+	-- sentence id
+	sent_id int,
+	-- number of tokens
+	n_tokens int,
+	-- number of tokens that parse as numbers
+	n_floats int,
+	-- number of NA / Yes / No tokens
+	n_na int,
+	-- number of em dashes
+	n_dashes int,
+	-- number of semicolons
+	n_semicolons int,
+	-- does the sentence look like a table, list or other non-prose text?
+	is_weird boolean
+) DISTRIBUTED BY (doc_id);
+
+-- Sentence content hashes (see the sentence_content extractor)
+DROP TABLE IF EXISTS sentence_content CASCADE;
+CREATE TABLE sentence_content (
+	-- document id
+	doc_id text,
+	-- sentence id
+	sent_id int,
+	-- md5 of the words, lemmas, poses, ners and dependencies
+	content_hash text,
+	-- document id of the first sentence with this content
+	rep_doc_id text,
+	-- sentence id of the first sentence with this content
+	rep_sent_id int
+) DISTRIBUTED BY (doc_id);
+
 -- GeneRifs table
 DROP TABLE IF EXISTS generifs CASCADE;
 CREATE TABLE generifs (
@@ -121,7 +157,9 @@ CREATE TABLE gene_mentions (
 	-- words
 	words text[],
 	-- is this a correct mention?
-	is_correct boolean
+	is_correct boolean,
+	-- version of the dictionaries that found it (see code/util/lexicon_registry.py)
+	lexicon_version text
 ) DISTRIBUTED BY (doc_id);
 
 -- Gene mentions features
@@ -155,7 +193,9 @@ CREATE TABLE pheno_mentions (
 	-- words
 	words text[],
 	-- is this a correct mention?
-	is_correct boolean
+	is_correct boolean,
+	-- version of the dictionaries that found it (see code/util/lexicon_registry.py)
+	lexicon_version text
 ) DISTRIBUTED BY (doc_id);
 
 -- Phenotype mentions features
@@ -169,6 +209,23 @@ CREATE TABLE pheno_features (
 	feature text
 ) DISTRIBUTED BY (doc_id);
 
+-- Gene / Phenotype candidate pairs, before pruning
+DROP TABLE IF EXISTS genepheno_candidates CASCADE;
+CREATE TABLE genepheno_candidates (
+	-- document id
+	doc_id text,
+	-- sentence id
+	sent_id int,
+	-- gene mention id
+	mention_id_1 text,
+	-- phenotype mention id
+	mention_id_2 text,
+	-- number of tokens between the two mentions
+	distance int,
+	-- rule that dropped the pair (distance, cap), NULL if kept
+	pruned_by text
+) DISTRIBUTED BY (doc_id);
+
 -- Gene / Phenotype relation mentions
 DROP TABLE IF EXISTS genepheno_relations CASCADE;
 CREATE TABLE genepheno_relations (
@@ -212,3 +269,79 @@ CREATE TABLE genepheno_features (
 	-- feature
 	feature text
 ) DISTRIBUTED BY (doc_id);
+
+-- Features computed by the feature extractors, by sentence content and span
+-- (see util/feature_cache.sh)
+DROP TABLE IF EXISTS feature_cache CASCADE;
+CREATE TABLE feature_cache (
+	-- feature extractor (gene_features, pheno_features, genepheno_features)
+	extractor text,
+	-- version of the features (see code/util/feature_version.py)
+	version text,
+	-- content hash of the sentence (see sentence_content)
+	content_hash text,
+	-- word indexes of the mention, or of both mentions separated by ';'
+	span text,
+	-- features
+	features text[]
+) DISTRIBUTED BY (content_hash);
+
+-- Runs of the feature extractors, with the feature cache hits
+DROP TABLE IF EXISTS feature_cache_runs CASCADE;
+CREATE TABLE feature_cache_runs (
+	-- feature extractor
+	extractor text,
+	-- version of the features
+	version text,
+	-- doc_id partition (k/n) for partitioned runs, NULL otherwise
+	doc_partition text,
+	-- start of the run
+	started timestamp,
+	-- number of mentions or relations to featurize
+	n_rows bigint,
+	-- number of them found in feature_cache
+	n_hits bigint
+) DISTRIBUTED BY (extractor);
+
+-- Rows the extractors skipped or abandoned for exceeding their per-row
+-- budget (see code/util/row_budget.py, util/row_budget.sh)
+DROP TABLE IF EXISTS extractor_quarantine CASCADE;
+CREATE TABLE extractor_quarantine (
+	-- extractor (named as in ROW_BUDGETS of extractor_settings.py)
+	extractor text,
+	doc_id text,
+	-- NULL for extractors whose rows are documents
+	sent_id int,
+	-- size of the row (tokens, mention pairs or mentions)
+	size int,
+	-- time spent on the row before it was abandoned (0 if too large)
+	seconds float,
+	-- 'size' or 'time'
+	reason text,
+	-- start of the row
+	started timestamp
+) DISTRIBUTED BY (doc_id);
+
+-- Time spent in, and features produced by, each generic feature family in
+-- each process of the runs of the feature extractors (see
+-- code/util/feature_profile.py, util/feature_profile.sh)
+DROP TABLE IF EXISTS feature_profile CASCADE;
+CREATE TABLE feature_profile (
+	-- feature extractor (gene_features, pheno_features, genepheno_features)
+	extractor text,
+	-- start of the run (feature_cache_runs.started)
+	run_started timestamp,
+	-- process of the UDF
+	pid int,
+	-- feature family (FAMILIES of generic_features.py), or 'ddlib' for the
+	-- time spent in ddlib, which is not split by family
+	family text,
+	-- rows (mentions or relations) the process featurized in the run
+	n_rows bigint,
+	-- time spent computing the family's features
+	seconds float,
+	-- features of the family produced
+	n_features bigint,
+	-- time of the process' last row
+	logged timestamp
+) DISTRIBUTED BY (extractor);
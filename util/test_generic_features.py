@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Golden test of code/util/generic_features.py: the mention and relation
+features of the sentences in test_data/generic_features_ddlib.jsonl,
+recorded from ddlib with util/compare_generic_features.py --record, must be
+reproduced exactly (same strings, same order), and the parse ddlib builds
+from the dependency graph pair_features gives it must be the dep_parents
+generic_features.py walks.
+
+Usage:
+  python -m unittest discover -s util -p 'test_*.py'
+"""
+import os
+import sys
+import time
+import unittest
+
+if sys.version_info[0] > 2:
+  raise unittest.SkipTest('the extractors are Python 2')
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import compare_generic_features as compare
+
+FIXTURE = '%s/util/test_data/generic_features_ddlib.jsonl' % compare.APP_HOME
+
+
+class GoldenDdlibFeaturesTest(unittest.TestCase):
+
+  def setUp(self):
+    if not os.path.exists(FIXTURE):
+      self.skipTest('no %s: record it where ddlib is installed, see '
+                    'util/compare_generic_features.py' % FIXTURE)
+    self.header, self.records = compare.read_fixture(FIXTURE)
+    for d in self.header['dicts']:
+      dict_id, filename = d.split('=', 1)
+      compare.generic_features.load_dictionary(
+          os.path.join(compare.APP_HOME, filename), dict_id)
+
+  def test_same_features_as_ddlib(self):
+    rows = 0
+    start = time.time()
+    for (key, arrays, mention_spans, pairs, expected_m, expected_r, _) in self.records:
+      got_m, got_r = compare.repo_features(key, arrays, mention_spans, pairs)
+      for span, e, g in zip(mention_spans, expected_m, got_m):
+        self.assertEqual(e, g, 'mention %s %s' % (key, span))
+      for pair, e, g in zip(pairs, expected_r, got_r):
+        self.assertEqual(e, g, 'relation %s %s' % (key, pair))
+      rows += len(mention_spans) + len(pairs)
+    seconds = time.time() - start
+    print >>sys.stderr, '%d rows: ddlib %.0f rows/s, repo %.0f rows/s' % (
+        rows, self.header['ddlib_rows_per_second'], rows / max(seconds, 1e-9))
+
+  def test_same_parse_as_ddlib(self):
+    # an off-by-one between the two would shift every dependency path
+    for record in self.records:
+      key, arrays, relation_dep_parents = record[0], record[1], record[6]
+      self.assertEqual(relation_dep_parents, arrays[5], 'parse of %s' % (key,))
+
+
+if __name__ == '__main__':
+  unittest.main()